@@ -141,6 +141,49 @@ resource "aws_cloudwatch_log_group" "rds" {
   }
 }
 
+# Report Cache (Redis) shared by the daily-unblock lambda and the Slack bot,
+# provisioned unless report_cache_url points at an existing server
+resource "aws_elasticache_subnet_group" "report_cache" {
+  count      = var.report_cache_url == "" ? 1 : 0
+  name       = "${var.project_name}-report-cache-subnet-group"
+  subnet_ids = aws_subnet.private[*].id
+
+  tags = {
+    Name = "${var.project_name}-report-cache-subnet-group"
+  }
+}
+
+resource "aws_elasticache_replication_group" "report_cache" {
+  count                = var.report_cache_url == "" ? 1 : 0
+  replication_group_id = "${var.project_name}-report-cache"
+  description          = "CLOS report snapshots for the Slack bot and dashboard"
+  engine               = "redis"
+  engine_version       = "7.1"
+  node_type            = var.report_cache_node_type
+  num_cache_clusters   = var.enable_multi_az ? 2 : 1
+  port                 = 6379
+
+  automatic_failover_enabled = var.enable_multi_az
+  multi_az_enabled           = var.enable_multi_az
+
+  subnet_group_name  = aws_elasticache_subnet_group.report_cache[0].name
+  security_group_ids = [aws_security_group.report_cache.id]
+
+  at_rest_encryption_enabled = true
+  kms_key_id                 = aws_kms_key.clos.arn
+  transit_encryption_enabled = true
+
+  maintenance_window = "sun:05:00-sun:06:00"
+
+  tags = {
+    Name = "${var.project_name}-report-cache"
+  }
+}
+
+locals {
+  report_cache_url = var.report_cache_url != "" ? var.report_cache_url : "rediss://${aws_elasticache_replication_group.report_cache[0].primary_endpoint_address}:6379/0"
+}
+
 # DynamoDB Tables
 
 # Real-time Metrics Table
@@ -360,6 +403,10 @@ resource "aws_dynamodb_table" "wip_locks" {
     kms_key_arn = var.enable_encryption ? aws_kms_key.clos.arn : null
   }
   
+  # Stream of removed locks, so the WIP counters follow TTL expirations
+  stream_enabled   = true
+  stream_view_type = "OLD_IMAGE"
+  
   tags = {
     Name = "${var.project_name}-wip-locks"
   }
@@ -490,9 +537,12 @@ resource "aws_lambda_function" "db_init" {
 
   environment {
     variables = {
-      DATABASE_HOST = aws_rds_cluster.main.endpoint
-      DATABASE_NAME = aws_rds_cluster.main.database_name
-      SECRET_ARN    = aws_rds_cluster.main.master_user_secret[0].secret_arn
+      DATABASE_HOST       = aws_rds_cluster.main.endpoint
+      DATABASE_NAME       = aws_rds_cluster.main.database_name
+      SECRET_ARN          = aws_rds_cluster.main.master_user_secret[0].secret_arn
+      EMF_METRICS_ENABLED = tostring(var.enable_lambda_metrics)
+      PROFILE_SAMPLE_RATE = tostring(var.lambda_profile_sample_rate)
+      PROFILE_STORE_URL   = "s3://${aws_s3_bucket.artifacts.bucket}/lambda-profiles"
     }
   }
 
@@ -516,6 +566,30 @@ data "archive_file" "db_init_zip" {
     })
     filename = "index.py"
   }
+  source {
+    content  = file("${path.module}/lambda/clos_db.py")
+    filename = "clos_db.py"
+  }
+  source {
+    content  = file("${path.module}/lambda/clos_migrations.py")
+    filename = "clos_migrations.py"
+  }
+  source {
+    content  = file("${path.module}/lambda/clos_indexes.py")
+    filename = "clos_indexes.py"
+  }
+  source {
+    content  = file("${path.module}/lambda/clos_runtime.py")
+    filename = "clos_runtime.py"
+  }
+  source {
+    content  = file("${path.module}/lambda/clos_telemetry.py")
+    filename = "clos_telemetry.py"
+  }
+  source {
+    content  = file("${path.module}/lambda/clos_profiler.py")
+    filename = "clos_profiler.py"
+  }
 }
 
 # CloudWatch Log Group for Lambda
@@ -537,6 +611,11 @@ resource "aws_lambda_invocation" "db_init" {
     operation = "initialize"
   })
 
+  # Re-run when the function changes so new migrations are applied
+  triggers = {
+    source_hash = data.archive_file.db_init_zip.output_base64sha256
+  }
+
   depends_on = [
     aws_rds_cluster_instance.cluster_instances,
     aws_dynamodb_table.real_time_metrics,
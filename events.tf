@@ -76,6 +76,40 @@ resource "aws_sqs_queue" "stage_gate_dlq" {
   }
 }
 
+# Weekly Demo Fan-out Queue (one message per active pod)
+resource "aws_sqs_queue" "weekly_demo_fanout" {
+  name                       = "${var.project_name}-weekly-demo-fanout-queue"
+  delay_seconds              = 0
+  max_message_size           = 262144
+  message_retention_seconds  = 86400
+  receive_wait_time_seconds  = 10
+  visibility_timeout_seconds = var.lambda_timeout * 6
+  
+  kms_master_key_id                 = aws_kms_key.clos.arn
+  kms_data_key_reuse_period_seconds = 300
+
+  redrive_policy = jsonencode({
+    deadLetterTargetArn = aws_sqs_queue.weekly_demo_fanout_dlq.arn
+    maxReceiveCount     = 3
+  })
+
+  tags = {
+    Name = "${var.project_name}-weekly-demo-fanout-queue"
+  }
+}
+
+resource "aws_sqs_queue" "weekly_demo_fanout_dlq" {
+  name                      = "${var.project_name}-weekly-demo-fanout-dlq"
+  message_retention_seconds = 1209600
+  
+  kms_master_key_id                 = aws_kms_key.clos.arn
+  kms_data_key_reuse_period_seconds = 300
+
+  tags = {
+    Name = "${var.project_name}-weekly-demo-fanout-dlq"
+  }
+}
+
 # WIP Limit Processing Queue
 resource "aws_sqs_queue" "wip_limit" {
   name                      = "${var.project_name}-wip-limit-queue"
@@ -129,10 +163,13 @@ resource "aws_lambda_function" "stage_gate_processor" {
 
   environment {
     variables = {
-      DYNAMODB_TABLE = aws_dynamodb_table.wip_locks.name
-      RDS_ENDPOINT   = aws_rds_cluster.main.endpoint
-      SECRET_ARN     = aws_secretsmanager_secret.db_credentials.arn
-      EVENT_BUS_NAME = aws_cloudwatch_event_bus.main.name
+      DYNAMODB_TABLE      = aws_dynamodb_table.wip_locks.name
+      RDS_ENDPOINT        = aws_rds_cluster.main.endpoint
+      SECRET_ARN          = aws_secretsmanager_secret.db_credentials.arn
+      EVENT_BUS_NAME      = aws_cloudwatch_event_bus.main.name
+      EMF_METRICS_ENABLED = tostring(var.enable_lambda_metrics)
+      PROFILE_SAMPLE_RATE = tostring(var.lambda_profile_sample_rate)
+      PROFILE_STORE_URL   = "s3://${aws_s3_bucket.artifacts.bucket}/lambda-profiles"
     }
   }
 
@@ -164,9 +201,12 @@ resource "aws_lambda_function" "wip_limit_processor" {
 
   environment {
     variables = {
-      DYNAMODB_TABLE = aws_dynamodb_table.wip_locks.name
-      EVENT_BUS_NAME = aws_cloudwatch_event_bus.main.name
-      SLACK_WEBHOOK  = var.slack_webhook_url
+      DYNAMODB_TABLE      = aws_dynamodb_table.wip_locks.name
+      EVENT_BUS_NAME      = aws_cloudwatch_event_bus.main.name
+      SLACK_WEBHOOK       = var.slack_webhook_url
+      EMF_METRICS_ENABLED = tostring(var.enable_lambda_metrics)
+      PROFILE_SAMPLE_RATE = tostring(var.lambda_profile_sample_rate)
+      PROFILE_STORE_URL   = "s3://${aws_s3_bucket.artifacts.bucket}/lambda-profiles"
     }
   }
 
@@ -193,9 +233,12 @@ resource "aws_lambda_function" "github_webhook" {
 
   environment {
     variables = {
-      EVENT_BUS_NAME = aws_cloudwatch_event_bus.main.name
-      GITHUB_SECRET  = var.github_token
-      QUEUE_URL      = aws_sqs_queue.stage_gate.url
+      EVENT_BUS_NAME      = aws_cloudwatch_event_bus.main.name
+      GITHUB_SECRET       = var.github_token
+      QUEUE_URL           = aws_sqs_queue.stage_gate.url
+      EMF_METRICS_ENABLED = tostring(var.enable_lambda_metrics)
+      PROFILE_SAMPLE_RATE = tostring(var.lambda_profile_sample_rate)
+      PROFILE_STORE_URL   = "s3://${aws_s3_bucket.artifacts.bucket}/lambda-profiles"
     }
   }
 
@@ -227,10 +270,19 @@ resource "aws_lambda_function" "daily_unblock" {
 
   environment {
     variables = {
-      RDS_ENDPOINT   = aws_rds_cluster.main.endpoint
-      SECRET_ARN     = aws_secretsmanager_secret.db_credentials.arn
-      SLACK_TOKEN    = var.slack_token
-      EVENT_BUS_NAME = aws_cloudwatch_event_bus.main.name
+      RDS_ENDPOINT          = aws_rds_cluster.main.endpoint
+      RDS_READER_ENDPOINT   = var.enable_multi_az ? aws_rds_cluster.main.reader_endpoint : ""
+      SECRET_ARN            = aws_secretsmanager_secret.db_credentials.arn
+      SLACK_TOKEN           = var.slack_token
+      EVENT_BUS_NAME        = aws_cloudwatch_event_bus.main.name
+      DYNAMODB_TABLE        = aws_dynamodb_table.wip_locks.name
+      REPORT_CACHE_URL      = local.report_cache_url
+      SLACK_REPORT_CHANNEL  = var.slack_report_channel
+      SLACK_POD_CHANNELS    = jsonencode(var.slack_pod_channels)
+      DEMO_FANOUT_QUEUE_URL = aws_sqs_queue.weekly_demo_fanout.url
+      EMF_METRICS_ENABLED   = tostring(var.enable_lambda_metrics)
+      PROFILE_SAMPLE_RATE   = tostring(var.lambda_profile_sample_rate)
+      PROFILE_STORE_URL     = "s3://${aws_s3_bucket.artifacts.bucket}/lambda-profiles"
     }
   }
 
@@ -295,6 +347,26 @@ data "archive_file" "stage_gate_processor_zip" {
     })
     filename = "index.py"
   }
+  source {
+    content  = file("${path.module}/lambda/clos_db.py")
+    filename = "clos_db.py"
+  }
+  source {
+    content  = file("${path.module}/lambda/clos_runtime.py")
+    filename = "clos_runtime.py"
+  }
+  source {
+    content  = file("${path.module}/lambda/clos_telemetry.py")
+    filename = "clos_telemetry.py"
+  }
+  source {
+    content  = file("${path.module}/lambda/clos_trace.py")
+    filename = "clos_trace.py"
+  }
+  source {
+    content  = file("${path.module}/lambda/clos_profiler.py")
+    filename = "clos_profiler.py"
+  }
 }
 
 data "archive_file" "wip_limit_processor_zip" {
@@ -306,6 +378,22 @@ data "archive_file" "wip_limit_processor_zip" {
     })
     filename = "index.py"
   }
+  source {
+    content  = file("${path.module}/lambda/clos_runtime.py")
+    filename = "clos_runtime.py"
+  }
+  source {
+    content  = file("${path.module}/lambda/clos_telemetry.py")
+    filename = "clos_telemetry.py"
+  }
+  source {
+    content  = file("${path.module}/lambda/clos_trace.py")
+    filename = "clos_trace.py"
+  }
+  source {
+    content  = file("${path.module}/lambda/clos_profiler.py")
+    filename = "clos_profiler.py"
+  }
 }
 
 data "archive_file" "github_webhook_zip" {
@@ -317,6 +405,22 @@ data "archive_file" "github_webhook_zip" {
     })
     filename = "index.py"
   }
+  source {
+    content  = file("${path.module}/lambda/clos_runtime.py")
+    filename = "clos_runtime.py"
+  }
+  source {
+    content  = file("${path.module}/lambda/clos_telemetry.py")
+    filename = "clos_telemetry.py"
+  }
+  source {
+    content  = file("${path.module}/lambda/clos_trace.py")
+    filename = "clos_trace.py"
+  }
+  source {
+    content  = file("${path.module}/lambda/clos_profiler.py")
+    filename = "clos_profiler.py"
+  }
 }
 
 data "archive_file" "daily_unblock_zip" {
@@ -328,6 +432,42 @@ data "archive_file" "daily_unblock_zip" {
     })
     filename = "index.py"
   }
+  source {
+    content  = file("${path.module}/lambda/clos_db.py")
+    filename = "clos_db.py"
+  }
+  source {
+    content  = file("${path.module}/lambda/clos_cache.py")
+    filename = "clos_cache.py"
+  }
+  source {
+    content  = file("${path.module}/lambda/clos_slack.py")
+    filename = "clos_slack.py"
+  }
+  source {
+    content  = file("${path.module}/lambda/clos_partitions.py")
+    filename = "clos_partitions.py"
+  }
+  source {
+    content  = file("${path.module}/lambda/clos_metrics.py")
+    filename = "clos_metrics.py"
+  }
+  source {
+    content  = file("${path.module}/lambda/clos_jsonb.py")
+    filename = "clos_jsonb.py"
+  }
+  source {
+    content  = file("${path.module}/lambda/clos_runtime.py")
+    filename = "clos_runtime.py"
+  }
+  source {
+    content  = file("${path.module}/lambda/clos_telemetry.py")
+    filename = "clos_telemetry.py"
+  }
+  source {
+    content  = file("${path.module}/lambda/clos_profiler.py")
+    filename = "clos_profiler.py"
+  }
 }
 
 # SQS Event Source Mappings for Lambda
@@ -345,6 +485,34 @@ resource "aws_lambda_event_source_mapping" "wip_limit_processor" {
   maximum_batching_window_in_seconds = 5
 }
 
+# Locks deleted by the wip_locks TTL, to count them down in the WIP counters
+resource "aws_lambda_event_source_mapping" "wip_lock_expirations" {
+  event_source_arn       = aws_dynamodb_table.wip_locks.stream_arn
+  function_name          = aws_lambda_function.wip_limit_processor.arn
+  starting_position      = "LATEST"
+  batch_size             = 100
+  maximum_retry_attempts = 3
+
+  filter_criteria {
+    filter {
+      pattern = jsonencode({
+        eventName = ["REMOVE"]
+        userIdentity = {
+          type        = ["Service"]
+          principalId = ["dynamodb.amazonaws.com"]
+        }
+      })
+    }
+  }
+}
+
+resource "aws_lambda_event_source_mapping" "weekly_demo_fanout" {
+  event_source_arn        = aws_sqs_queue.weekly_demo_fanout.arn
+  function_name           = aws_lambda_function.daily_unblock.arn
+  batch_size              = 1
+  function_response_types = ["ReportBatchItemFailures"]
+}
+
 resource "aws_lambda_event_source_mapping" "async_processing" {
   event_source_arn = aws_sqs_queue.async_processing.arn
   function_name    = aws_lambda_function.stage_gate_processor.arn
@@ -424,6 +592,39 @@ resource "aws_cloudwatch_event_rule" "weekly_demo" {
   }
 }
 
+# Pod Rollup Refresh Schedule Rule
+resource "aws_cloudwatch_event_rule" "pod_rollup_refresh" {
+  name                = "${var.project_name}-pod-rollup-refresh-schedule"
+  description         = "Backfill and correct pod weekly summary rollups"
+  schedule_expression = "cron(0 6 * * ? *)" # 1 AM EST daily
+
+  tags = {
+    Name = "${var.project_name}-pod-rollup-refresh-schedule"
+  }
+}
+
+# Partition Maintenance Schedule Rule
+resource "aws_cloudwatch_event_rule" "partition_maintenance" {
+  name                = "${var.project_name}-partition-maintenance-schedule"
+  description         = "Pre-create monthly activities/metrics partitions and expire old ones"
+  schedule_expression = "cron(30 6 * * ? *)" # 1:30 AM EST daily
+
+  tags = {
+    Name = "${var.project_name}-partition-maintenance-schedule"
+  }
+}
+
+# Metric Rollup Schedule Rule
+resource "aws_cloudwatch_event_rule" "metric_rollup" {
+  name                = "${var.project_name}-metric-rollup-schedule"
+  description         = "Roll new raw metrics up into 1m/1h/1d aggregates"
+  schedule_expression = "rate(5 minutes)"
+
+  tags = {
+    Name = "${var.project_name}-metric-rollup-schedule"
+  }
+}
+
 # EventBridge Targets
 
 # GitHub Events → SQS
@@ -468,6 +669,39 @@ resource "aws_cloudwatch_event_target" "weekly_demo_to_lambda" {
   })
 }
 
+# Pod Rollup Refresh → Lambda (uses same daily unblock function with different event)
+resource "aws_cloudwatch_event_target" "pod_rollup_refresh_to_lambda" {
+  rule      = aws_cloudwatch_event_rule.pod_rollup_refresh.name
+  target_id = "PodRollupRefreshToLambda"
+  arn       = aws_lambda_function.daily_unblock.arn
+  
+  input = jsonencode({
+    event_type = "rollup_refresh"
+  })
+}
+
+# Partition Maintenance → Lambda (uses same daily unblock function with different event)
+resource "aws_cloudwatch_event_target" "partition_maintenance_to_lambda" {
+  rule      = aws_cloudwatch_event_rule.partition_maintenance.name
+  target_id = "PartitionMaintenanceToLambda"
+  arn       = aws_lambda_function.daily_unblock.arn
+  
+  input = jsonencode({
+    event_type = "partition_maintenance"
+  })
+}
+
+# Metric Rollup → Lambda (uses same daily unblock function with different event)
+resource "aws_cloudwatch_event_target" "metric_rollup_to_lambda" {
+  rule      = aws_cloudwatch_event_rule.metric_rollup.name
+  target_id = "MetricRollupToLambda"
+  arn       = aws_lambda_function.daily_unblock.arn
+  
+  input = jsonencode({
+    event_type = "metric_rollup"
+  })
+}
+
 # Lambda Permissions for EventBridge
 resource "aws_lambda_permission" "allow_eventbridge_daily_unblock" {
   statement_id  = "AllowExecutionFromEventBridge"
@@ -485,6 +719,30 @@ resource "aws_lambda_permission" "allow_eventbridge_weekly_demo" {
   source_arn    = aws_cloudwatch_event_rule.weekly_demo.arn
 }
 
+resource "aws_lambda_permission" "allow_eventbridge_pod_rollup_refresh" {
+  statement_id  = "AllowExecutionFromEventBridgeRollupRefresh"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.daily_unblock.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.pod_rollup_refresh.arn
+}
+
+resource "aws_lambda_permission" "allow_eventbridge_partition_maintenance" {
+  statement_id  = "AllowExecutionFromEventBridgePartitionMaintenance"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.daily_unblock.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.partition_maintenance.arn
+}
+
+resource "aws_lambda_permission" "allow_eventbridge_metric_rollup" {
+  statement_id  = "AllowExecutionFromEventBridgeMetricRollup"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.daily_unblock.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.metric_rollup.arn
+}
+
 # SQS Permissions for EventBridge
 data "aws_iam_policy_document" "sqs_eventbridge_policy" {
   statement {
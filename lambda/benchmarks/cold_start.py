@@ -0,0 +1,192 @@
+"""
+Cold-start benchmark for the CLOS lambda handlers.
+
+Each run starts a fresh interpreter that imports one handler (as the
+Lambda runtime imports index.py), then invokes it twice with a sample
+event: the first invocation pays for lazily imported SDKs and client
+creation, the second shows the warm cost. AWS calls are answered by a
+botocore before-call hook, so no network or credentials are needed and
+the timings cover our code, imports and client setup rather than AWS
+latency. Handlers that need Postgres are only imported unless
+--with-database is given (with DATABASE_HOST etc. set).
+
+    python lambda/benchmarks/cold_start.py --runs 5
+    DATABASE_HOST=localhost DATABASE_USER=postgres DATABASE_PASSWORD=postgres \\
+        python lambda/benchmarks/cold_start.py --with-database
+"""
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+LAMBDA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_PUSH = {
+    'ref': 'refs/heads/main',
+    'repository': {'name': 'ratio-platform'},
+    'commits': [{'id': 'abc123', 'message': 'Ship it', 'author': {'name': 'bench'}}],
+    'head_commit': {'id': 'abc123', 'message': 'Ship it', 'author': {'name': 'bench'}},
+    'pusher': {'name': 'bench'}
+}
+
+def sqs_event(detail_type, detail):
+    return {'Records': [{'body': json.dumps({'detail-type': detail_type, 'detail': detail})}]}
+
+HANDLERS = {
+    'github-webhook': {
+        'event': {
+            'body': json.dumps(SAMPLE_PUSH),
+            'headers': {'X-GitHub-Event': 'push', 'X-GitHub-Delivery': 'bench-delivery'}
+        },
+        'needs_database': False
+    },
+    'stage-gate-processor': {
+        'event': sqs_event('Stage Transition Request', {
+            'project_id': 'bench-project',
+            'from_stage': 'inception',
+            'to_stage': 'problem_definition',
+            'evidence': {'problem_statement': True, 'user_research': True, 'success_metrics': True}
+        }),
+        'needs_database': False
+    },
+    'wip-limit-processor': {
+        'event': sqs_event('WIP Lock Acquired', {
+            'pod_id': 'Ratio', 'item_id': 'bench-item', 'item_type': 'projects', 'user_id': 'bench'
+        }),
+        'needs_database': False
+    },
+    'daily-unblock': {
+        'event': {'event_type': 'partition_maintenance', 'dry_run': True},
+        'needs_database': True
+    },
+    'db-init': {
+        'event': {'dry_run': True},
+        'needs_database': True
+    }
+}
+
+BENCH_ENV = {
+    'AWS_DEFAULT_REGION': 'us-east-1',
+    'AWS_ACCESS_KEY_ID': 'bench',
+    'AWS_SECRET_ACCESS_KEY': 'bench',
+    'EVENT_BUS_NAME': 'clos-bench',
+    'QUEUE_URL': 'https://sqs.us-east-1.amazonaws.com/000000000000/clos-bench',
+    'DYNAMODB_TABLE': 'clos-bench-wip-locks'
+}
+
+# Canned responses for the operations the handlers call; anything else gets {}
+STUB_RESPONSES = {
+    'PutEvents': {'FailedEntryCount': 0, 'Entries': [{'EventId': 'bench-event'}]},
+    'SendMessage': {'MessageId': 'bench-message'},
+    'SendMessageBatch': {'Successful': [], 'Failed': []},
+    'Query': {'Items': [], 'Count': 0},
+    'Scan': {'Items': [], 'Count': 0}
+}
+
+def stub_aws_calls():
+    """
+    Answer every AWS API call from STUB_RESPONSES instead of the network
+    """
+    import boto3
+    from botocore.awsrequest import AWSResponse
+
+    def answer(model, **kwargs):
+        return AWSResponse('https://bench.invalid', 200, {}, None), dict(STUB_RESPONSES.get(model.name, {}))
+
+    if boto3.DEFAULT_SESSION is None:
+        boto3.setup_default_session()
+    boto3.DEFAULT_SESSION.events.register('before-call', answer)
+
+def elapsed_ms(started_at):
+    return round((time.perf_counter() - started_at) * 1000, 2)
+
+def run_child(name, invoke):
+    """
+    Measure one cold start in this (fresh) interpreter and print it as JSON
+    """
+    sys.path.insert(0, LAMBDA_DIR)
+    result = {'handler': name}
+
+    started_at = time.perf_counter()
+    spec = importlib.util.spec_from_file_location('index', os.path.join(LAMBDA_DIR, f'{name}.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    result['import_ms'] = elapsed_ms(started_at)
+    result['boto3_at_import'] = 'boto3' in sys.modules
+
+    if invoke:
+        # Counted separately: in production this lands in the first invocation
+        # when the handler imports boto3 lazily, or in import_ms when it doesn't
+        started_at = time.perf_counter()
+        stub_aws_calls()
+        result['sdk_ms'] = 0.0 if result['boto3_at_import'] else elapsed_ms(started_at)
+
+        event = HANDLERS[name]['event']
+        started_at = time.perf_counter()
+        response = module.handler(event, None)
+        result['first_invoke_ms'] = elapsed_ms(started_at)
+
+        started_at = time.perf_counter()
+        module.handler(event, None)
+        result['warm_invoke_ms'] = elapsed_ms(started_at)
+        result['status_code'] = (response or {}).get('statusCode')
+        result['cold_total_ms'] = round(result['import_ms'] + result['sdk_ms'] + result['first_invoke_ms'], 2)
+
+    print(json.dumps(result))
+
+def measure(name, invoke):
+    """
+    Run one cold start of a handler in a fresh interpreter
+    """
+    env = dict(os.environ)
+    for key, value in BENCH_ENV.items():
+        env.setdefault(key, value)
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', name] + (['--invoke'] if invoke else []),
+        env=env, capture_output=True, text=True, check=False
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{name} failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('handlers', nargs='*', help=f"default: {' '.join(HANDLERS)}")
+    parser.add_argument('--runs', type=int, default=5, help='cold starts per handler; medians are reported')
+    parser.add_argument('--with-database', action='store_true', help='also invoke the handlers that need Postgres')
+    parser.add_argument('--json', action='store_true', help='print raw runs as JSON')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--invoke', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.invoke)
+        return
+
+    unknown = [name for name in args.handlers if name not in HANDLERS]
+    if unknown:
+        parser.error(f"unknown handlers: {', '.join(unknown)}")
+
+    columns = ['import_ms', 'sdk_ms', 'first_invoke_ms', 'cold_total_ms', 'warm_invoke_ms']
+    report = {}
+    print(f"{'handler':<22}" + ''.join(f"{column:>17}" for column in columns) + '  boto3 at import')
+    for name in args.handlers or list(HANDLERS):
+        invoke = args.with_database or not HANDLERS[name]['needs_database']
+        runs = [measure(name, invoke) for _ in range(args.runs)]
+        report[name] = runs
+        medians = {
+            column: statistics.median(run[column] for run in runs) if column in runs[0] else None
+            for column in columns
+        }
+        cells = ''.join(f"{'-' if value is None else f'{value:.1f}':>17}" for value in medians.values())
+        print(f"{name:<22}{cells}  {'yes' if runs[0]['boto3_at_import'] else 'no'}")
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Cold versus warm database latency for the report lambdas.
+
+Cold: Secrets lookup + new connection + plain query per invocation (the
+old behaviour). Warm: clos_db's cached connection and prepared statement.
+
+Run against a local Postgres loaded with the db-init schema:
+
+    DATABASE_HOST=localhost DATABASE_USER=postgres DATABASE_PASSWORD=postgres \\
+        python lambda/benchmarks/connection_reuse.py --iterations 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import clos_db
+
+QUERY = """
+    SELECT p.id, p.name, p.current_stage, p.updated_at
+    FROM projects p
+    WHERE p.updated_at < NOW() - INTERVAL '3 days'
+        AND p.current_stage != 'monitoring'
+    ORDER BY p.updated_at ASC
+    LIMIT 50
+"""
+
+def summarize(label, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<6} n={len(timings):<5} mean={statistics.mean(timings):8.2f}ms "
+          f"p50={statistics.median(timings):8.2f}ms p95={p95:8.2f}ms")
+
+def run_cold(iterations):
+    timings = []
+    for _ in range(iterations):
+        started_at = time.perf_counter()
+        conn = clos_db.open_connection(secret=clos_db.get_db_secret(force_refresh=True))
+        cur = conn.cursor()
+        cur.execute(QUERY)
+        cur.fetchall()
+        cur.close()
+        conn.close()
+        timings.append((time.perf_counter() - started_at) * 1000)
+    return timings
+
+def run_warm(iterations):
+    timings = []
+    for _ in range(iterations):
+        started_at = time.perf_counter()
+        conn = clos_db.get_connection({'bench_blocked_items': QUERY})
+        cur = conn.cursor()
+        clos_db.execute_prepared(cur, 'bench_blocked_items')
+        cur.fetchall()
+        cur.close()
+        clos_db.release_connection(conn)
+        timings.append((time.perf_counter() - started_at) * 1000)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--iterations', type=int, default=100)
+    args = parser.parse_args()
+
+    summarize('cold', run_cold(args.iterations))
+    summarize('warm', run_warm(args.iterations))
+    clos_db.close_connection()
+
+if __name__ == '__main__':
+    main()
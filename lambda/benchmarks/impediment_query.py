@@ -0,0 +1,109 @@
+"""
+Impediment lookup: LIKE '%...%' filter versus the indexed activity category.
+
+Loads generated activities into a scratch schema and times the old
+query (leading-wildcard LIKE with the precedence bug that drops the
+7-day bound) against the category + partial index version.
+
+    DATABASE_HOST=localhost DATABASE_USER=postgres DATABASE_PASSWORD=postgres \\
+        python lambda/benchmarks/impediment_query.py --rows 3000000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import clos_db
+
+SCHEMA = 'bench_impediments'
+
+LIKE_QUERY = f"""
+    SELECT a.id, a.action, a.created_at
+    FROM {SCHEMA}.activities a
+    WHERE a.action LIKE '%impediment%' OR a.action LIKE '%blocked%'
+        AND a.created_at > NOW() - INTERVAL '7 days'
+    ORDER BY a.created_at DESC
+    LIMIT 50
+"""
+
+CATEGORY_QUERY = f"""
+    SELECT a.id, a.action, a.created_at
+    FROM {SCHEMA}.activities a
+    WHERE a.category IN ('impediment', 'blocked')
+        AND a.created_at > NOW() - INTERVAL '7 days'
+    ORDER BY a.created_at DESC
+    LIMIT 50
+"""
+
+def load_activities(cur, rows):
+    """
+    Generate a year of activities, about 1% of them impediments
+    """
+    cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    cur.execute(f"CREATE SCHEMA {SCHEMA}")
+    cur.execute(f"""
+    CREATE TABLE {SCHEMA}.activities (
+        id BIGSERIAL PRIMARY KEY,
+        action VARCHAR(100) NOT NULL,
+        category TEXT NOT NULL DEFAULT 'general',
+        created_at TIMESTAMP NOT NULL
+    )
+    """)
+    cur.execute(f"""
+    INSERT INTO {SCHEMA}.activities (action, category, created_at)
+    SELECT
+        CASE WHEN g % 200 = 0 THEN 'impediment_raised'
+             WHEN g % 200 = 1 THEN 'project_blocked'
+             ELSE 'project_updated' END,
+        CASE WHEN g % 200 = 0 THEN 'impediment'
+             WHEN g % 200 = 1 THEN 'blocked'
+             ELSE 'general' END,
+        NOW() - (random() * INTERVAL '365 days')
+    FROM generate_series(1, %s) g
+    """, (rows,))
+    cur.execute(f"CREATE INDEX ON {SCHEMA}.activities (created_at)")
+    cur.execute(f"""
+    CREATE INDEX ON {SCHEMA}.activities (created_at DESC)
+    WHERE category IN ('impediment', 'blocked')
+    """)
+    cur.execute(f"ANALYZE {SCHEMA}.activities")
+
+def time_query(cur, sql, iterations):
+    timings = []
+    for _ in range(iterations):
+        started_at = time.perf_counter()
+        cur.execute(sql)
+        cur.fetchall()
+        timings.append((time.perf_counter() - started_at) * 1000)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=3000000)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--keep', action='store_true', help='keep the scratch schema')
+    args = parser.parse_args()
+
+    conn = clos_db.open_connection()
+    conn.autocommit = True
+    cur = conn.cursor()
+
+    print(f"Loading {args.rows} activities...")
+    load_activities(cur, args.rows)
+
+    for label, sql in [('like', LIKE_QUERY), ('category', CATEGORY_QUERY)]:
+        cur.execute(f"EXPLAIN {sql}")
+        plan = cur.fetchall()[0][0]
+        timings = time_query(cur, sql, args.iterations)
+        print(f"{label:<9} mean={statistics.mean(timings):9.2f}ms p50={statistics.median(timings):9.2f}ms  {plan}")
+
+    if not args.keep:
+        cur.execute(f"DROP SCHEMA {SCHEMA} CASCADE")
+    cur.close()
+    conn.close()
+
+if __name__ == '__main__':
+    main()
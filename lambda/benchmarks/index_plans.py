@@ -0,0 +1,234 @@
+"""
+EXPLAIN regression check for the BRIN, GIN and covering indexes.
+
+Builds a scratch schema with generated projects, activities, metrics,
+ideas and stage transitions (inserted in time order, as production rows
+arrive), creates the db-init INDEXES for those tables, then EXPLAINs the
+report and clos_jsonb queries and checks each plan uses the index it was
+designed for. Exits non-zero if any plan regressed.
+
+activities and metrics are range-partitioned by month as migration 7
+leaves them, and indexed through clos_indexes.ensure_indexes like
+db-init does, so the BRIN checks see per-partition indexes.
+
+    DATABASE_HOST=localhost DATABASE_USER=postgres DATABASE_PASSWORD=postgres \\
+        python lambda/benchmarks/index_plans.py --rows 200000
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import clos_db
+import clos_indexes
+import clos_jsonb
+import clos_partitions
+
+SCHEMA = 'bench_index_plans'
+
+TABLES = {
+    'projects': """
+        id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+        name VARCHAR(255) NOT NULL,
+        pod_id UUID,
+        current_stage TEXT NOT NULL,
+        updated_at TIMESTAMP
+    """,
+    'activities': """
+        id UUID NOT NULL DEFAULT gen_random_uuid(),
+        user_id UUID,
+        action VARCHAR(100) NOT NULL,
+        category TEXT NOT NULL DEFAULT 'general',
+        created_at TIMESTAMP NOT NULL,
+        PRIMARY KEY (id, created_at)
+    """,
+    'metrics': """
+        id UUID NOT NULL DEFAULT gen_random_uuid(),
+        pod_id UUID,
+        metric_type VARCHAR(100) NOT NULL,
+        metric_value DECIMAL(10,4) NOT NULL,
+        dimensions JSONB DEFAULT '{}',
+        timestamp TIMESTAMP NOT NULL,
+        PRIMARY KEY (id, timestamp)
+    """,
+    'ideas': """
+        id BIGSERIAL PRIMARY KEY,
+        title VARCHAR(500) NOT NULL,
+        status TEXT DEFAULT 'pending',
+        submitted_by UUID,
+        tags JSONB DEFAULT '[]',
+        metadata JSONB DEFAULT '{}',
+        pod_id UUID,
+        ledger_key CHAR(64) UNIQUE
+    """,
+    'stage_transitions': """
+        id BIGSERIAL PRIMARY KEY,
+        project_id UUID,
+        to_stage TEXT NOT NULL,
+        evidence JSONB NOT NULL DEFAULT '{}',
+        approved_at TIMESTAMP
+    """
+}
+
+# Tables range-partitioned by month (migration 7), with their partition key
+PARTITIONED_TABLES = {
+    'activities': 'created_at',
+    'metrics': 'timestamp'
+}
+
+LOAD_SQL = [
+    """
+    INSERT INTO projects (name, pod_id, current_stage, updated_at)
+    SELECT 'project ' || g, NULL,
+        (ARRAY['inception', 'build', 'deploy', 'monitoring'])[1 + g %% 4],
+        NOW() - make_interval(mins => g)
+    FROM generate_series(1, %(rows)s) g
+    """,
+    """
+    INSERT INTO activities (action, category, created_at)
+    SELECT 'project_updated', 'general', NOW() - make_interval(secs => %(rows)s - g)
+    FROM generate_series(1, %(rows)s) g
+    """,
+    """
+    INSERT INTO metrics (metric_type, metric_value, dimensions, timestamp)
+    SELECT 'cycle_time', g %% 100,
+        jsonb_build_object('env', (ARRAY['prod', 'staging'])[1 + g %% 2], 'service', 'svc-' || g %% 500),
+        NOW() - make_interval(secs => %(rows)s - g)
+    FROM generate_series(1, %(rows)s) g
+    """,
+    """
+    INSERT INTO ideas (title, tags)
+    SELECT 'idea ' || g, jsonb_build_array('tag-' || g %% 1000, 'topic-' || g %% 37)
+    FROM generate_series(1, %(rows)s) g
+    """,
+    """
+    INSERT INTO stage_transitions (to_stage, evidence, approved_at)
+    SELECT 'build', jsonb_build_object('github', jsonb_build_object('pr_number', g, 'pr_merged', g %% 1000 = 0)),
+        NOW() - make_interval(secs => g)
+    FROM generate_series(1, %(rows)s) g
+    """
+]
+
+def plan_checks():
+    """
+    (label, sql, params, expected index) for each query the indexes were designed for
+    """
+    tags_sql, tags_params = clos_jsonb.has_tag('i.tags', 'tag-42')
+    dims_sql, dims_params = clos_jsonb.fields_equal('m.dimensions', {'service': 'svc-7'})
+    evidence_sql, evidence_params = clos_jsonb.field_equals('st.evidence', 'github.pr_number', 4242)
+    return [
+        ('stale projects (covering)', """
+            SELECT p.id, p.name, p.current_stage, p.updated_at, p.pod_id
+            FROM projects p
+            WHERE p.updated_at < NOW() - INTERVAL '3 days'
+                AND p.current_stage != 'monitoring'
+            ORDER BY p.updated_at ASC
+            LIMIT 20
+        """, [], 'idx_projects_stale'),
+        ('activities time range (BRIN)', """
+            SELECT COUNT(*) FROM activities a
+            WHERE a.created_at >= NOW() - INTERVAL '1 hour'
+        """, [], 'idx_activities_created_at_brin'),
+        ('metrics time range (BRIN)', """
+            SELECT COUNT(*) FROM metrics m
+            WHERE m.timestamp >= NOW() - INTERVAL '1 hour'
+        """, [], 'idx_metrics_timestamp_brin'),
+        ('idea tag containment (GIN)', f"SELECT i.id FROM ideas i WHERE {tags_sql}", tags_params, 'idx_ideas_tags'),
+        ('metric dimensions containment (GIN)', f"SELECT m.id FROM metrics m WHERE {dims_sql}", dims_params,
+         'idx_metrics_dimensions'),
+        ('transition evidence containment (GIN)', f"SELECT st.id FROM stage_transitions st WHERE {evidence_sql}",
+         evidence_params, 'idx_stage_transitions_evidence')
+    ]
+
+def load_index_specs():
+    """
+    The INDEXES spec from db-init.py for the tables in the scratch schema
+    """
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'db-init.py')
+    spec = importlib.util.spec_from_file_location('db_init', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return [index for index in module.INDEXES if index['table'] in TABLES]
+
+def create_tables(cur, rows):
+    """
+    Create the scratch tables, with a monthly partition for every month the generated rows span
+    """
+    for table, columns in TABLES.items():
+        if table not in PARTITIONED_TABLES:
+            cur.execute(f"CREATE TABLE {table} ({columns})")
+            continue
+
+        cur.execute(f'CREATE TABLE {table} ({columns}) PARTITION BY RANGE ("{PARTITIONED_TABLES[table]}")')
+        cur.execute("SELECT (NOW() - make_interval(secs => %s))::date, NOW()::date", (rows,))
+        first_day, today = cur.fetchone()
+        month = first_day.replace(day=1)
+        last_month = clos_partitions.add_months(today.replace(day=1), clos_partitions.PARTITION_MONTHS_AHEAD)
+        while month <= last_month:
+            next_month = clos_partitions.add_months(month, 1)
+            cur.execute(
+                f"CREATE TABLE {clos_partitions.partition_name(table, month)} PARTITION OF {table} "
+                f"FOR VALUES FROM (%s) TO (%s)",
+                (month, next_month)
+            )
+            month = next_month
+
+def plan_nodes(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from plan_nodes(child)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--keep', action='store_true', help='keep the scratch schema')
+    args = parser.parse_args()
+
+    conn = clos_db.open_connection()
+    conn.autocommit = True
+    cur = conn.cursor()
+
+    print(f"Loading {args.rows} rows per table...")
+    cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    cur.execute(f"CREATE SCHEMA {SCHEMA}")
+    cur.execute(f"SET search_path TO {SCHEMA}, public")
+    create_tables(cur, args.rows)
+    for sql in LOAD_SQL:
+        cur.execute(sql, {'rows': args.rows})
+
+    index_result = clos_indexes.ensure_indexes(conn, load_index_specs())
+    if index_result['failed']:
+        sys.exit(f"Index builds failed: {index_result['failed']}")
+    conn.autocommit = True
+    for table in TABLES:
+        # ANALYZE on a partitioned parent only gathers the parent's statistics
+        cur.execute(f"VACUUM ANALYZE {table}")
+        if table in PARTITIONED_TABLES:
+            for partition in clos_partitions.list_partitions(conn, table):
+                cur.execute(f"VACUUM ANALYZE {partition['name']}")
+
+    failures = 0
+    for label, sql, params, expected in plan_checks():
+        cur.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cur.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        nodes = list(plan_nodes(plan[0]['Plan']))
+        used = [f"{node['Node Type']} on {node['Index Name']}" for node in nodes if 'Index Name' in node]
+        ok = any(expected in description for description in used)
+        failures += not ok
+        print(f"{'PASS' if ok else 'FAIL'}  {label:<40} {', '.join(used) or nodes[0]['Node Type']}")
+
+    if not args.keep:
+        cur.execute(f"DROP SCHEMA {SCHEMA} CASCADE")
+    cur.close()
+    conn.close()
+
+    if failures:
+        sys.exit(f"{failures} plan(s) no longer use their index")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""
+Activity queries on a plain table versus monthly range partitions.
+
+Loads the same generated activities into a plain table and a table
+partitioned by month (the layout from migration 7), then runs the
+daily-unblock time-bounded queries as prepared statements with
+timestamptz parameters against both, printing timings and how many
+partitions each plan actually scanned.
+
+    DATABASE_HOST=localhost DATABASE_USER=postgres DATABASE_PASSWORD=postgres \\
+        python lambda/benchmarks/partition_pruning.py --rows 5000000 --months 24
+"""
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import clos_db
+import clos_partitions
+
+SCHEMA = 'bench_partitions'
+
+# Same predicates as the daily-unblock report statements
+QUERIES = {
+    'new_impediments': """
+        SELECT a.id, a.action, a.created_at
+        FROM {table} a
+        WHERE a.category IN ('impediment', 'blocked')
+            AND a.created_at >= $1::timestamptz
+            AND a.created_at < $2::timestamptz
+        ORDER BY a.created_at DESC
+        LIMIT 20
+    """,
+    'impediment_counts_by_day': """
+        SELECT a.created_at::date, COUNT(*)
+        FROM {table} a
+        WHERE a.category IN ('impediment', 'blocked')
+            AND a.created_at >= $1::timestamptz
+            AND a.created_at < $2::timestamptz
+        GROUP BY a.created_at::date
+    """,
+    'active_impediments': """
+        SELECT COUNT(*)
+        FROM {table} a
+        WHERE a.category IN ('impediment', 'blocked')
+            AND a.created_at > NOW() - INTERVAL '7 days'
+    """
+}
+
+SCANNED_PARTITION_PATTERN = re.compile(r' on (activities_partitioned_\d{4}_\d{2})')
+SUBPLANS_REMOVED_PATTERN = re.compile(r'Subplans Removed: (\d+)')
+
+def load_activities(cur, rows, months):
+    """
+    Generate `months` of activities into both tables, about 1% of them impediments
+    """
+    cur.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+    cur.execute(f"CREATE SCHEMA {SCHEMA}")
+    cur.execute(f"SET search_path TO {SCHEMA}")
+    columns = """
+        id BIGSERIAL,
+        action VARCHAR(100) NOT NULL,
+        category TEXT NOT NULL DEFAULT 'general',
+        created_at TIMESTAMP NOT NULL
+    """
+    cur.execute(f"CREATE TABLE activities_plain ({columns}, PRIMARY KEY (id))")
+    cur.execute(f"""
+    CREATE TABLE activities_partitioned ({columns}, PRIMARY KEY (id, created_at))
+    PARTITION BY RANGE (created_at)
+    """)
+
+    today = datetime.now(timezone.utc).date()
+    current_month = date(today.year, today.month, 1)
+    for offset in range(-months, 2):
+        month = clos_partitions.add_months(current_month, offset)
+        cur.execute(f"""
+        CREATE TABLE {clos_partitions.partition_name('activities_partitioned', month)}
+        PARTITION OF activities_partitioned
+        FOR VALUES FROM (%s) TO (%s)
+        """, (month, clos_partitions.add_months(month, 1)))
+
+    cur.execute("""
+    INSERT INTO activities_plain (action, category, created_at)
+    SELECT
+        CASE WHEN g %% 200 = 0 THEN 'impediment_raised'
+             WHEN g %% 200 = 1 THEN 'project_blocked'
+             ELSE 'project_updated' END,
+        CASE WHEN g %% 200 = 0 THEN 'impediment'
+             WHEN g %% 200 = 1 THEN 'blocked'
+             ELSE 'general' END,
+        NOW() - (random() * make_interval(days => %s))
+    FROM generate_series(1, %s) g
+    """, (months * 30, rows))
+    cur.execute("""
+    INSERT INTO activities_partitioned (id, action, category, created_at)
+    SELECT id, action, category, created_at FROM activities_plain
+    """)
+
+    for table in ('activities_plain', 'activities_partitioned'):
+        cur.execute(f"CREATE INDEX ON {table} (created_at)")
+        cur.execute(f"ANALYZE {table}")
+
+def execute_sql(name, params):
+    return f"EXECUTE {name}({', '.join(['%s'] * len(params))})" if params else f"EXECUTE {name}"
+
+def time_query(cur, name, params, iterations):
+    timings = []
+    for _ in range(iterations):
+        started_at = time.perf_counter()
+        cur.execute(execute_sql(name, params), params)
+        cur.fetchall()
+        timings.append((time.perf_counter() - started_at) * 1000)
+    return timings
+
+def scanned_partitions(cur, name, params):
+    """
+    Run EXPLAIN ANALYZE on a prepared statement and count the partitions it touched
+    """
+    cur.execute(f"EXPLAIN (ANALYZE, COSTS OFF, TIMING OFF) {execute_sql(name, params)}", params)
+    scanned = set()
+    removed = 0
+    for (line,) in cur.fetchall():
+        match = SCANNED_PARTITION_PATTERN.search(line)
+        if match and '(never executed)' not in line:
+            scanned.add(match.group(1))
+        removed += sum(int(n) for n in SUBPLANS_REMOVED_PATTERN.findall(line))
+    return len(scanned), removed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=5000000)
+    parser.add_argument('--months', type=int, default=24)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--keep', action='store_true', help='keep the scratch schema')
+    args = parser.parse_args()
+
+    conn = clos_db.open_connection()
+    conn.autocommit = True
+    cur = conn.cursor()
+
+    print(f"Loading {args.rows} activities over {args.months} months...")
+    load_activities(cur, args.rows, args.months)
+
+    now = datetime.now(timezone.utc)
+    params = {
+        'new_impediments': (now - timedelta(days=1), now),
+        'impediment_counts_by_day': (now - timedelta(days=14), now),
+        'active_impediments': ()
+    }
+
+    # Force generic plans so pruning has to happen at executor startup, as it
+    # does for the report statements once Postgres switches them to a cached plan
+    cur.execute("SET plan_cache_mode = force_generic_plan")
+
+    for query, sql in QUERIES.items():
+        print(query)
+        for table in ('activities_plain', 'activities_partitioned'):
+            name = f"{query}_{table}"
+            cur.execute(f"PREPARE {name} AS {sql.format(table=table)}")
+            timings = time_query(cur, name, params[query], args.iterations)
+            line = f"    {table:<24} mean={statistics.mean(timings):9.2f}ms p50={statistics.median(timings):9.2f}ms"
+            if table == 'activities_partitioned':
+                scanned, removed = scanned_partitions(cur, name, params[query])
+                line += f"  partitions scanned={scanned} pruned={removed}"
+            print(line)
+
+    if not args.keep:
+        cur.execute(f"DROP SCHEMA {SCHEMA} CASCADE")
+    cur.close()
+    conn.close()
+
+if __name__ == '__main__':
+    main()
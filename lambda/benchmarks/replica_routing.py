@@ -0,0 +1,64 @@
+"""
+Read-replica routing check for clos_db.
+
+Runs report-style reads through pooled_connection(role=REPLICA) and shows
+which server answered, then forces the lag threshold below zero to show
+the fallback to the primary. Works with two Postgres instances (a primary
+and a streaming standby) or one instance posing as both:
+
+    DATABASE_HOST=localhost DATABASE_READ_HOST=127.0.0.1 \\
+        DATABASE_USER=postgres DATABASE_PASSWORD=postgres \\
+        python lambda/benchmarks/replica_routing.py --iterations 100
+"""
+import argparse
+import collections
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import clos_db
+
+WHO_AM_I = "SELECT inet_server_addr()::text, inet_server_port(), pg_is_in_recovery()"
+
+def run_reads(iterations):
+    servers = collections.Counter()
+    timings = []
+    for _ in range(iterations):
+        started_at = time.perf_counter()
+        with clos_db.pooled_connection(role=clos_db.REPLICA) as conn:
+            cur = conn.cursor()
+            cur.execute(WHO_AM_I)
+            address, port, in_recovery = cur.fetchone()
+            cur.close()
+        timings.append((time.perf_counter() - started_at) * 1000)
+        servers[f"{address}:{port} {'standby' if in_recovery else 'primary'}"] += 1
+    return servers, timings
+
+def report(label, servers, timings):
+    print(f"{label}: mean={statistics.mean(timings):.2f}ms p50={statistics.median(timings):.2f}ms "
+          f"lag={clos_db._replica_status['lag_seconds']} usable={clos_db._replica_status['usable']}")
+    for server, count in servers.most_common():
+        print(f"    {count:>5} reads from {server}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--iterations', type=int, default=100)
+    args = parser.parse_args()
+
+    if not clos_db.replica_configured():
+        sys.exit("Set DATABASE_READ_HOST (or RDS_READER_ENDPOINT) to a read endpoint")
+
+    clos_db.REPLICA_LAG_CHECK_INTERVAL_SECONDS = 0
+    report('within threshold', *run_reads(args.iterations))
+
+    # Any measured lag now exceeds the threshold, so reads must fall back
+    clos_db.REPLICA_MAX_LAG_SECONDS = -1
+    report('over threshold', *run_reads(args.iterations))
+
+    clos_db.close_all_connections()
+
+if __name__ == '__main__':
+    main()
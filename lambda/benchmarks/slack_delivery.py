@@ -0,0 +1,147 @@
+"""
+Slack report delivery against a local HTTP stand-in for the Web API.
+
+Starts a chat.postMessage stub that enforces Slack's 50-block limit and
+simulates API latency, renders a large synthetic daily unblock report
+with per-pod channels, and delivers it through clos_slack:
+
+    python lambda/benchmarks/slack_delivery.py --blocked-items 120 --latency-ms 50
+
+LocalSlackServer can also be used directly to exercise clos_slack in tests.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LAMBDA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, LAMBDA_DIR)
+
+import clos_slack
+
+class LocalSlackServer:
+    """
+    Minimal chat.postMessage stand-in recording every message it accepts
+    """
+
+    def __init__(self, latency_ms=0, max_blocks=clos_slack.SLACK_MAX_BLOCKS):
+        self.latency_ms = latency_ms
+        self.max_blocks = max_blocks
+        self.messages = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def _handler(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                time.sleep(stand_in.latency_ms / 1000)
+
+                if self.path != '/chat.postMessage':
+                    response = {'ok': False, 'error': 'unknown_method'}
+                elif not self.headers.get('Authorization', '').startswith('Bearer '):
+                    response = {'ok': False, 'error': 'not_authed'}
+                elif len(body.get('blocks', [])) > stand_in.max_blocks:
+                    response = {'ok': False, 'error': 'invalid_blocks'}
+                else:
+                    with stand_in._lock:
+                        stand_in.messages.append(body)
+                        ts = f"{time.time():.6f}"
+                    response = {'ok': True, 'channel': body['channel'], 'ts': ts}
+
+                payload = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+def load_daily_unblock():
+    """
+    Import daily-unblock.py, whose file name is not a valid module name
+    """
+    spec = importlib.util.spec_from_file_location('daily_unblock', os.path.join(LAMBDA_DIR, 'daily-unblock.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def build_report(daily_unblock, blocked_items, pods):
+    """
+    Generate a synthetic daily unblock report
+    """
+    now = datetime.now()
+    items = [{
+        'id': str(i),
+        'name': f"Project {i}",
+        'current_stage': 'build',
+        'last_updated': (now - timedelta(days=3 + i % 10)).isoformat(),
+        'pod_name': pods[i % len(pods)],
+        'lead_name': 'Lead',
+        'days_blocked': 3 + i % 10
+    } for i in range(blocked_items)]
+    violations = [{
+        'pod_id': pod,
+        'item_type': 'pull_requests',
+        'current_count': 9,
+        'limit': 5
+    } for pod in pods]
+    return daily_unblock.generate_unblock_report(items, [], violations)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--blocked-items', type=int, default=120)
+    parser.add_argument('--pods', type=int, default=6)
+    parser.add_argument('--latency-ms', type=int, default=50)
+    args = parser.parse_args()
+
+    pods = [f"Pod{i}" for i in range(args.pods)]
+
+    with LocalSlackServer(latency_ms=args.latency_ms) as server:
+        clos_slack.SLACK_API_URL = server.url
+        os.environ['SLACK_TOKEN'] = 'xoxb-local'
+
+        daily_unblock = load_daily_unblock()
+        daily_unblock.SLACK_POD_CHANNELS = {pod: f"#{pod.lower()}" for pod in pods}
+
+        report = build_report(daily_unblock, args.blocked_items, pods)
+        slices = daily_unblock.build_unblock_pod_slices(
+            report, daily_unblock.group_by_pod(report['blocked_items']), pods
+        )
+
+        started_at = time.perf_counter()
+        result = daily_unblock.send_daily_unblock_to_slack(report, slices)
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+
+    threaded = sum(1 for message in server.messages if 'thread_ts' in message)
+    largest = max(len(message['blocks']) for message in server.messages)
+    print(f"status={result['status']} channels={len(result['channels'])} "
+          f"messages={len(server.messages)} thread_replies={threaded} "
+          f"largest_message={largest} blocks elapsed={elapsed_ms:.1f}ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Versioned report snapshots shared with the Slack bot and dashboard.
+#
+# Keys (all JSON strings):
+#   clos:reports:<type>:latest       full latest report, including its version
+#   clos:reports:<type>:summary      version, date and summary only
+#   clos:reports:<type>:v<version>   full report for a specific version
+#   clos:reports:<type>:pod:<pod>    latest report slice for one pod
+#   clos:reports:<type>:version      monotonically increasing version counter
+#
+# REPORT_CACHE_URL selects the store: redis://... (or rediss://) for a
+# Redis-compatible server, memory:// for the in-process stand-in. The
+# stand-in is invisible to the Slack bot, so inside Lambda an empty URL (or
+# a missing redis package) is an error rather than a silent fallback; local
+# runs and tests may leave it empty.
+
+REPORT_CACHE_URL = os.environ.get('REPORT_CACHE_URL', '')
+RUNNING_IN_LAMBDA = bool(os.environ.get('AWS_LAMBDA_FUNCTION_NAME'))
+REPORT_CACHE_TTL_SECONDS = int(os.environ.get('REPORT_CACHE_TTL_SECONDS', str(3 * 86400)))
+REPORT_CACHE_HISTORY_TTL_SECONDS = int(os.environ.get('REPORT_CACHE_HISTORY_TTL_SECONDS', str(14 * 86400)))
+KEY_PREFIX = 'clos:reports'
+
+_store = {'backend': None}
+
+class LocalReportStore:
+    """
+    In-process stand-in for Redis with the subset of commands the cache uses
+    """
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key):
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._values[key]
+            return None
+        return value
+
+    def get(self, key):
+        with self._lock:
+            return self._live(key)
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            expires_at = time.monotonic() + ex if ex else None
+            self._values[key] = (value, expires_at)
+
+    def incr(self, key):
+        with self._lock:
+            value = int(self._live(key) or 0) + 1
+            self._values[key] = (str(value), None)
+            return value
+
+    def pipeline(self):
+        return LocalPipeline(self)
+
+class LocalPipeline:
+    """
+    Buffers commands and applies them together, mirroring redis-py's pipeline
+    """
+
+    def __init__(self, store):
+        self._store = store
+        self._commands = []
+
+    def set(self, key, value, ex=None):
+        self._commands.append((key, value, ex))
+        return self
+
+    def execute(self):
+        for key, value, ex in self._commands:
+            self._store.set(key, value, ex=ex)
+        self._commands = []
+
+def get_store():
+    """
+    Get the module-scope cache client, created on first use
+    """
+    if _store['backend'] is not None:
+        return _store['backend']
+
+    if REPORT_CACHE_URL.startswith(('redis://', 'rediss://')):
+        try:
+            import redis
+            _store['backend'] = redis.Redis.from_url(
+                REPORT_CACHE_URL,
+                decode_responses=True,
+                socket_timeout=2,
+                socket_connect_timeout=2
+            )
+        except ImportError:
+            if RUNNING_IN_LAMBDA:
+                raise RuntimeError("redis package not installed, cannot reach REPORT_CACHE_URL")
+            logger.warning("redis package not installed, using in-process report cache")
+            _store['backend'] = LocalReportStore()
+    elif REPORT_CACHE_URL == 'memory://' or (not REPORT_CACHE_URL and not RUNNING_IN_LAMBDA):
+        _store['backend'] = LocalReportStore()
+    else:
+        raise RuntimeError("REPORT_CACHE_URL must be a redis:// or rediss:// URL inside Lambda")
+
+    return _store['backend']
+
+def report_key(report_type, *parts):
+    """
+    Build a cache key under the report namespace
+    """
+    return ':'.join([KEY_PREFIX, report_type] + [str(part) for part in parts])
+
+def publish_report(report_type, report, pod_slices=None):
+    """
+    Write a new version of a report under its stable keys.
+
+    pod_slices maps pod name to the part of the report relevant to that
+    pod. Returns the new version, or None if the cache is unavailable.
+    """
+    try:
+        store = get_store()
+        version = store.incr(report_key(report_type, 'version'))
+        published_at = time.time()
+
+        payload = dict(report, version=version, published_at=published_at)
+        report_json = json.dumps(payload, default=str)
+
+        pipe = store.pipeline()
+        pipe.set(report_key(report_type, 'latest'), report_json, ex=REPORT_CACHE_TTL_SECONDS)
+        pipe.set(report_key(report_type, f'v{version}'), report_json, ex=REPORT_CACHE_HISTORY_TTL_SECONDS)
+        pipe.set(report_key(report_type, 'summary'), json.dumps({
+            'version': version,
+            'published_at': published_at,
+            'date': report.get('date'),
+            'summary': report.get('summary', {})
+        }, default=str), ex=REPORT_CACHE_TTL_SECONDS)
+
+        for pod_name, pod_slice in (pod_slices or {}).items():
+            pipe.set(
+                report_key(report_type, 'pod', pod_name),
+                json.dumps(dict(pod_slice, version=version, published_at=published_at), default=str),
+                ex=REPORT_CACHE_TTL_SECONDS
+            )
+
+        pipe.execute()
+        logger.info(f"Published {report_type} report version {version}")
+        return version
+
+    except Exception as e:
+        # Interactive readers fall back to the API, so a cache outage must not fail the report
+        logger.error(f"Failed to publish {report_type} report to cache: {str(e)}")
+        return None
+
+def read_json(key):
+    """
+    Read and decode one cached JSON value
+    """
+    try:
+        value = get_store().get(key)
+        return json.loads(value) if value else None
+
+    except Exception as e:
+        logger.error(f"Failed to read {key} from report cache: {str(e)}")
+        return None
+
+def get_latest_report(report_type):
+    """
+    Get the latest full report
+    """
+    return read_json(report_key(report_type, 'latest'))
+
+def get_report_summary(report_type):
+    """
+    Get the latest report summary without the item lists
+    """
+    return read_json(report_key(report_type, 'summary'))
+
+def get_report_version(report_type, version):
+    """
+    Get a specific report version while it is retained
+    """
+    return read_json(report_key(report_type, f'v{version}'))
+
+def get_pod_report(report_type, pod_name):
+    """
+    Get the latest report slice for one pod
+    """
+    return read_json(report_key(report_type, 'pod', pod_name))
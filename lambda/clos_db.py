@@ -0,0 +1,436 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import psycopg2
+from contextlib import contextmanager
+from psycopg2 import extensions
+
+import clos_runtime
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Shared database connection manager for the CLOS lambdas.
+#
+# Secrets and connections live at module scope so warm invocations reuse
+# them instead of calling Secrets Manager and opening a new connection on
+# every request.
+#
+# Connections are pooled per role. Writes use the primary (RDS_ENDPOINT);
+# report reads can ask for the replica (RDS_READER_ENDPOINT), which is used
+# only while its measured lag is within REPLICA_MAX_LAG_SECONDS and falls
+# back to the primary otherwise. Pointing both endpoints at one local
+# Postgres exercises the replica path without a real standby.
+
+SECRET_CACHE_TTL_SECONDS = int(os.environ.get('SECRET_CACHE_TTL_SECONDS', '300'))
+HEALTH_CHECK_INTERVAL_SECONDS = int(os.environ.get('DB_HEALTH_CHECK_INTERVAL_SECONDS', '30'))
+CONNECT_TIMEOUT_SECONDS = int(os.environ.get('DB_CONNECT_TIMEOUT_SECONDS', '5'))
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '4'))
+REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', '30'))
+REPLICA_LAG_CHECK_INTERVAL_SECONDS = int(os.environ.get('REPLICA_LAG_CHECK_INTERVAL_SECONDS', '30'))
+
+PRIMARY = 'primary'
+REPLICA = 'replica'
+
+# Tried in order until one works on the reader; the first that succeeds is remembered
+REPLICA_LAG_QUERIES = [
+    # Aurora PostgreSQL (the cluster in database.tf)
+    """
+    SELECT COALESCE(replica_lag_in_msec, 0) / 1000.0
+    FROM aurora_replica_status()
+    WHERE server_id = aurora_db_instance_identifier()
+    """,
+    # Streaming replication; a primary or a caught-up standby reports no lag
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM NOW() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+]
+
+_secret_cache = {
+    'value': None,
+    'version_id': None,
+    'fetched_at': None
+}
+_secret_lock = threading.Lock()
+
+# One connection state per (role, pool slot); primary slot 0 is the default connection
+_connections = {}
+
+_free_slots = {PRIMARY: queue.Queue(), REPLICA: queue.Queue()}
+for _slot in range(DB_POOL_SIZE):
+    _free_slots[PRIMARY].put(_slot)
+    _free_slots[REPLICA].put(_slot)
+
+_replica_status = {
+    'usable': True,
+    'lag_seconds': None,
+    'checked_at': None,
+    'lag_query': None
+}
+_replica_lock = threading.Lock()
+
+def get_connection_state(slot=0, role=PRIMARY):
+    """
+    Get the cached state for a pool slot
+    """
+    return _connections.setdefault((role, slot), {
+        'conn': None,
+        'last_used_at': None,
+        'prepared': set()
+    })
+
+def get_db_config(role=PRIMARY):
+    """
+    Read connection settings from the environment
+    """
+    primary_host = os.environ.get('RDS_ENDPOINT') or os.environ.get('DATABASE_HOST', 'localhost')
+    reader_host = os.environ.get('RDS_READER_ENDPOINT') or os.environ.get('DATABASE_READ_HOST', '')
+
+    return {
+        'host': reader_host if role == REPLICA and reader_host else primary_host,
+        'reader_host': reader_host,
+        'database': os.environ.get('DATABASE_NAME', 'clos'),
+        'port': int(os.environ.get('DATABASE_PORT', '5432')),
+        'secret_arn': os.environ.get('SECRET_ARN', '')
+    }
+
+def get_db_secret(force_refresh=False):
+    """
+    Get database credentials, cached for SECRET_CACHE_TTL_SECONDS
+    """
+    with _secret_lock:
+        now = time.monotonic()
+        fetched_at = _secret_cache['fetched_at']
+
+        if (not force_refresh and _secret_cache['value'] is not None
+                and now - fetched_at < SECRET_CACHE_TTL_SECONDS):
+            return _secret_cache['value']
+
+        return fetch_db_secret(now)
+
+def fetch_db_secret(now):
+    """
+    Fetch credentials from Secrets Manager (or the local environment) into the cache
+    """
+    secret_arn = get_db_config()['secret_arn']
+    if secret_arn:
+        secrets_client = clos_runtime.get_client('secretsmanager')
+        secret_response = secrets_client.get_secret_value(SecretId=secret_arn)
+        secret = json.loads(secret_response['SecretString'])
+        version_id = secret_response.get('VersionId')
+    else:
+        # Local development without Secrets Manager
+        secret = {
+            'username': os.environ.get('DATABASE_USER', 'postgres'),
+            'password': os.environ.get('DATABASE_PASSWORD', '')
+        }
+        version_id = 'local'
+
+    if _secret_cache['version_id'] and version_id != _secret_cache['version_id']:
+        logger.info("Database secret rotated, new connections will use the new version")
+
+    _secret_cache['value'] = secret
+    _secret_cache['version_id'] = version_id
+    _secret_cache['fetched_at'] = now
+
+    return secret
+
+def open_connection(config=None, secret=None, role=PRIMARY):
+    """
+    Open a new psycopg2 connection, refreshing the secret once if authentication fails
+    """
+    config = config or get_db_config(role)
+    secret = secret or get_db_secret()
+
+    def connect(credentials):
+        return psycopg2.connect(
+            host=config['host'],
+            database=config['database'],
+            user=credentials['username'],
+            password=credentials['password'],
+            port=config['port'],
+            connect_timeout=CONNECT_TIMEOUT_SECONDS
+        )
+
+    try:
+        return connect(secret)
+    except psycopg2.OperationalError as e:
+        if 'authentication failed' not in str(e):
+            raise
+
+        # The secret may have been rotated since it was cached
+        logger.warning("Database authentication failed, refreshing secret")
+        return connect(get_db_secret(force_refresh=True))
+
+def close_connection(slot=0, role=PRIMARY):
+    """
+    Close and forget the cached connection for a pool slot
+    """
+    state = get_connection_state(slot, role)
+    conn = state['conn']
+    state['conn'] = None
+    state['last_used_at'] = None
+    state['prepared'] = set()
+
+    if conn is not None and not conn.closed:
+        try:
+            conn.close()
+        except psycopg2.Error as e:
+            logger.warning(f"Failed to close database connection: {str(e)}")
+
+def close_all_connections():
+    """
+    Close every cached connection
+    """
+    for role, slot in list(_connections):
+        close_connection(slot, role)
+
+def is_connection_healthy(conn, last_used_at):
+    """
+    Check the cached connection, pinging the server only after it has been idle a while
+    """
+    if conn is None or conn.closed:
+        return False
+
+    if last_used_at is not None and time.monotonic() - last_used_at < HEALTH_CHECK_INTERVAL_SECONDS:
+        return True
+
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT 1")
+        cur.fetchone()
+        cur.close()
+        if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+            conn.rollback()
+        return True
+
+    except psycopg2.Error as e:
+        logger.warning(f"Cached database connection failed health check: {str(e)}")
+        return False
+
+def get_connection(statements=None, slot=0, role=PRIMARY):
+    """
+    Get the warm, health-checked connection for this container.
+
+    statements maps statement names to SQL; each is prepared once per
+    connection so report queries can be run with execute_prepared.
+    """
+    state = get_connection_state(slot, role)
+    conn = state['conn']
+
+    if not is_connection_healthy(conn, state['last_used_at']):
+        if conn is not None:
+            logger.info(f"Reconnecting to {role} database")
+        close_connection(slot, role)
+
+        started_at = time.monotonic()
+        conn = open_connection(role=role)
+        if role == REPLICA:
+            # Guards against writes through the reader, including when one instance poses as both
+            conn.set_session(readonly=True)
+        state['conn'] = conn
+        logger.info(f"Opened {role} database connection in {(time.monotonic() - started_at) * 1000:.1f}ms")
+
+    if statements:
+        prepare_statements(conn, statements, state['prepared'])
+
+    state['last_used_at'] = time.monotonic()
+    return conn
+
+def replica_configured():
+    """
+    Check whether a separate read endpoint is configured
+    """
+    return bool(get_db_config()['reader_host'])
+
+def read_staleness_bound_seconds():
+    """
+    Upper bound on how far behind the primary replica reads can be
+    """
+    return REPLICA_MAX_LAG_SECONDS if replica_configured() else 0
+
+def replica_check_due():
+    """
+    Check whether the cached replica status has expired
+    """
+    checked_at = _replica_status['checked_at']
+    return checked_at is None or time.monotonic() - checked_at >= REPLICA_LAG_CHECK_INTERVAL_SECONDS
+
+def replica_routable():
+    """
+    Check whether replica reads may be attempted, without touching the network
+    """
+    return replica_configured() and (_replica_status['usable'] or replica_check_due())
+
+def set_replica_status(usable, lag_seconds=None):
+    """
+    Record the outcome of a replica check, logging when routing changes
+    """
+    if usable != _replica_status['usable']:
+        if usable:
+            logger.info(f"Read replica back within lag threshold ({lag_seconds:.1f}s), routing reads to it")
+        else:
+            logger.warning(f"Read replica unusable (lag {lag_seconds}s), routing reads to the primary")
+
+    _replica_status['usable'] = usable
+    _replica_status['lag_seconds'] = lag_seconds
+    _replica_status['checked_at'] = time.monotonic()
+
+def measure_replica_lag(conn):
+    """
+    Measure replication lag in seconds on a replica connection
+    """
+    queries = REPLICA_LAG_QUERIES
+    if _replica_status['lag_query'] is not None:
+        queries = [REPLICA_LAG_QUERIES[_replica_status['lag_query']]]
+
+    cur = conn.cursor()
+    try:
+        for sql in queries:
+            try:
+                cur.execute(sql)
+                row = cur.fetchone()
+            except psycopg2.Error:
+                conn.rollback()
+                continue
+
+            if row is not None:
+                _replica_status['lag_query'] = REPLICA_LAG_QUERIES.index(sql)
+                return float(row[0] or 0)
+
+        raise psycopg2.OperationalError("No replica lag query is supported by the read endpoint")
+    finally:
+        cur.close()
+        if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+            conn.rollback()
+
+def check_replica_lag(conn):
+    """
+    Decide whether a replica connection is fresh enough, re-measuring at most every check interval
+    """
+    with _replica_lock:
+        if not replica_check_due():
+            return _replica_status['usable']
+
+        lag_seconds = measure_replica_lag(conn)
+        set_replica_status(lag_seconds <= REPLICA_MAX_LAG_SECONDS, lag_seconds)
+        return _replica_status['usable']
+
+def borrow_connection(statements, role):
+    """
+    Take a pool slot and its connection, falling back from replica to primary
+    """
+    if role == REPLICA:
+        if replica_routable():
+            slot = _free_slots[REPLICA].get()
+            try:
+                conn = get_connection(statements, slot=slot, role=REPLICA)
+                if check_replica_lag(conn):
+                    return REPLICA, slot, conn
+                release_connection(conn)
+            except psycopg2.Error as e:
+                logger.warning(f"Read replica connection failed: {str(e)}")
+                close_connection(slot, REPLICA)
+                with _replica_lock:
+                    set_replica_status(False)
+            except Exception:
+                _free_slots[REPLICA].put(slot)
+                raise
+            _free_slots[REPLICA].put(slot)
+        role = PRIMARY
+
+    slot = _free_slots[PRIMARY].get()
+    try:
+        return PRIMARY, slot, get_connection(statements, slot=slot, role=PRIMARY)
+    except Exception:
+        _free_slots[PRIMARY].put(slot)
+        raise
+
+@contextmanager
+def pooled_connection(statements=None, role=PRIMARY):
+    """
+    Borrow a connection from the small module-scope pool.
+
+    Blocks until one of the DB_POOL_SIZE slots is free, so each thread
+    has a connection to itself. role=REPLICA routes read-only work to the
+    read endpoint when it is configured and within the lag threshold.
+    """
+    role, slot, conn = borrow_connection(statements, role)
+    try:
+        yield conn
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        if conn is not None:
+            release_connection(conn, failed=True)
+            conn = None
+        raise
+    finally:
+        if conn is not None:
+            release_connection(conn)
+        _free_slots[role].put(slot)
+
+def prepare_statements(conn, statements, prepared):
+    """
+    PREPARE any statements not yet prepared on a connection
+    """
+    pending = {name: sql for name, sql in statements.items() if name not in prepared}
+    if not pending:
+        return
+
+    cur = conn.cursor()
+    try:
+        for name, sql in pending.items():
+            cur.execute(f"PREPARE {name} AS {sql}")
+        conn.commit()
+    except psycopg2.Error:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+    prepared.update(pending)
+
+def execute_prepared(cursor, name, params=None):
+    """
+    Execute a statement prepared with prepare_statements
+    """
+    if params:
+        placeholders = ', '.join(['%s'] * len(params))
+        cursor.execute(f"EXECUTE {name} ({placeholders})", params)
+    else:
+        cursor.execute(f"EXECUTE {name}")
+
+def release_connection(conn, failed=False):
+    """
+    Return the cached connection for reuse by the next invocation.
+
+    Any open transaction is rolled back so the connection is never left
+    idle in transaction between invocations. Pass failed=True after a
+    connection-level error to drop it instead.
+    """
+    if conn is None:
+        return
+
+    key = next((key for key, state in _connections.items() if state['conn'] is conn), None)
+    if key is None:
+        conn.close()
+        return
+
+    role, slot = key
+    if failed or conn.closed:
+        close_connection(slot, role)
+        return
+
+    try:
+        if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+            conn.rollback()
+        _connections[key]['last_used_at'] = time.monotonic()
+    except psycopg2.Error as e:
+        logger.warning(f"Failed to reset database connection: {str(e)}")
+        close_connection(slot, role)
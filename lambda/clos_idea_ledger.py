@@ -0,0 +1,295 @@
+"""
+Bulk loader for the idea ledger CSV (idea-ledger-seed.csv format).
+
+Streams the CSV in chunks, resolves Pod and Owner to pods/users IDs through
+a cached lookup, and COPYs the normalised rows into a temporary staging
+table. One set-based INSERT ... ON CONFLICT then merges staging into ideas,
+keyed on ledger_key (a hash of title and pod), so re-importing a ledger
+updates ideas in place instead of duplicating them.
+
+    DATABASE_HOST=localhost DATABASE_USER=postgres DATABASE_PASSWORD=postgres \\
+        python lambda/clos_idea_ledger.py idea-ledger-seed.csv
+"""
+import argparse
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+
+import clos_db
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+LEDGER_CHUNK_ROWS = int(os.environ.get('LEDGER_CHUNK_ROWS', '5000'))
+LEDGER_LOOKUP_TTL_SECONDS = int(os.environ.get('LEDGER_LOOKUP_TTL_SECONDS', '300'))
+# Rejected rows reported back in full; the rest are only counted
+LEDGER_MAX_REPORTED_ERRORS = 20
+
+LEDGER_COLUMNS = [
+    'Title', 'Problem Statement', 'Hypothesis', 'Impact', 'Effort', 'Strategic Fit',
+    'Gate', 'Pod', 'Owner', 'Kill Criteria', 'Tags'
+]
+
+# Stage gate → ideas.status; the gate itself is kept in metadata
+GATE_STATUSES = {
+    'spark': 'pending',
+    'seed': 'pending',
+    'parked': 'pending',
+    'scaffold': 'evaluating',
+    'ship': 'approved',
+    'scale': 'approved',
+    'killed': 'rejected'
+}
+
+# Notion exports scores as "4 - High"; the seed file as "4"
+SCORE_PATTERN = re.compile(r'^\s*([1-5])\b')
+
+STAGING_COLUMNS = [
+    'line_number', 'ledger_key', 'title', 'description', 'pod_id', 'submitted_by', 'status', 'tags', 'metadata'
+]
+
+STAGING_TABLE_SQL = """
+    CREATE TEMP TABLE idea_ledger_staging (
+        line_number INTEGER NOT NULL,
+        ledger_key CHAR(64) NOT NULL,
+        title VARCHAR(500) NOT NULL,
+        description TEXT,
+        pod_id UUID,
+        submitted_by UUID,
+        status idea_status NOT NULL,
+        tags JSONB NOT NULL,
+        metadata JSONB NOT NULL
+    ) ON COMMIT DROP
+"""
+
+# The last row wins when a ledger lists the same idea twice
+MERGE_SQL = """
+    INSERT INTO ideas (ledger_key, title, description, pod_id, submitted_by, status, tags, metadata, updated_at)
+    SELECT DISTINCT ON (ledger_key)
+        ledger_key, title, description, pod_id, submitted_by, status, tags, metadata, NOW()
+    FROM idea_ledger_staging
+    ORDER BY ledger_key, line_number DESC
+    ON CONFLICT (ledger_key) DO UPDATE SET
+        title = EXCLUDED.title,
+        description = EXCLUDED.description,
+        pod_id = EXCLUDED.pod_id,
+        submitted_by = COALESCE(EXCLUDED.submitted_by, ideas.submitted_by),
+        status = EXCLUDED.status,
+        tags = EXCLUDED.tags,
+        metadata = COALESCE(ideas.metadata, '{}') || EXCLUDED.metadata,
+        updated_at = NOW()
+    RETURNING (xmax = 0) as inserted
+"""
+
+# Pod and user IDs, shared across loads while warm
+_lookup_cache = {'pods': None, 'users': None, 'loaded_at': 0.0}
+_lookup_lock = threading.Lock()
+
+class LedgerRowError(ValueError):
+    """
+    Raised for a ledger row that can't be loaded
+    """
+    pass
+
+def get_lookups(cur):
+    """
+    Pod name → id and owner handle → user id, cached for LEDGER_LOOKUP_TTL_SECONDS
+    """
+    with _lookup_lock:
+        if _lookup_cache['pods'] is not None and time.monotonic() - _lookup_cache['loaded_at'] < LEDGER_LOOKUP_TTL_SECONDS:
+            return _lookup_cache['pods'], _lookup_cache['users']
+
+        cur.execute("SELECT lower(name), id FROM pods")
+        pods = {name: str(pod_id) for name, pod_id in cur.fetchall()}
+
+        # Owners are written as @handle: match the email local part, then the name
+        cur.execute("SELECT lower(split_part(email, '@', 1)), lower(name), id FROM users WHERE active")
+        users = {}
+        for local_part, name, user_id in cur.fetchall():
+            users.setdefault(local_part, str(user_id))
+            users.setdefault(name, str(user_id))
+            users.setdefault(name.replace(' ', '-'), str(user_id))
+
+        _lookup_cache.update(pods=pods, users=users, loaded_at=time.monotonic())
+        return pods, users
+
+def parse_score(row, column):
+    """
+    Read a 1-5 score column
+    """
+    match = SCORE_PATTERN.match(row.get(column) or '')
+    if not match:
+        raise LedgerRowError(f"{column} must be 1-5, got {row.get(column)!r}")
+    return int(match.group(1))
+
+def parse_tags(value):
+    """
+    Split "AI/ML,Customer-Facing" into a de-duplicated list, keeping order
+    """
+    tags = []
+    for tag in (value or '').split(','):
+        tag = tag.strip()
+        if tag and tag not in tags:
+            tags.append(tag)
+    return tags
+
+def ledger_key(title, pod_name):
+    """
+    Stable identity of a ledger idea across imports
+    """
+    normalised = f"{' '.join(title.lower().split())}|{pod_name.strip().lower()}"
+    return hashlib.sha256(normalised.encode('utf-8')).hexdigest()
+
+def transform_row(line_number, row, pods, users):
+    """
+    Turn one CSV row into a staging row; unknown pods and owners load with NULL IDs
+    """
+    title = (row.get('Title') or '').strip()
+    if not title:
+        raise LedgerRowError("Title is required")
+
+    gate = (row.get('Gate') or 'Spark').strip()
+    status = GATE_STATUSES.get(gate.lower())
+    if status is None:
+        raise LedgerRowError(f"Unknown gate {gate!r}")
+
+    pod_name = (row.get('Pod') or '').strip()
+    owner = (row.get('Owner') or '').strip()
+    metadata = {
+        'source': 'idea_ledger',
+        'hypothesis': (row.get('Hypothesis') or '').strip(),
+        'impact': parse_score(row, 'Impact'),
+        'effort': parse_score(row, 'Effort'),
+        'strategic_fit': parse_score(row, 'Strategic Fit'),
+        'gate': gate,
+        'kill_criteria': (row.get('Kill Criteria') or '').strip(),
+        'pod': pod_name,
+        'owner': owner
+    }
+
+    return [
+        line_number,
+        ledger_key(title, pod_name),
+        title[:500],
+        (row.get('Problem Statement') or '').strip(),
+        pods.get(pod_name.lower()),
+        users.get(owner.lstrip('@').lower()),
+        status,
+        json.dumps(parse_tags(row.get('Tags'))),
+        json.dumps(metadata)
+    ]
+
+def copy_chunk(cur, buffer):
+    """
+    COPY one chunk of staging rows
+    """
+    buffer.seek(0)
+    cur.copy_expert(
+        f"COPY idea_ledger_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer
+    )
+
+def load_idea_ledger(conn, csv_file, chunk_rows=None):
+    """
+    Load an idea ledger CSV into ideas in one transaction.
+
+    Rows are parsed and COPYed in chunks of chunk_rows, so memory stays flat
+    however large the file is. Invalid rows are skipped and reported with
+    their line numbers. Returns row counts and throughput.
+    """
+    chunk_rows = chunk_rows or LEDGER_CHUNK_ROWS
+    started_at = time.perf_counter()
+    result = {'rows_read': 0, 'rows_staged': 0, 'rejected': 0, 'errors': [],
+              'unmatched_pods': set(), 'unmatched_owners': set()}
+
+    reader = csv.DictReader(csv_file)
+    missing = [column for column in LEDGER_COLUMNS if column not in (reader.fieldnames or [])]
+    if missing:
+        raise LedgerRowError(f"Missing ledger columns: {', '.join(missing)}")
+
+    cur = conn.cursor()
+    try:
+        pods, users = get_lookups(cur)
+        cur.execute(STAGING_TABLE_SQL)
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        pending = 0
+        # Line 1 is the header
+        for line_number, row in enumerate(reader, start=2):
+            result['rows_read'] += 1
+            try:
+                staging_row = transform_row(line_number, row, pods, users)
+            except LedgerRowError as e:
+                result['rejected'] += 1
+                if len(result['errors']) < LEDGER_MAX_REPORTED_ERRORS:
+                    result['errors'].append({'line': line_number, 'error': str(e)})
+                continue
+
+            if staging_row[4] is None and row.get('Pod'):
+                result['unmatched_pods'].add(row['Pod'].strip())
+            if staging_row[5] is None and row.get('Owner'):
+                result['unmatched_owners'].add(row['Owner'].strip())
+
+            writer.writerow(staging_row)
+            pending += 1
+            if pending >= chunk_rows:
+                copy_chunk(cur, buffer)
+                result['rows_staged'] += pending
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
+
+        if pending:
+            copy_chunk(cur, buffer)
+            result['rows_staged'] += pending
+        staged_at = time.perf_counter()
+
+        cur.execute(MERGE_SQL)
+        outcomes = [row[0] for row in cur.fetchall()]
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+    finished_at = time.perf_counter()
+    elapsed = finished_at - started_at
+    result.update({
+        'inserted': sum(1 for inserted in outcomes if inserted),
+        'updated': sum(1 for inserted in outcomes if not inserted),
+        'unmatched_pods': sorted(result['unmatched_pods']),
+        'unmatched_owners': sorted(result['unmatched_owners']),
+        'stage_ms': round((staged_at - started_at) * 1000, 1),
+        'merge_ms': round((finished_at - staged_at) * 1000, 1),
+        'rows_per_second': round(result['rows_read'] / elapsed) if elapsed else None
+    })
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('path', help='idea ledger CSV file')
+    parser.add_argument('--chunk-rows', type=int, default=LEDGER_CHUNK_ROWS)
+    args = parser.parse_args()
+
+    logging.basicConfig()
+    conn = clos_db.open_connection()
+    try:
+        with open(args.path, newline='', encoding='utf-8-sig') as csv_file:
+            result = load_idea_ledger(conn, csv_file, chunk_rows=args.chunk_rows)
+    except LedgerRowError as e:
+        sys.exit(str(e))
+    finally:
+        conn.close()
+
+    print(json.dumps(result, indent=2))
+
+if __name__ == '__main__':
+    main()
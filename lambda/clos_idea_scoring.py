@@ -0,0 +1,204 @@
+"""
+Vectorized idea scoring and ranking.
+
+Loads every idea's Impact, Effort and Strategic Fit (from the ledger
+metadata) column-wise, computes weighted scores and per-pod, per-gate
+ranks with NumPy in one pass, and writes back only the ideas whose score
+or rank changed, in one UPDATE ... FROM (VALUES ...).
+
+    DATABASE_HOST=localhost DATABASE_USER=postgres DATABASE_PASSWORD=postgres \\
+        python lambda/clos_idea_scoring.py --weights impact=0.5,strategic_fit=0.3,effort=0.2
+    python lambda/clos_idea_scoring.py --benchmark 100000
+"""
+import argparse
+import json
+import logging
+import os
+import time
+
+import numpy as np
+from psycopg2.extras import execute_values
+
+import clos_db
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Weights of the 1-5 ledger scores; effort counts inverted (low effort scores high)
+DEFAULT_SCORE_WEIGHTS = {'impact': 0.4, 'strategic_fit': 0.4, 'effort': 0.2}
+IDEA_SCORE_WEIGHTS = json.loads(os.environ.get('IDEA_SCORE_WEIGHTS') or json.dumps(DEFAULT_SCORE_WEIGHTS))
+
+# One row of arrays, one per column, so loading 100k ideas is a single fetch
+LOAD_COLUMNS_SQL = """
+    SELECT
+        COALESCE(array_agg(i.id::text ORDER BY i.id), '{}'),
+        COALESCE(array_agg(COALESCE(i.pod_id::text, i.metadata->>'pod', '') ORDER BY i.id), '{}'),
+        COALESCE(array_agg(COALESCE(i.metadata->>'gate', i.status::text) ORDER BY i.id), '{}'),
+        COALESCE(array_agg(COALESCE((i.metadata->>'impact')::float8, 'NaN') ORDER BY i.id), '{}'),
+        COALESCE(array_agg(COALESCE((i.metadata->>'effort')::float8, 'NaN') ORDER BY i.id), '{}'),
+        COALESCE(array_agg(COALESCE((i.metadata->>'strategic_fit')::float8, 'NaN') ORDER BY i.id), '{}'),
+        COALESCE(array_agg(COALESCE(i.evaluation_score::float8, 'NaN') ORDER BY i.id), '{}'),
+        COALESCE(array_agg(COALESCE(i.evaluation_rank, 0) ORDER BY i.id), '{}')
+    FROM ideas i
+"""
+
+UPDATE_SQL = """
+    UPDATE ideas i SET
+        evaluation_score = v.score,
+        evaluation_rank = v.rank
+    FROM (VALUES %s) AS v(id, score, rank)
+    WHERE i.id = v.id
+"""
+
+def parse_weights(text):
+    """
+    Parse "impact=0.5,strategic_fit=0.3,effort=0.2" into a weights dict
+    """
+    weights = dict(DEFAULT_SCORE_WEIGHTS)
+    for part in text.split(','):
+        name, _, value = part.partition('=')
+        if name.strip() not in DEFAULT_SCORE_WEIGHTS:
+            raise ValueError(f"Unknown score weight {name.strip()!r}")
+        weights[name.strip()] = float(value)
+    return weights
+
+def compute_scores(columns, weights=None):
+    """
+    Weighted scores (1-5, two decimals) and ranks within each pod and gate.
+
+    columns holds equal-length arrays: id, pod, gate, impact, effort,
+    strategic_fit. Ideas missing any input get a NaN score and rank 0;
+    ranks are 1-based, best first, ties broken by id.
+    """
+    weights = weights or IDEA_SCORE_WEIGHTS
+    total_weight = sum(weights.values())
+    if total_weight <= 0:
+        raise ValueError("Score weights must add up to more than zero")
+
+    scores = (
+        weights['impact'] * columns['impact']
+        + weights['strategic_fit'] * columns['strategic_fit']
+        + weights['effort'] * (6 - columns['effort'])
+    ) / total_weight
+    scores = np.round(scores, 2)
+    scored = ~np.isnan(scores)
+
+    # Group by (pod, gate), best score first, unscored ideas last
+    groups = np.char.add(np.char.add(columns['pod'], '|'), columns['gate'])
+    _, group_codes = np.unique(groups, return_inverse=True)
+    sort_scores = np.where(scored, -scores, np.inf)
+    order = np.lexsort((columns['id'], sort_scores, group_codes))
+
+    positions = np.arange(len(order))
+    sorted_codes = group_codes[order]
+    group_starts = np.ones(len(order), dtype=bool)
+    group_starts[1:] = sorted_codes[1:] != sorted_codes[:-1]
+    first_in_group = np.maximum.accumulate(np.where(group_starts, positions, 0))
+
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = positions - first_in_group + 1
+    ranks[~scored] = 0
+    return scores, ranks
+
+def load_idea_columns(cur):
+    """
+    Load the scoring inputs for every idea as NumPy arrays
+    """
+    cur.execute(LOAD_COLUMNS_SQL)
+    ids, pods, gates, impact, effort, fit, current_scores, current_ranks = cur.fetchone()
+    return {
+        'id': np.array(ids, dtype=str),
+        'pod': np.array(pods, dtype=str),
+        'gate': np.array(gates, dtype=str),
+        'impact': np.array(impact, dtype=np.float64),
+        'effort': np.array(effort, dtype=np.float64),
+        'strategic_fit': np.array(fit, dtype=np.float64),
+        'current_score': np.array(current_scores, dtype=np.float64),
+        'current_rank': np.array(current_ranks, dtype=np.int64)
+    }
+
+def changed_rows(columns, scores, ranks):
+    """
+    (id, score, rank) for ideas whose stored score or rank differs
+    """
+    same_score = (scores == columns['current_score']) | (np.isnan(scores) & np.isnan(columns['current_score']))
+    changed = ~same_score | (ranks != columns['current_rank'])
+    return [
+        (str(idea_id), None if np.isnan(score) else float(score), int(rank) or None)
+        for idea_id, score, rank in zip(columns['id'][changed], scores[changed], ranks[changed])
+    ]
+
+def rescore_ideas(conn, weights=None, dry_run=False):
+    """
+    Rescore and rerank every idea; returns counts and per-phase timings in milliseconds
+    """
+    timings = {}
+    cur = conn.cursor()
+    try:
+        started_at = time.perf_counter()
+        columns = load_idea_columns(cur)
+        timings['load_ms'] = round((time.perf_counter() - started_at) * 1000, 1)
+
+        started_at = time.perf_counter()
+        scores, ranks = compute_scores(columns, weights)
+        rows = changed_rows(columns, scores, ranks)
+        timings['score_ms'] = round((time.perf_counter() - started_at) * 1000, 1)
+
+        started_at = time.perf_counter()
+        if rows and not dry_run:
+            execute_values(cur, UPDATE_SQL, rows, template='(%s::uuid, %s::numeric, %s::integer)', page_size=len(rows))
+        conn.commit()
+        timings['write_ms'] = round((time.perf_counter() - started_at) * 1000, 1)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+    return {
+        'dry_run': dry_run,
+        'ideas': len(columns['id']),
+        'scored': int(np.count_nonzero(~np.isnan(scores))),
+        'changed': len(rows),
+        'timings_ms': timings
+    }
+
+def synthetic_columns(count, seed=7):
+    """
+    Random ledger-shaped inputs for timing compute_scores without a database
+    """
+    rng = np.random.default_rng(seed)
+    return {
+        'id': np.char.add('idea-', np.arange(count).astype(str)),
+        'pod': rng.choice(['Ratio', 'Nanda', 'Meta', 'Paintbox', 'PromoterOS'], count),
+        'gate': rng.choice(['Spark', 'Seed', 'Scaffold', 'Ship', 'Scale'], count),
+        'impact': rng.integers(1, 6, count).astype(np.float64),
+        'effort': rng.integers(1, 6, count).astype(np.float64),
+        'strategic_fit': rng.integers(1, 6, count).astype(np.float64)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--weights', type=parse_weights, help='e.g. impact=0.5,strategic_fit=0.3,effort=0.2')
+    parser.add_argument('--dry-run', action='store_true')
+    parser.add_argument('--benchmark', type=int, metavar='N', help='time scoring N synthetic ideas, no database')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        columns = synthetic_columns(args.benchmark)
+        timings = []
+        for _ in range(5):
+            started_at = time.perf_counter()
+            compute_scores(columns, args.weights)
+            timings.append((time.perf_counter() - started_at) * 1000)
+        print(f"Scored and ranked {args.benchmark} ideas: best {min(timings):.1f}ms, worst {max(timings):.1f}ms")
+        return
+
+    conn = clos_db.open_connection()
+    try:
+        print(json.dumps(rescore_ideas(conn, args.weights, args.dry_run), indent=2))
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    main()
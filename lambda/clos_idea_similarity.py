@@ -0,0 +1,219 @@
+"""
+Near-duplicate idea detection with MinHash signatures and LSH banding.
+
+Each idea's title and problem statement are shingled into character
+5-grams and summarised by a 128-value MinHash signature; the fraction of
+equal values between two signatures estimates the Jaccard similarity of
+their shingle sets. The signature is split into 32 bands of 4, and each
+band hashes to a bucket key, so ideas sharing a bucket are the only
+candidates compared. Signatures and bucket keys live in ideas.metadata
+('minhash', 'lsh_bands'), where the GIN index on metadata finds
+candidates with @> lookups instead of scanning every idea.
+
+    DATABASE_HOST=localhost DATABASE_USER=postgres DATABASE_PASSWORD=postgres \\
+        python lambda/clos_idea_similarity.py rebuild
+    python lambda/clos_idea_similarity.py check "Venue capacity planner" "Venues misprice capacity"
+"""
+import argparse
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+
+import numpy as np
+from psycopg2.extras import execute_values
+
+import clos_db
+import clos_jsonb
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+SHINGLE_SIZE = 5
+LSH_BANDS = 32
+LSH_ROWS = 4
+NUM_PERMUTATIONS = LSH_BANDS * LSH_ROWS
+# Bump when any of the above change so stored signatures are rebuilt
+MINHASH_VERSION = 1
+# With 32 bands of 4, pairs above ~0.5 similarity almost always share a bucket
+DUPLICATE_THRESHOLD = 0.5
+
+MERSENNE_PRIME = (1 << 31) - 1
+_permutation_rng = random.Random(0x1dea)
+PERMUTATION_A = np.array([_permutation_rng.randrange(1, MERSENNE_PRIME) for _ in range(NUM_PERMUTATIONS)], dtype=np.uint64)
+PERMUTATION_B = np.array([_permutation_rng.randrange(0, MERSENNE_PRIME) for _ in range(NUM_PERMUTATIONS)], dtype=np.uint64)
+
+NON_WORD_PATTERN = re.compile(r'[^a-z0-9]+')
+
+# Ideas whose signature is missing, stale or from an older version; the
+# md5 matches idea_text_md5() so only changed text is re-signed
+STALE_SIGNATURES_SQL = """
+    SELECT id::text, title, description
+    FROM ideas
+    WHERE metadata->'minhash' IS NULL
+        OR (metadata->'minhash'->>'version')::int IS DISTINCT FROM %s
+        OR metadata->'minhash'->>'text_md5' IS DISTINCT FROM md5(title || COALESCE(description, ''))
+"""
+
+UPDATE_SIGNATURES_SQL = """
+    UPDATE ideas i SET
+        metadata = COALESCE(i.metadata, '{}') || jsonb_build_object('minhash', v.minhash, 'lsh_bands', v.lsh_bands)
+    FROM (VALUES %s) AS v(id, minhash, lsh_bands)
+    WHERE i.id = v.id
+"""
+
+def idea_text_md5(title, description):
+    """
+    Fingerprint of the signed text, computed the same way as STALE_SIGNATURES_SQL
+    """
+    return hashlib.md5(f"{title}{description or ''}".encode('utf-8')).hexdigest()
+
+def shingles(title, description):
+    """
+    Character shingles of the normalised title and problem statement
+    """
+    text = ' '.join(NON_WORD_PATTERN.sub(' ', f"{title} {description or ''}".lower()).split())
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+def minhash_signature(title, description):
+    """
+    MinHash signature as a list of NUM_PERMUTATIONS ints
+    """
+    hashes = np.array([
+        int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=4).digest(), 'big')
+        for shingle in shingles(title, description)
+    ], dtype=np.uint64)
+    # (a * h + b) mod p for every permutation and shingle; fits in 64 bits since a, b < 2^31 and h < 2^32
+    permuted = (PERMUTATION_A[:, None] * hashes[None, :] + PERMUTATION_B[:, None]) % MERSENNE_PRIME
+    return permuted.min(axis=1).tolist()
+
+def lsh_bands(signature):
+    """
+    One bucket key per band: the band number plus a hash of its rows
+    """
+    keys = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        digest = hashlib.blake2b(json.dumps(rows).encode('utf-8'), digest_size=6).hexdigest()
+        keys.append(f"{band:02d}{digest}")
+    return keys
+
+def signature_similarity(left, right):
+    """
+    Estimated Jaccard similarity of two signatures
+    """
+    return float(np.mean(np.array(left) == np.array(right)))
+
+def find_similar_ideas(conn, title, description, threshold=None, exclude_id=None, limit=10):
+    """
+    Ideas similar to the given text, most similar first.
+
+    Only ideas sharing at least one LSH bucket are fetched and compared,
+    so the cost follows the number of candidates, not the size of ideas.
+    """
+    threshold = DUPLICATE_THRESHOLD if threshold is None else threshold
+    signature = minhash_signature(title, description)
+    band_filter, params = clos_jsonb.any_of(*[
+        clos_jsonb.contains('i.metadata', {'lsh_bands': [key]}) for key in lsh_bands(signature)
+    ])
+
+    cur = conn.cursor()
+    try:
+        cur.execute(f"""
+        SELECT i.id::text, i.title, i.metadata->>'pod', i.metadata->'minhash'->'signature'
+        FROM ideas i
+        WHERE {band_filter}
+        """, params)
+        candidates = cur.fetchall()
+        if not conn.autocommit:
+            conn.commit()
+    finally:
+        cur.close()
+
+    matches = []
+    for idea_id, candidate_title, pod, candidate_signature in candidates:
+        if idea_id == exclude_id or not candidate_signature:
+            continue
+        similarity = signature_similarity(signature, candidate_signature)
+        if similarity >= threshold:
+            matches.append({'id': idea_id, 'title': candidate_title, 'pod': pod, 'similarity': round(similarity, 3)})
+
+    matches.sort(key=lambda match: -match['similarity'])
+    return {'candidates': len(candidates), 'matches': matches[:limit]}
+
+def rebuild_similarity_index(conn, batch_size=1000):
+    """
+    Sign ideas whose text changed (or that were never signed) and report their near-duplicates.
+
+    Unchanged ideas are skipped, so after the first run this touches only
+    new and edited ideas.
+    """
+    started_at = time.perf_counter()
+    cur = conn.cursor()
+    try:
+        cur.execute(STALE_SIGNATURES_SQL, (MINHASH_VERSION,))
+        stale = cur.fetchall()
+
+        signed = []
+        for start in range(0, len(stale), batch_size):
+            rows = []
+            for idea_id, title, description in stale[start:start + batch_size]:
+                signature = minhash_signature(title, description)
+                minhash = {
+                    'version': MINHASH_VERSION,
+                    'text_md5': idea_text_md5(title, description),
+                    'signature': signature
+                }
+                rows.append((idea_id, json.dumps(minhash), json.dumps(lsh_bands(signature))))
+                signed.append((idea_id, title, description))
+            execute_values(cur, UPDATE_SIGNATURES_SQL, rows, template='(%s::uuid, %s::jsonb, %s::jsonb)',
+                           page_size=len(rows))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+
+    duplicates = []
+    seen = set()
+    for idea_id, title, description in signed:
+        for match in find_similar_ideas(conn, title, description, exclude_id=idea_id)['matches']:
+            pair = tuple(sorted((idea_id, match['id'])))
+            if pair not in seen:
+                seen.add(pair)
+                duplicates.append({'ids': list(pair), 'titles': [title, match['title']], 'similarity': match['similarity']})
+
+    return {
+        'signed': len(signed),
+        'near_duplicates': duplicates,
+        'duration_ms': round((time.perf_counter() - started_at) * 1000, 1)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('rebuild', help='sign new and changed ideas, listing near-duplicates')
+    check = commands.add_parser('check', help='find ideas similar to a new submission')
+    check.add_argument('title')
+    check.add_argument('problem_statement', nargs='?', default='')
+    check.add_argument('--threshold', type=float, default=DUPLICATE_THRESHOLD)
+    args = parser.parse_args()
+
+    conn = clos_db.open_connection()
+    try:
+        if args.command == 'rebuild':
+            result = rebuild_similarity_index(conn)
+        else:
+            result = find_similar_ideas(conn, args.title, args.problem_statement, threshold=args.threshold)
+    finally:
+        conn.close()
+
+    print(json.dumps(result, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,334 @@
+import logging
+import os
+import re
+import threading
+import time
+
+import psycopg2
+
+import clos_db
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Online index management for the CLOS database.
+#
+# Indexes are declared as specs:
+#   {'name': 'idx_...', 'table': 'projects', 'columns': 'pod_id, updated_at DESC',
+#    'method': 'btree', 'include': 'id, name', 'where': "category = 'blocked'"}
+# 'method' defaults to btree; 'include' (covering columns) and 'where' are optional. Columns are written the
+# way pg_get_indexdef prints them so specs can be compared to the catalog.
+#
+# Builds use CREATE INDEX CONCURRENTLY, which cannot run inside a
+# transaction, so the connection is switched to autocommit while building.
+# A failed or interrupted concurrent build leaves an INVALID index behind;
+# those are dropped concurrently and rebuilt on the next run.
+#
+# Partitioned tables can't be indexed concurrently, so for those the parent
+# index is created ON ONLY the parent (instant, starts out invalid), each
+# partition's index is built concurrently, and the partition indexes are
+# attached; the parent index turns valid once every partition has one.
+# Partitions created later get their indexes from the parent automatically.
+
+INDEX_PROGRESS_INTERVAL_SECONDS = int(os.environ.get('INDEX_PROGRESS_INTERVAL_SECONDS', '10'))
+# Indexes with this prefix that aren't in the spec are reported as unexpected
+MANAGED_INDEX_PREFIX = 'idx_'
+
+CATALOG_SQL = """
+    SELECT
+        c.relname as index_name,
+        t.relname as table_name,
+        i.indisvalid AND i.indisready as is_valid,
+        pg_get_indexdef(i.indexrelid) as definition
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    JOIN pg_class t ON t.oid = i.indrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = current_schema()
+        AND (c.relname = ANY(%s) OR (c.relname LIKE %s AND NOT c.relispartition))
+"""
+
+PARTITIONED_TABLES_SQL = """
+    SELECT p.relname, c.relname
+    FROM pg_class p
+    JOIN pg_namespace n ON n.oid = p.relnamespace
+    LEFT JOIN pg_inherits i ON i.inhparent = p.oid AND NOT i.inhdetachpending
+    LEFT JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE n.nspname = current_schema()
+        AND p.relkind = 'p'
+        AND p.relname = ANY(%s)
+"""
+
+ATTACHED_PARTITION_INDEXES_SQL = """
+    SELECT t.relname
+    FROM pg_inherits i
+    JOIN pg_index x ON x.indexrelid = i.inhrelid
+    JOIN pg_class t ON t.oid = x.indrelid
+    WHERE i.inhparent = %s::regclass
+"""
+
+PROGRESS_SQL = """
+    SELECT phase, blocks_done, blocks_total, tuples_done, tuples_total
+    FROM pg_stat_progress_create_index
+    WHERE pid = %s
+"""
+
+INDEXDEF_PATTERN = re.compile(r' USING (\w+) \((.*?)\)(?: INCLUDE \((.*)\))?$')
+
+def build_index_sql(spec, partitioned=False):
+    """
+    Build the CREATE INDEX CONCURRENTLY statement for a spec, or the
+    CREATE INDEX ON ONLY statement for a partitioned parent
+    """
+    if partitioned:
+        prefix = f"CREATE INDEX IF NOT EXISTS {spec['name']} ON ONLY {spec['table']}"
+    else:
+        prefix = f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {spec['name']} ON {spec['table']}"
+    sql = f"{prefix} USING {spec.get('method', 'btree')} ({spec['columns']})"
+    if spec.get('include'):
+        sql += f" INCLUDE ({spec['include']})"
+    if spec.get('where'):
+        sql += f" WHERE {spec['where']}"
+    return sql
+
+def parse_index_definition(definition):
+    """
+    Split a pg_get_indexdef string into method, columns, covering columns and whether it is partial
+    """
+    body, _, predicate = definition.partition(' WHERE ')
+    match = INDEXDEF_PATTERN.search(body)
+    if not match:
+        return None
+    return {
+        'method': match.group(1),
+        'columns': match.group(2),
+        'include': match.group(3) or '',
+        'partial': bool(predicate)
+    }
+
+def definition_differences(spec, index):
+    """
+    Compare a spec with the live index; returns a list of differences
+    """
+    differences = []
+    if index['table_name'] != spec['table']:
+        differences.append(f"table {index['table_name']} != {spec['table']}")
+
+    parsed = parse_index_definition(index['definition'])
+    if parsed is None:
+        return differences + [f"unparseable definition: {index['definition']}"]
+
+    if parsed['method'] != spec.get('method', 'btree'):
+        differences.append(f"method {parsed['method']} != {spec.get('method', 'btree')}")
+    if parsed['columns'] != spec['columns']:
+        differences.append(f"columns ({parsed['columns']}) != ({spec['columns']})")
+    if parsed['include'] != spec.get('include', ''):
+        differences.append(f"include ({parsed['include']}) != ({spec.get('include', '')})")
+    if parsed['partial'] != bool(spec.get('where')):
+        differences.append('partial predicate differs')
+
+    return differences
+
+def read_index_catalog(conn, specs):
+    """
+    Read the live state of the declared and prefix-managed indexes in one query
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute(CATALOG_SQL, ([spec['name'] for spec in specs], MANAGED_INDEX_PREFIX.replace('_', '\\_') + '%'))
+        catalog = {
+            row[0]: {'table_name': row[1], 'is_valid': row[2], 'definition': row[3]}
+            for row in cur.fetchall()
+        }
+        if not conn.autocommit:
+            conn.commit()
+        return catalog
+    finally:
+        cur.close()
+
+def plan_index_changes(specs, catalog):
+    """
+    Compare the spec with the catalog and decide what to build
+    """
+    plan = {'create': [], 'rebuild': [], 'mismatched': [], 'unexpected': []}
+    declared = {spec['name'] for spec in specs}
+
+    for spec in specs:
+        index = catalog.get(spec['name'])
+        if index is None:
+            plan['create'].append(spec)
+        elif not index['is_valid']:
+            plan['rebuild'].append(spec)
+        else:
+            differences = definition_differences(spec, index)
+            if differences:
+                plan['mismatched'].append({'name': spec['name'], 'differences': differences})
+
+    plan['unexpected'] = sorted(name for name in catalog if name not in declared)
+    return plan
+
+def read_partitioned_tables(conn, tables):
+    """
+    Find which of the given tables are partitioned, as {table: [partitions]}
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute(PARTITIONED_TABLES_SQL, (sorted(set(tables)),))
+        partitioned = {}
+        for parent, partition in cur.fetchall():
+            partitioned.setdefault(parent, [])
+            if partition is not None:
+                partitioned[parent].append(partition)
+        return partitioned
+    finally:
+        cur.close()
+
+def partition_index_name(spec, partition):
+    """
+    Name of a partition's index: the parent index name plus the partition suffix
+    """
+    suffix = partition[len(spec['table']):] if partition.startswith(spec['table']) else f"_{partition}"
+    # Identifiers are truncated to 63 bytes by Postgres; do it here so names match the catalog
+    return f"{spec['name']}{suffix}"[:63]
+
+def watch_build_progress(pid, index_name, stop):
+    """
+    Log pg_stat_progress_create_index for a build until stop is set
+    """
+    conn = None
+    try:
+        conn = clos_db.open_connection()
+        conn.autocommit = True
+        cur = conn.cursor()
+        while not stop.wait(INDEX_PROGRESS_INTERVAL_SECONDS):
+            cur.execute(PROGRESS_SQL, (pid,))
+            row = cur.fetchone()
+            if row is None:
+                continue
+            phase, blocks_done, blocks_total, tuples_done, tuples_total = row
+            percent = f" {blocks_done * 100 / blocks_total:.0f}% of blocks" if blocks_total else ""
+            logger.info(f"Building {index_name}: {phase}{percent} ({tuples_done}/{tuples_total} tuples)")
+        cur.close()
+
+    except psycopg2.Error as e:
+        logger.warning(f"Index progress monitoring stopped: {str(e)}")
+    finally:
+        if conn is not None:
+            conn.close()
+
+def build_index(conn, spec, drop_first=False):
+    """
+    Build one index concurrently, logging progress; returns the duration in milliseconds
+    """
+    stop = threading.Event()
+    watcher = threading.Thread(
+        target=watch_build_progress, args=(conn.info.backend_pid, spec['name'], stop), daemon=True
+    )
+
+    started_at = time.perf_counter()
+    cur = conn.cursor()
+    try:
+        if drop_first:
+            cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {spec['name']}")
+        watcher.start()
+        cur.execute(build_index_sql(spec))
+    finally:
+        stop.set()
+        cur.close()
+
+    return round((time.perf_counter() - started_at) * 1000, 1)
+
+def build_partitioned_index(conn, spec, partitions):
+    """
+    Index a partitioned table: parent ON ONLY, partitions concurrently, then
+    attach; returns the duration in milliseconds
+    """
+    started_at = time.perf_counter()
+    cur = conn.cursor()
+    try:
+        cur.execute(build_index_sql(spec, partitioned=True))
+        cur.execute(ATTACHED_PARTITION_INDEXES_SQL, (spec['name'],))
+        attached = {row[0] for row in cur.fetchall()}
+
+        child_specs = [
+            dict(spec, name=partition_index_name(spec, partition), table=partition)
+            for partition in sorted(partitions) if partition not in attached
+        ]
+        catalog = read_index_catalog(conn, child_specs)
+
+        for child in child_specs:
+            existing = catalog.get(child['name'])
+            if existing is None or not existing['is_valid']:
+                logger.info(f"Building partition index {child['name']}...")
+                build_index(conn, child, drop_first=existing is not None)
+            cur.execute(f"ALTER INDEX {spec['name']} ATTACH PARTITION {child['name']}")
+    finally:
+        cur.close()
+
+    return round((time.perf_counter() - started_at) * 1000, 1)
+
+def ensure_indexes(conn, specs, dry_run=False):
+    """
+    Bring the live indexes in line with the spec.
+
+    Missing indexes are built and INVALID ones rebuilt, each concurrently
+    in autocommit mode (per partition for partitioned tables). Definition mismatches and unexpected managed
+    indexes are reported, not changed. When nothing needs building this
+    costs one catalog query.
+    """
+    plan = plan_index_changes(specs, read_index_catalog(conn, specs))
+    result = {
+        'dry_run': dry_run,
+        'checked': len(specs),
+        'created': [],
+        'rebuilt': [],
+        'failed': [],
+        'mismatched': plan['mismatched'],
+        'unexpected': plan['unexpected']
+    }
+
+    for mismatch in plan['mismatched']:
+        logger.warning(f"Index {mismatch['name']} differs from its spec: {'; '.join(mismatch['differences'])}")
+
+    if dry_run:
+        result['created'] = [spec['name'] for spec in plan['create']]
+        result['rebuilt'] = [spec['name'] for spec in plan['rebuild']]
+        return result
+
+    if not plan['create'] and not plan['rebuild']:
+        return result
+
+    # CONCURRENTLY cannot run in a transaction block
+    conn.rollback()
+    conn.autocommit = True
+    try:
+        work = [(spec, False, 'created') for spec in plan['create']]
+        work += [(spec, True, 'rebuilt') for spec in plan['rebuild']]
+        partitioned = read_partitioned_tables(conn, [spec['table'] for spec, _, _ in work])
+
+        for spec, drop_first, outcome in work:
+            try:
+                logger.info(f"{'Rebuilding invalid' if drop_first else 'Creating'} index {spec['name']}...")
+                if spec['table'] in partitioned:
+                    # An invalid partitioned index is missing partition indexes; fill them in
+                    duration_ms = build_partitioned_index(conn, spec, partitioned[spec['table']])
+                else:
+                    duration_ms = build_index(conn, spec, drop_first=drop_first)
+                logger.info(f"Index {spec['name']} built in {duration_ms}ms")
+                result[outcome].append({'name': spec['name'], 'duration_ms': duration_ms})
+            except psycopg2.Error as e:
+                # Left INVALID if the build got far enough; the next run rebuilds it
+                logger.error(f"Failed to build index {spec['name']}: {str(e)}")
+                result['failed'].append({'name': spec['name'], 'error': str(e)})
+    finally:
+        conn.autocommit = False
+
+    # Concurrent builds can finish without error and still be left invalid
+    catalog = read_index_catalog(conn, specs)
+    for outcome in ('created', 'rebuilt'):
+        for built in result[outcome]:
+            index = catalog.get(built['name'])
+            if index is None or not index['is_valid']:
+                result['failed'].append({'name': built['name'], 'error': 'index is not valid after build'})
+
+    return result
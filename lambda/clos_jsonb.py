@@ -0,0 +1,87 @@
+import json
+import re
+
+# Index-friendly JSONB predicates for the CLOS database.
+#
+# ideas.tags, metrics.dimensions and stage_transitions.evidence carry GIN
+# indexes built with jsonb_path_ops. Those only serve containment (@>):
+# tags ? 'x', evidence->>'k' = 'v' and the like can't use them and scan
+# every row. These helpers express the common lookups as @> so they do.
+#
+# Each helper returns (sql, params) for psycopg2 %s placeholders; combine
+# them with all_of() / any_of() and append the params in order:
+#
+#   sql, params = clos_jsonb.all_of(
+#       clos_jsonb.has_tag('i.tags', 'ml'),
+#       clos_jsonb.field_equals('i.metadata', 'source', 'slack')
+#   )
+#   cur.execute(f"SELECT i.id FROM ideas i WHERE {sql}", params)
+
+# Column references are interpolated, so only plain (optionally qualified) names are accepted
+COLUMN_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?$')
+
+def column_ref(column):
+    """
+    Validate a column reference before it is interpolated into SQL
+    """
+    if not COLUMN_PATTERN.match(column):
+        raise ValueError(f"Invalid column reference: {column!r}")
+    return column
+
+def contains(column, value):
+    """
+    column @> value: the column contains the given JSON document
+    """
+    return f"{column_ref(column)} @> %s::jsonb", [json.dumps(value)]
+
+def has_tag(column, tag):
+    """
+    A JSON array column (e.g. ideas.tags) includes the tag
+    """
+    return contains(column, [tag])
+
+def has_all_tags(column, tags):
+    """
+    A JSON array column includes every one of the tags
+    """
+    return contains(column, list(tags))
+
+def has_any_tag(column, tags):
+    """
+    A JSON array column includes at least one of the tags; each arm can use the index
+    """
+    return any_of(*[has_tag(column, tag) for tag in tags])
+
+def field_equals(column, path, value):
+    """
+    The value at a dotted path equals value, e.g. field_equals('evidence', 'github.pr_merged', True)
+    instead of evidence->'github'->>'pr_merged' = 'true'
+    """
+    document = value
+    for key in reversed(path.split('.')):
+        document = {key: document}
+    return contains(column, document)
+
+def fields_equal(column, fields):
+    """
+    Every top-level key in fields has the given value, e.g. metric dimensions {"env": "prod"}
+    """
+    return contains(column, dict(fields))
+
+def all_of(*predicates):
+    """
+    AND predicates together; with none it is always true
+    """
+    if not predicates:
+        return 'TRUE', []
+    sql = ' AND '.join(f"({predicate})" for predicate, _ in predicates)
+    return sql, [param for _, params in predicates for param in params]
+
+def any_of(*predicates):
+    """
+    OR predicates together; with none it is always false
+    """
+    if not predicates:
+        return 'FALSE', []
+    sql = ' OR '.join(f"({predicate})" for predicate, _ in predicates)
+    return f"({sql})", [param for _, params in predicates for param in params]
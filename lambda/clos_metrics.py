@@ -0,0 +1,398 @@
+import logging
+import math
+import os
+from datetime import datetime, timedelta, timezone
+
+import clos_jsonb
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Metric rollups for the CLOS database.
+#
+# Raw metrics rows are aggregated into metric_rollups at 1m, 1h and 1d
+# resolution per pod, metric_type and dimension set: count, sum, min, max
+# and a percentile sketch. The sketch is a log-bucketed histogram stored as
+# {key: count}: a value v > 0 goes in bucket 'p' + ceil(log_gamma(v)) (and
+# negatives in 'n' buckets by magnitude, zero in 'z'), so any percentile
+# read from it is within SKETCH_RELATIVE_ACCURACY of the true value, and
+# sketches merge by adding counts. That makes 1h and 1d rollups exact
+# merges of the 1m ones.
+#
+# refresh_rollups() is incremental and idempotent: it recomputes the 1m
+# buckets from the watermark (less METRIC_LATE_ARRIVAL_SECONDS, to pick up
+# late rows) from raw rows, then the 1h and 1d buckets covering them from
+# the finer rollups. query_metrics() reads the coarsest resolution whose
+# buckets tile the requested range and step.
+
+# (name, bucket seconds, date_trunc unit), finest first
+RESOLUTIONS = [('1m', 60, 'minute'), ('1h', 3600, 'hour'), ('1d', 86400, 'day')]
+
+SKETCH_RELATIVE_ACCURACY = 0.01
+SKETCH_GAMMA = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+SKETCH_LOG_GAMMA = math.log(SKETCH_GAMMA)
+
+METRIC_LATE_ARRIVAL_SECONDS = int(os.environ.get('METRIC_LATE_ARRIVAL_SECONDS', '300'))
+# The first run backfills history in batches, resuming on the next run
+METRIC_ROLLUP_BATCH_HOURS = int(os.environ.get('METRIC_ROLLUP_BATCH_HOURS', '24'))
+METRIC_ROLLUP_MAX_BATCHES = int(os.environ.get('METRIC_ROLLUP_MAX_BATCHES', '30'))
+# Days each resolution is kept; 0 keeps it forever
+METRIC_ROLLUP_RETENTION_DAYS = {
+    '1m': int(os.environ.get('METRIC_ROLLUP_1M_RETENTION_DAYS', '14')),
+    '1h': int(os.environ.get('METRIC_ROLLUP_1H_RETENTION_DAYS', '400')),
+    '1d': 0
+}
+ROLLUP_STATE_NAME = 'metrics'
+
+EPOCH = datetime(1970, 1, 1)
+
+ROLLUP_COLUMNS = """
+    resolution, bucket_start, pod_id, metric_type, dimensions,
+    sample_count, value_sum, value_min, value_max, sketch, updated_at
+"""
+
+ROLLUP_CONFLICT = """
+    ON CONFLICT (resolution, metric_type, pod_id, dimensions, bucket_start) DO UPDATE SET
+        sample_count = EXCLUDED.sample_count,
+        value_sum = EXCLUDED.value_sum,
+        value_min = EXCLUDED.value_min,
+        value_max = EXCLUDED.value_max,
+        sketch = EXCLUDED.sketch,
+        updated_at = NOW()
+"""
+
+# 1m buckets straight from raw rows
+RAW_ROLLUP_SQL = f"""
+    INSERT INTO metric_rollups ({ROLLUP_COLUMNS})
+    SELECT
+        '1m', bucket_start, pod_id, metric_type, dimensions,
+        SUM(samples), SUM(value_sum), MIN(value_min), MAX(value_max),
+        jsonb_object_agg(sketch_key, samples), NOW()
+    FROM (
+        SELECT
+            date_trunc('minute', m.timestamp) as bucket_start,
+            m.pod_id,
+            m.metric_type,
+            COALESCE(m.dimensions, '{{}}') as dimensions,
+            CASE
+                WHEN m.metric_value > 0 THEN 'p' || ceil(ln(m.metric_value::float8) / %(log_gamma)s)::int
+                WHEN m.metric_value < 0 THEN 'n' || ceil(ln(-m.metric_value::float8) / %(log_gamma)s)::int
+                ELSE 'z'
+            END as sketch_key,
+            COUNT(*) as samples,
+            SUM(m.metric_value::float8) as value_sum,
+            MIN(m.metric_value::float8) as value_min,
+            MAX(m.metric_value::float8) as value_max
+        FROM metrics m
+        WHERE m.timestamp >= %(start)s
+            AND m.timestamp < %(end)s
+        GROUP BY 1, 2, 3, 4, 5
+    ) keyed
+    GROUP BY bucket_start, pod_id, metric_type, dimensions
+    {ROLLUP_CONFLICT}
+"""
+
+# Coarser buckets by merging the next finer resolution
+MERGE_ROLLUP_SQL = f"""
+    INSERT INTO metric_rollups ({ROLLUP_COLUMNS})
+    SELECT
+        %(resolution)s, t.bucket_start, t.pod_id, t.metric_type, t.dimensions,
+        t.sample_count, t.value_sum, t.value_min, t.value_max, s.sketch, NOW()
+    FROM (
+        SELECT
+            date_trunc(%(unit)s, r.bucket_start) as bucket_start,
+            r.pod_id,
+            r.metric_type,
+            r.dimensions,
+            SUM(r.sample_count) as sample_count,
+            SUM(r.value_sum) as value_sum,
+            MIN(r.value_min) as value_min,
+            MAX(r.value_max) as value_max
+        FROM metric_rollups r
+        WHERE r.resolution = %(source)s
+            AND r.bucket_start >= %(start)s
+            AND r.bucket_start < %(end)s
+        GROUP BY 1, 2, 3, 4
+    ) t
+    JOIN (
+        SELECT bucket_start, pod_id, metric_type, dimensions, jsonb_object_agg(sketch_key, samples) as sketch
+        FROM (
+            SELECT
+                date_trunc(%(unit)s, r.bucket_start) as bucket_start,
+                r.pod_id,
+                r.metric_type,
+                r.dimensions,
+                b.key as sketch_key,
+                SUM(b.value::bigint) as samples
+            FROM metric_rollups r
+            CROSS JOIN LATERAL jsonb_each_text(r.sketch) b
+            WHERE r.resolution = %(source)s
+                AND r.bucket_start >= %(start)s
+                AND r.bucket_start < %(end)s
+            GROUP BY 1, 2, 3, 4, 5
+        ) keyed
+        GROUP BY bucket_start, pod_id, metric_type, dimensions
+    ) s ON s.bucket_start = t.bucket_start
+        AND s.pod_id IS NOT DISTINCT FROM t.pod_id
+        AND s.metric_type = t.metric_type
+        AND s.dimensions = t.dimensions
+    {ROLLUP_CONFLICT}
+"""
+
+def bucket_floor(ts, seconds):
+    """
+    Start of the bucket of the given size (aligned to the epoch) containing ts
+    """
+    return EPOCH + timedelta(seconds=(ts - EPOCH) // timedelta(seconds=seconds) * seconds)
+
+def bucket_ceil(ts, seconds):
+    """
+    End of the bucket containing the instant just before ts
+    """
+    floor = bucket_floor(ts, seconds)
+    return floor if floor == ts else floor + timedelta(seconds=seconds)
+
+def utc_now():
+    """
+    Current UTC time as a naive timestamp, matching the TIMESTAMP columns
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def sketch_key(value):
+    """
+    Sketch bucket for a value; must match the CASE in RAW_ROLLUP_SQL
+    """
+    if value > 0:
+        return f"p{math.ceil(math.log(value) / SKETCH_LOG_GAMMA)}"
+    if value < 0:
+        return f"n{math.ceil(math.log(-value) / SKETCH_LOG_GAMMA)}"
+    return 'z'
+
+def sketch_key_value(key):
+    """
+    Representative value of a sketch bucket, within the relative accuracy of everything in it
+    """
+    if key == 'z':
+        return 0.0
+    magnitude = 2 * SKETCH_GAMMA ** int(key[1:]) / (SKETCH_GAMMA + 1)
+    return -magnitude if key[0] == 'n' else magnitude
+
+def merge_sketches(target, sketch):
+    """
+    Add a sketch's counts into target
+    """
+    for key, count in sketch.items():
+        target[key] = target.get(key, 0) + int(count)
+    return target
+
+def sketch_quantile(sketch, q):
+    """
+    Estimate the q-quantile (0..1) from a sketch; None when it is empty
+    """
+    buckets = sorted(sketch.items(), key=lambda item: sketch_key_value(item[0]))
+    total = sum(count for _, count in buckets)
+    if not total:
+        return None
+
+    rank = q * (total - 1)
+    seen = 0
+    for key, count in buckets:
+        seen += count
+        if seen > rank:
+            return sketch_key_value(key)
+    return sketch_key_value(buckets[-1][0])
+
+def get_rollup_watermark(cur):
+    """
+    Read how far raw metrics have been rolled up; None before the first run
+    """
+    cur.execute("SELECT watermark FROM metric_rollup_state WHERE name = %s", (ROLLUP_STATE_NAME,))
+    row = cur.fetchone()
+    return row[0] if row else None
+
+def rollup_batch(cur, start, end):
+    """
+    Roll up raw rows in [start, end) to 1m, then the 1h and 1d buckets covering them
+    """
+    rows_written = {}
+    cur.execute(RAW_ROLLUP_SQL, {'start': start, 'end': end, 'log_gamma': SKETCH_LOG_GAMMA})
+    rows_written['1m'] = cur.rowcount
+
+    for (source, _, _), (resolution, seconds, unit) in zip(RESOLUTIONS, RESOLUTIONS[1:]):
+        cur.execute(MERGE_ROLLUP_SQL, {
+            'resolution': resolution,
+            'source': source,
+            'unit': unit,
+            'start': bucket_floor(start, seconds),
+            'end': bucket_ceil(end, seconds)
+        })
+        rows_written[resolution] = cur.rowcount
+
+    cur.execute("""
+    INSERT INTO metric_rollup_state (name, watermark, updated_at)
+    VALUES (%s, %s, NOW())
+    ON CONFLICT (name) DO UPDATE SET watermark = EXCLUDED.watermark, updated_at = NOW()
+    """, (ROLLUP_STATE_NAME, end))
+
+    return rows_written
+
+def prune_rollups(cur, now):
+    """
+    Delete rollups older than their resolution's retention
+    """
+    deleted = {}
+    for resolution, days in METRIC_ROLLUP_RETENTION_DAYS.items():
+        if days:
+            cur.execute("""
+            DELETE FROM metric_rollups
+            WHERE resolution = %s AND bucket_start < %s
+            """, (resolution, now - timedelta(days=days)))
+            deleted[resolution] = cur.rowcount
+    return deleted
+
+def refresh_rollups(conn, now=None):
+    """
+    Bring metric rollups up to date with the raw metrics table.
+
+    Each batch is committed with the watermark, so a run that stops early
+    (or a long first backfill) resumes where it left off. Returns the
+    batches run, rows written per resolution and the new watermark.
+    """
+    now = now or utc_now()
+    end = bucket_floor(now, 60)
+    result = {'batches': 0, 'rows_written': {name: 0 for name, _, _ in RESOLUTIONS}, 'watermark': None}
+
+    cur = conn.cursor()
+    try:
+        watermark = get_rollup_watermark(cur)
+        if watermark is None:
+            cur.execute("SELECT MIN(timestamp) FROM metrics")
+            first = cur.fetchone()[0]
+            start = bucket_floor(first, 60) if first else end
+        else:
+            start = bucket_floor(watermark - timedelta(seconds=METRIC_LATE_ARRIVAL_SECONDS), 60)
+        conn.commit()
+
+        while start < end and result['batches'] < METRIC_ROLLUP_MAX_BATCHES:
+            batch_end = min(start + timedelta(hours=METRIC_ROLLUP_BATCH_HOURS), end)
+            try:
+                rows_written = rollup_batch(cur, start, batch_end)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+            for resolution, count in rows_written.items():
+                result['rows_written'][resolution] += count
+            result['batches'] += 1
+            result['watermark'] = batch_end.isoformat()
+            start = batch_end
+
+        result['pruned'] = prune_rollups(cur, now)
+        conn.commit()
+    finally:
+        cur.close()
+
+    if start < end:
+        logger.info(f"Metric rollups caught up to {start.isoformat()}, continuing on the next run")
+    return result
+
+def choose_resolution(start, end, step_seconds=None, now=None):
+    """
+    Coarsest retained resolution whose buckets tile the range and the step; None means raw rows
+    """
+    now = now or utc_now()
+    for name, seconds, _ in reversed(RESOLUTIONS):
+        if step_seconds is not None and step_seconds % seconds:
+            continue
+        if bucket_floor(start, seconds) != start or bucket_floor(end, seconds) != end:
+            continue
+        retention_days = METRIC_ROLLUP_RETENTION_DAYS[name]
+        if retention_days and start < now - timedelta(days=retention_days):
+            continue
+        return name
+    return None
+
+def new_point(bucket_start):
+    return {'bucket_start': bucket_start, 'count': 0, 'sum': 0.0, 'min': None, 'max': None, 'sketch': {}}
+
+def finish_point(point, percentiles):
+    """
+    Turn an accumulated point into its reported form
+    """
+    point['avg'] = point['sum'] / point['count'] if point['count'] else None
+    point['percentiles'] = {}
+    for q in percentiles:
+        estimate = sketch_quantile(point['sketch'], q)
+        if estimate is not None:
+            # The bucket representative can overshoot the observed extremes
+            estimate = min(max(estimate, point['min']), point['max'])
+        point['percentiles'][f"p{q * 100:g}"] = estimate
+    point['bucket_start'] = point['bucket_start'].isoformat()
+    del point['sketch']
+    return point
+
+def query_metrics(conn, metric_type, start, end, step_seconds=None, pod_id=None, dimensions=None,
+                  percentiles=(0.5, 0.95, 0.99)):
+    """
+    Aggregate a metric over [start, end), one point per step (or one for the whole range).
+
+    Reads the coarsest rollup resolution that fits, falling back to raw
+    rows when the range or step isn't aligned to any. dimensions filters
+    by containment, so {"env": "prod"} matches every dimension set with
+    that pair; matching series are merged. Points after the rollup
+    watermark may still be missing late rows.
+    """
+    step = timedelta(seconds=step_seconds) if step_seconds else end - start
+    resolution = choose_resolution(start, end, step_seconds)
+
+    filters = "metric_type = %s"
+    params = [metric_type]
+    if pod_id is not None:
+        filters += " AND pod_id = %s"
+        params.append(pod_id)
+    if dimensions:
+        dimension_filter, dimension_params = clos_jsonb.fields_equal('dimensions', dimensions)
+        filters += f" AND {dimension_filter}"
+        params += dimension_params
+
+    cur = conn.cursor()
+    try:
+        if resolution is None:
+            cur.execute(f"""
+            SELECT timestamp, 1, metric_value::float8, metric_value::float8, metric_value::float8, NULL
+            FROM metrics
+            WHERE {filters} AND timestamp >= %s AND timestamp < %s
+            """, params + [start, end])
+        else:
+            cur.execute(f"""
+            SELECT bucket_start, sample_count, value_sum, value_min, value_max, sketch
+            FROM metric_rollups
+            WHERE resolution = %s AND {filters} AND bucket_start >= %s AND bucket_start < %s
+            """, [resolution] + params + [start, end])
+        rows = cur.fetchall()
+        watermark = get_rollup_watermark(cur)
+        if not conn.autocommit:
+            conn.commit()
+    finally:
+        cur.close()
+
+    points = {}
+    for bucket_start, count, value_sum, value_min, value_max, sketch in rows:
+        point_start = start + (bucket_start - start) // step * step
+        point = points.setdefault(point_start, new_point(point_start))
+        point['count'] += count
+        point['sum'] += value_sum
+        point['min'] = value_min if point['min'] is None else min(point['min'], value_min)
+        point['max'] = value_max if point['max'] is None else max(point['max'], value_max)
+        if sketch is None:
+            sketch = {sketch_key(value_sum): 1}
+        merge_sketches(point['sketch'], sketch)
+
+    return {
+        'metric_type': metric_type,
+        'resolution': resolution or 'raw',
+        'step_seconds': int(step.total_seconds()),
+        'complete_until': watermark.isoformat() if watermark else None,
+        'points': [finish_point(points[key], percentiles) for key in sorted(points)]
+    }
@@ -0,0 +1,196 @@
+import hashlib
+import logging
+import time
+
+import psycopg2
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Versioned schema migrations for the CLOS database.
+#
+# Each migration is {'version': int, 'name': str, 'sql': str}, applied in
+# version order in its own transaction and recorded in schema_migrations
+# with a checksum of its SQL. Editing an applied migration is an error;
+# schema changes go in a new migration. When everything is applied, a run
+# costs the one query that reads schema_migrations.
+
+MIGRATIONS_TABLE = 'schema_migrations'
+# Arbitrary application-wide key for pg_advisory_lock ("clos")
+MIGRATION_LOCK_KEY = 0x636c6f73
+MIGRATION_LOCK_TIMEOUT_SECONDS = 120
+
+class MigrationError(Exception):
+    """
+    Raised when migrations are inconsistent or one fails to apply
+    """
+    pass
+
+def migration_checksum(sql):
+    """
+    Checksum of a migration's SQL, ignoring leading and trailing whitespace
+    """
+    return hashlib.sha256(sql.strip().encode('utf-8')).hexdigest()
+
+def validate_migrations(migrations):
+    """
+    Check that migration versions are unique and declared in ascending order
+    """
+    versions = [migration['version'] for migration in migrations]
+    if versions != sorted(set(versions)):
+        raise MigrationError(f"Migration versions must be unique and ascending: {versions}")
+
+def get_applied_migrations(conn):
+    """
+    Read applied migrations as {version: checksum}; an empty dict if the table doesn't exist yet
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute(f"SELECT version, checksum FROM {MIGRATIONS_TABLE}")
+        applied = dict(cur.fetchall())
+        conn.commit()
+        return applied
+    except psycopg2.errors.UndefinedTable:
+        conn.rollback()
+        return {}
+    finally:
+        cur.close()
+
+def find_pending_migrations(migrations, applied):
+    """
+    Split migrations into pending ones, failing if an applied migration was edited
+    """
+    pending = []
+    for migration in migrations:
+        checksum = migration_checksum(migration['sql'])
+        applied_checksum = applied.get(migration['version'])
+
+        if applied_checksum is None:
+            pending.append(dict(migration, checksum=checksum))
+        elif applied_checksum != checksum:
+            raise MigrationError(
+                f"Migration {migration['version']} ({migration['name']}) was changed after it was applied"
+            )
+
+    return pending
+
+def ensure_migrations_table(conn):
+    """
+    Create the migrations table if this is the first run
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute(f"""
+        CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            execution_ms NUMERIC(12,1) NOT NULL,
+            applied_at TIMESTAMPTZ DEFAULT NOW()
+        );
+        """)
+        conn.commit()
+    finally:
+        cur.close()
+
+def acquire_migration_lock(conn):
+    """
+    Take the session advisory lock so concurrent runners apply migrations one at a time
+    """
+    deadline = time.monotonic() + MIGRATION_LOCK_TIMEOUT_SECONDS
+    cur = conn.cursor()
+    try:
+        while True:
+            cur.execute("SELECT pg_try_advisory_lock(%s)", (MIGRATION_LOCK_KEY,))
+            locked = cur.fetchone()[0]
+            conn.commit()
+            if locked:
+                return
+            if time.monotonic() > deadline:
+                raise MigrationError("Timed out waiting for another migration run to finish")
+            logger.info("Another migration run holds the lock, waiting...")
+            time.sleep(1)
+    finally:
+        cur.close()
+
+def release_migration_lock(conn):
+    """
+    Release the session advisory lock
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_KEY,))
+        conn.commit()
+    finally:
+        cur.close()
+
+def apply_migration(conn, migration):
+    """
+    Apply one migration and record it in the same transaction; returns its duration in milliseconds
+    """
+    started_at = time.perf_counter()
+    cur = conn.cursor()
+    try:
+        cur.execute(migration['sql'])
+        execution_ms = round((time.perf_counter() - started_at) * 1000, 1)
+        cur.execute(f"""
+        INSERT INTO {MIGRATIONS_TABLE} (version, name, checksum, execution_ms)
+        VALUES (%s, %s, %s, %s)
+        """, (migration['version'], migration['name'], migration['checksum'], execution_ms))
+        conn.commit()
+        return execution_ms
+    except psycopg2.Error as e:
+        conn.rollback()
+        raise MigrationError(f"Migration {migration['version']} ({migration['name']}) failed: {str(e)}") from e
+    finally:
+        cur.close()
+
+def run_migrations(conn, migrations, dry_run=False):
+    """
+    Apply pending migrations in version order.
+
+    With dry_run the pending migrations are reported but not executed.
+    Returns the applied (or planned) migrations with their timings and the
+    number already applied.
+    """
+    validate_migrations(migrations)
+
+    applied = get_applied_migrations(conn)
+    pending = find_pending_migrations(migrations, applied)
+    result = {
+        'dry_run': dry_run,
+        'already_applied': len(migrations) - len(pending),
+        'applied': []
+    }
+
+    if not pending:
+        logger.info(f"Schema is up to date ({len(migrations)} migrations applied)")
+        return result
+
+    if dry_run:
+        result['pending'] = [{'version': m['version'], 'name': m['name']} for m in pending]
+        for migration in pending:
+            logger.info(f"[dry run] Would apply migration {migration['version']} ({migration['name']})")
+        return result
+
+    acquire_migration_lock(conn)
+    try:
+        ensure_migrations_table(conn)
+
+        # Another runner may have applied some while we waited for the lock
+        pending = find_pending_migrations(migrations, get_applied_migrations(conn))
+        result['already_applied'] = len(migrations) - len(pending)
+
+        for migration in pending:
+            logger.info(f"Applying migration {migration['version']} ({migration['name']})...")
+            execution_ms = apply_migration(conn, migration)
+            logger.info(f"Applied migration {migration['version']} in {execution_ms}ms")
+            result['applied'].append({
+                'version': migration['version'],
+                'name': migration['name'],
+                'execution_ms': execution_ms
+            })
+    finally:
+        release_migration_lock(conn)
+
+    return result
@@ -0,0 +1,211 @@
+import logging
+import os
+import re
+from datetime import date, datetime, timezone
+
+import psycopg2
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Monthly partition maintenance for the CLOS database.
+#
+# activities and metrics are range-partitioned by month (migration 7), with
+# partitions named <parent>_YYYY_MM. Each run makes sure the current month
+# and the next PARTITION_MONTHS_AHEAD exist, so inserts never hit a missing
+# range, and applies the table's retention to partitions that have aged out:
+# 'detach' keeps the table around (outside the parent) for archiving,
+# 'drop' removes it. When nothing needs doing a run costs one catalog query
+# per table.
+
+PARTITION_MONTHS_AHEAD = int(os.environ.get('PARTITION_MONTHS_AHEAD', '3'))
+
+PARTITION_POLICIES = {
+    'activities': {
+        'retention_months': int(os.environ.get('ACTIVITY_RETENTION_MONTHS', '13')),
+        'expire_action': os.environ.get('ACTIVITY_EXPIRE_ACTION', 'detach')
+    },
+    'metrics': {
+        'retention_months': int(os.environ.get('METRIC_RETENTION_MONTHS', '25')),
+        'expire_action': os.environ.get('METRIC_EXPIRE_ACTION', 'drop')
+    }
+}
+
+PARTITIONS_SQL = """
+    SELECT c.relname, i.inhdetachpending
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    JOIN pg_class p ON p.oid = i.inhparent
+    JOIN pg_namespace n ON n.oid = p.relnamespace
+    WHERE n.nspname = current_schema()
+        AND p.relname = %s
+"""
+
+PARTITION_SUFFIX_PATTERN = re.compile(r'_(\d{4})_(\d{2})$')
+
+def add_months(month, months):
+    """
+    First day of the month that is `months` after the given month
+    """
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(parent, month):
+    """
+    Name of the partition holding the given month
+    """
+    return f"{parent}_{month.year:04d}_{month.month:02d}"
+
+def partition_month(parent, name):
+    """
+    Month a partition covers, or None if the name doesn't follow the monthly scheme
+    """
+    if not name.startswith(f"{parent}_"):
+        return None
+    match = PARTITION_SUFFIX_PATTERN.search(name)
+    if not match or len(name) != len(parent) + 8:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+def list_partitions(conn, parent):
+    """
+    List a table's partitions as {name, month, detach_pending}
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute(PARTITIONS_SQL, (parent,))
+        partitions = [
+            {'name': name, 'month': partition_month(parent, name), 'detach_pending': detach_pending}
+            for name, detach_pending in cur.fetchall()
+        ]
+        if not conn.autocommit:
+            conn.commit()
+        return partitions
+    finally:
+        cur.close()
+
+def plan_partition_changes(parent, policy, partitions, today):
+    """
+    Work out which months to create and which partitions have expired
+    """
+    current_month = date(today.year, today.month, 1)
+    existing = {partition['month'] for partition in partitions}
+    # Partitions ending on or before this month are past retention
+    cutoff = add_months(current_month, -policy['retention_months'])
+
+    plan = {
+        'create': [
+            add_months(current_month, offset)
+            for offset in range(PARTITION_MONTHS_AHEAD + 1)
+            if add_months(current_month, offset) not in existing
+        ],
+        'expire': [],
+        'finalize': []
+    }
+
+    for partition in sorted(partitions, key=lambda p: p['name']):
+        if partition['detach_pending']:
+            # An interrupted DETACH ... CONCURRENTLY has to be finished first
+            plan['finalize'].append(partition['name'])
+        elif partition['month'] is not None and add_months(partition['month'], 1) <= cutoff:
+            plan['expire'].append(partition['name'])
+
+    return plan
+
+def create_partition(conn, parent, month):
+    """
+    Create one monthly partition through the create_monthly_partition() SQL function
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT create_monthly_partition(%s, %s)", (parent, month))
+        return cur.fetchone()[0]
+    finally:
+        cur.close()
+
+def expire_partition(conn, parent, name, action):
+    """
+    Detach or drop an expired partition
+    """
+    cur = conn.cursor()
+    try:
+        if action == 'drop':
+            cur.execute(f"DROP TABLE IF EXISTS {name}")
+        else:
+            # Only takes a SHARE UPDATE EXCLUSIVE lock on the parent, so
+            # inserts into current partitions carry on; needs autocommit
+            cur.execute(f"ALTER TABLE {parent} DETACH PARTITION {name} CONCURRENTLY")
+    finally:
+        cur.close()
+
+def finalize_detach(conn, parent, name):
+    """
+    Complete a DETACH PARTITION ... CONCURRENTLY that was interrupted
+    """
+    cur = conn.cursor()
+    try:
+        cur.execute(f"ALTER TABLE {parent} DETACH PARTITION {name} FINALIZE")
+    finally:
+        cur.close()
+
+def maintain_partitions(conn, policies=None, dry_run=False, today=None):
+    """
+    Pre-create upcoming partitions and apply retention to old ones.
+
+    With dry_run the changes are reported but not made. Returns the
+    created, expired and finalized partitions per table, plus any that
+    failed; a failure on one partition doesn't stop the rest.
+    """
+    policies = policies or PARTITION_POLICIES
+    today = today or datetime.now(timezone.utc).date()
+    result = {'dry_run': dry_run, 'tables': {}, 'failed': []}
+
+    plans = {}
+    for parent, policy in policies.items():
+        plans[parent] = plan_partition_changes(parent, policy, list_partitions(conn, parent), today)
+
+    for parent, plan in plans.items():
+        action = policies[parent]['expire_action']
+        expired_key = 'dropped' if action == 'drop' else 'detached'
+        summary = {
+            'created': [partition_name(parent, month) for month in plan['create']],
+            'finalized': list(plan['finalize']),
+            expired_key: list(plan['expire'])
+        }
+        result['tables'][parent] = summary
+
+        if dry_run:
+            for name in summary['created']:
+                logger.info(f"[dry run] Would create partition {name}")
+            for name in plan['expire']:
+                logger.info(f"[dry run] Would {action} expired partition {name}")
+            continue
+
+        if not plan['create'] and not plan['expire'] and not plan['finalize']:
+            continue
+
+        # DETACH ... CONCURRENTLY cannot run in a transaction block
+        conn.rollback()
+        conn.autocommit = True
+        try:
+            work = [('finalized', name, None) for name in plan['finalize']]
+            work += [('created', partition_name(parent, month), month) for month in plan['create']]
+            work += [(expired_key, name, None) for name in plan['expire']]
+
+            for outcome, name, month in work:
+                try:
+                    if outcome == 'finalized':
+                        finalize_detach(conn, parent, name)
+                    elif outcome == 'created':
+                        create_partition(conn, parent, month)
+                    else:
+                        expire_partition(conn, parent, name, action)
+                    logger.info(f"Partition {name}: {outcome}")
+                except psycopg2.Error as e:
+                    logger.error(f"Partition maintenance failed for {name}: {str(e)}")
+                    summary[outcome].remove(name)
+                    result['failed'].append({'name': name, 'error': str(e)})
+        finally:
+            conn.autocommit = False
+
+    return result
@@ -0,0 +1,178 @@
+"""
+Merge sampled lambda profiles into one flame graph.
+
+Reads the profiles clos_profiler.py stores, optionally narrowed to a
+handler, an event type and a date range, adds them up per handler with
+pstats and writes collapsed stacks: one "frame;frame;frame microseconds"
+line per stack, the input of flamegraph.pl, inferno and speedscope. Each
+handler becomes a root frame, so several handlers share one graph.
+
+cProfile records caller/callee edges rather than whole stacks, so stacks
+are rebuilt by walking down from each entry point and splitting a
+function's time between its callers in proportion to the time each call
+edge took. A function reached through several paths is apportioned, not
+sampled; --pstats writes the exact merged profile for pstats or snakeviz.
+
+    python lambda/clos_profile_merge.py s3://clos-artifacts-0123/lambda-profiles \\
+        --handler stage-gate-processor --since 2026-10-01 > stacks.txt
+    flamegraph.pl stacks.txt > stage-gate.svg
+    python lambda/clos_profile_merge.py /tmp/clos-profiles --pstats merged.prof --top 20
+"""
+import argparse
+import os
+import pstats
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import clos_profiler
+
+# Stacks deeper than this are cut off; the remaining time stays on the last frame
+MAX_STACK_DEPTH = 128
+# Stacks holding less time than this (across all profiles) are folded into their parent
+MIN_STACK_MICROSECONDS = 1
+
+class StoredProfile:
+    """
+    A stored profile in the shape pstats.Stats loads from a cProfile.Profile
+    """
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+def select_keys(keys, handler=None, event_type=None, since=None, until=None):
+    """
+    Keys (handler/event type/date/file) matching the filters; dates are YYYY-MM-DD strings
+    """
+    selected = []
+    for key in keys:
+        parts = key.split('/')
+        if len(parts) != 4:
+            continue
+        key_handler, key_event_type, day, _ = parts
+        if handler and key_handler != clos_profiler.slug(handler):
+            continue
+        if event_type and key_event_type != clos_profiler.slug(event_type):
+            continue
+        if (since and day < since) or (until and day > until):
+            continue
+        selected.append(key)
+    return selected
+
+def load_profiles(store_url, keys, workers=8):
+    """
+    Merged pstats.Stats per handler, fetching the artifacts in parallel
+    """
+    def fetch(key):
+        return key, clos_profiler.load_profile(clos_profiler.read_artifact(store_url, key))
+
+    merged = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for key, stats in executor.map(fetch, keys):
+            handler = key.split('/')[0]
+            if handler not in merged:
+                merged[handler] = pstats.Stats(stream=sys.stderr)
+            merged[handler].add(StoredProfile(stats))
+    return merged
+
+def frame_label(func):
+    """
+    Flame graph frame name: function (file:line), or the bare name of a builtin
+    """
+    filename, line, name = func
+    label = name if filename == '~' else f"{name} ({os.path.basename(filename)}:{line})"
+    return label.replace(';', ':')
+
+def collapsed_stacks(stats, root=None):
+    """
+    Rebuild call stacks from a pstats stats dict, as {stack: seconds}
+    """
+    callees = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+
+    prefix = (root,) if root else ()
+    stacks = {}
+    # (path, seconds of the last function's cumulative time spent on this path)
+    pending = [((func,), row[3]) for func, row in stats.items() if not row[4]]
+    while pending:
+        path, seconds = pending.pop()
+        _, _, own_time, cumulative_time, _ = stats[path[-1]]
+        share = seconds / cumulative_time if cumulative_time else 0.0
+
+        self_seconds = own_time * share
+        for callee, edge_seconds in callees.get(path[-1], ()):
+            child_seconds = edge_seconds * share
+            if callee in path:
+                # Recursive calls are already inside the outer call's time
+                continue
+            if len(path) >= MAX_STACK_DEPTH or child_seconds * 1e6 < MIN_STACK_MICROSECONDS:
+                self_seconds += child_seconds
+                continue
+            pending.append((path + (callee,), child_seconds))
+
+        if self_seconds > 0:
+            stack = ';'.join(prefix + tuple(frame_label(func) for func in path))
+            stacks[stack] = stacks.get(stack, 0.0) + self_seconds
+    return stacks
+
+def write_collapsed(merged, output):
+    """
+    Write every handler's stacks as collapsed-stack lines; returns the line count
+    """
+    lines = []
+    for handler, stats in sorted(merged.items()):
+        for stack, seconds in collapsed_stacks(stats.stats, root=handler).items():
+            microseconds = int(round(seconds * 1e6))
+            if microseconds >= MIN_STACK_MICROSECONDS:
+                lines.append(f"{stack} {microseconds}\n")
+    lines.sort()
+    output.writelines(lines)
+    return len(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('store_url', nargs='?', default=clos_profiler.PROFILE_STORE_URL,
+                        help='s3://bucket/prefix or a local directory (default: PROFILE_STORE_URL)')
+    parser.add_argument('--handler', help='only this handler, e.g. stage-gate-processor')
+    parser.add_argument('--event-type', help='only this event type, e.g. push')
+    parser.add_argument('--since', help='first day to include, YYYY-MM-DD')
+    parser.add_argument('--until', help='last day to include, YYYY-MM-DD')
+    parser.add_argument('--limit', type=int, help='merge only the most recent N profiles')
+    parser.add_argument('--output', '-o', help='collapsed stacks file (default: stdout)')
+    parser.add_argument('--pstats', help='also write the merged profile of all selected handlers in pstats format')
+    parser.add_argument('--top', type=int, default=0, help='print the N functions with most cumulative time to stderr')
+    parser.add_argument('--workers', type=int, default=8, help='parallel downloads')
+    args = parser.parse_args()
+
+    prefix = f"{clos_profiler.slug(args.handler)}/" if args.handler else ''
+    keys = select_keys(clos_profiler.list_artifacts(args.store_url, prefix),
+                       args.handler, args.event_type, args.since, args.until)
+    if args.limit:
+        # Keys sort by day then time within a handler/event type; order across them by that suffix
+        keys = sorted(keys, key=lambda key: key.split('/', 2)[2])[-args.limit:]
+    if not keys:
+        parser.error(f"no profiles found in {args.store_url}")
+
+    merged = load_profiles(args.store_url, keys, workers=args.workers)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            lines = write_collapsed(merged, output)
+    else:
+        lines = write_collapsed(merged, sys.stdout)
+
+    if args.pstats or args.top:
+        everything = pstats.Stats(stream=sys.stderr).add(*merged.values())
+    if args.pstats:
+        everything.dump_stats(args.pstats)
+    if args.top:
+        everything.sort_stats('cumulative').print_stats(args.top)
+
+    print(f"Merged {len(keys)} profiles from {len(merged)} handlers into {lines} stacks", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+import functools
+import gzip
+import json
+import logging
+import marshal
+import os
+import random
+import re
+import time
+import uuid
+from datetime import datetime, timezone
+
+import clos_runtime
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Opt-in cProfile sampling of production invocations.
+#
+#   @clos_profiler.profile_handler('github-webhook')
+#   @clos_telemetry.instrument_handler('github-webhook')
+#   def handler(event, context): ...
+#
+# With PROFILE_SAMPLE_RATE=N, one invocation in N (picked at random, so
+# containers started together don't sample in lockstep) runs under
+# cProfile. Its stats are stored gzip-compressed, in the marshal format
+# cProfile.Profile.dump_stats writes, at
+#
+#   <PROFILE_STORE_URL>/<handler>/<event type>/<YYYY-MM-DD>/<HHMMSS>-<request id>.prof.gz
+#
+# PROFILE_STORE_URL is s3://bucket/prefix, or file:///path or a plain
+# directory for local runs. S3 objects also carry the handler, event type
+# and duration as object metadata. clos_profile_merge.py merges stored
+# profiles into one flame graph.
+#
+# The default rate of 0 costs one comparison per invocation. A sampled
+# invocation pays the profiler overhead plus the upload, which happens
+# after the handler returns; failing to profile or store never fails the
+# invocation.
+
+PROFILE_SAMPLE_RATE = int(os.environ.get('PROFILE_SAMPLE_RATE') or '0')
+PROFILE_STORE_URL = os.environ.get('PROFILE_STORE_URL') or '/tmp/clos-profiles'
+
+ARTIFACT_SUFFIX = '.prof.gz'
+
+NON_SLUG_PATTERN = re.compile(r'[^a-z0-9]+')
+
+_state = {
+    'sample_rate': PROFILE_SAMPLE_RATE,
+    'store_url': PROFILE_STORE_URL
+}
+
+def configure(sample_rate=None, store_url=None):
+    """
+    Change the sample rate or store, e.g. configure(1, '/tmp/profiles') to profile every call in a test
+    """
+    if sample_rate is not None:
+        _state['sample_rate'] = int(sample_rate)
+    if store_url is not None:
+        _state['store_url'] = store_url
+
+def should_sample():
+    rate = _state['sample_rate']
+    return rate > 0 and (rate == 1 or random.randrange(rate) == 0)
+
+def slug(value):
+    return NON_SLUG_PATTERN.sub('-', str(value).lower()).strip('-') or 'unknown'
+
+def event_type_of(event):
+    """
+    Event type of a handler's input: the GitHub event, the first SQS
+    record's detail-type, or the event_type / detail-type of a direct or
+    scheduled invocation
+    """
+    if not isinstance(event, dict):
+        return 'invoke'
+
+    headers = event.get('headers')
+    if isinstance(headers, dict):
+        for name, value in headers.items():
+            if name.lower() == 'x-github-event':
+                return value
+
+    records = event.get('Records')
+    if records:
+        try:
+            body = json.loads(records[0].get('body') or '{}')
+        except ValueError:
+            return 'sqs'
+        return body.get('detail-type') or body.get('detail_type') or body.get('event_type') or 'sqs'
+
+    return event.get('event_type') or event.get('detail-type') or 'invoke'
+
+def artifact_key(handler_name, event_type, request_id, now=None):
+    """
+    Store key of a profile, relative to PROFILE_STORE_URL
+    """
+    now = now or datetime.now(timezone.utc)
+    return f"{slug(handler_name)}/{slug(event_type)}/{now:%Y-%m-%d}/{now:%H%M%S}-{request_id}{ARTIFACT_SUFFIX}"
+
+def parse_store_url(store_url):
+    """
+    ('s3', bucket, prefix) for s3:// URLs, else ('file', None, directory)
+    """
+    if store_url.startswith('s3://'):
+        bucket, _, prefix = store_url[len('s3://'):].partition('/')
+        return 's3', bucket, prefix.strip('/')
+    if store_url.startswith('file://'):
+        store_url = store_url[len('file://'):]
+    return 'file', None, store_url
+
+def join_key(prefix, key):
+    return f"{prefix}/{key}" if prefix else key
+
+def write_artifact(store_url, key, data, metadata=None):
+    """
+    Write one artifact to the store; returns its location
+    """
+    scheme, bucket, root = parse_store_url(store_url)
+    if scheme == 's3':
+        object_key = join_key(root, key)
+        clos_runtime.get_client('s3').put_object(
+            Bucket=bucket,
+            Key=object_key,
+            Body=data,
+            ContentType='application/octet-stream',
+            Metadata=metadata or {}
+        )
+        return f"s3://{bucket}/{object_key}"
+
+    path = os.path.join(root, *key.split('/'))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as artifact:
+        artifact.write(data)
+    return path
+
+def list_artifacts(store_url, prefix=''):
+    """
+    Keys of the stored profiles under an optional key prefix, e.g. 'stage-gate-processor/'
+    """
+    scheme, bucket, root = parse_store_url(store_url)
+    keys = []
+    if scheme == 's3':
+        paginator = clos_runtime.get_client('s3').get_paginator('list_objects_v2')
+        strip = len(root) + 1 if root else 0
+        for page in paginator.paginate(Bucket=bucket, Prefix=join_key(root, prefix)):
+            for item in page.get('Contents', []):
+                if item['Key'].endswith(ARTIFACT_SUFFIX):
+                    keys.append(item['Key'][strip:])
+        return sorted(keys)
+
+    for directory, _, files in os.walk(root):
+        for name in files:
+            key = os.path.relpath(os.path.join(directory, name), root).replace(os.sep, '/')
+            if key.endswith(ARTIFACT_SUFFIX) and key.startswith(prefix):
+                keys.append(key)
+    return sorted(keys)
+
+def read_artifact(store_url, key):
+    """
+    Raw bytes of one stored artifact
+    """
+    scheme, bucket, root = parse_store_url(store_url)
+    if scheme == 's3':
+        return clos_runtime.get_client('s3').get_object(Bucket=bucket, Key=join_key(root, key))['Body'].read()
+    with open(os.path.join(root, *key.split('/')), 'rb') as artifact:
+        return artifact.read()
+
+def dump_profile(profile):
+    """
+    Compressed pstats data of a finished cProfile.Profile
+    """
+    profile.create_stats()
+    return gzip.compress(marshal.dumps(profile.stats), compresslevel=6)
+
+def load_profile(data):
+    """
+    pstats stats dict from a stored artifact
+    """
+    return marshal.loads(gzip.decompress(data))
+
+def save_invocation_profile(profile, handler_name, event, context, duration_ms):
+    """
+    Store a sampled invocation's profile; errors are logged, never raised
+    """
+    try:
+        event_type = event_type_of(event)
+        request_id = getattr(context, 'aws_request_id', None) or uuid.uuid4().hex
+        data = dump_profile(profile)
+        location = write_artifact(
+            _state['store_url'],
+            artifact_key(handler_name, event_type, request_id),
+            data,
+            metadata={
+                'handler': handler_name,
+                'event_type': slug(event_type),
+                'duration_ms': f"{duration_ms:.1f}"
+            }
+        )
+        logger.info(f"Stored {len(data)} byte profile of {handler_name} ({event_type}, {duration_ms:.1f} ms) at {location}")
+        return location
+    except Exception as e:
+        logger.error(f"Failed to store profile: {str(e)}")
+        return None
+
+def profile_handler(handler_name):
+    """
+    Decorate a Lambda handler to run one invocation in PROFILE_SAMPLE_RATE
+    under cProfile and store the profile
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def profiled(event, context):
+            if not _state['sample_rate'] or not should_sample():
+                return func(event, context)
+
+            import cProfile
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError as e:
+                # Another profiler (or debugger) already owns the hook
+                logger.error(f"Failed to start profiler: {str(e)}")
+                return func(event, context)
+
+            started_at = time.perf_counter()
+            try:
+                return func(event, context)
+            finally:
+                profile.disable()
+                save_invocation_profile(profile, handler_name, event, context,
+                                        (time.perf_counter() - started_at) * 1000)
+        return profiled
+    return decorate
@@ -0,0 +1,173 @@
+import json
+import logging
+import os
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+# Shared runtime for the CLOS lambdas: AWS clients, configuration, logging
+# and JSON helpers.
+#
+# AWS clients and resources are created on first use and kept at module
+# scope, so warm invocations reuse their connection pools instead of
+# building a new client (and loading its service model) on every call.
+# boto3 itself is only imported when the first client is needed, which
+# keeps it off the cold-start path of invocations that never call AWS.
+#
+# Clients are safe to share between threads; resources are not, so
+# get_resource() is for the single-threaded processors only.
+
+AWS_MAX_POOL_CONNECTIONS = int(os.environ.get('AWS_MAX_POOL_CONNECTIONS') or '10')
+AWS_CONNECT_TIMEOUT_SECONDS = float(os.environ.get('AWS_CONNECT_TIMEOUT_SECONDS') or '2')
+AWS_READ_TIMEOUT_SECONDS = float(os.environ.get('AWS_READ_TIMEOUT_SECONDS') or '10')
+AWS_MAX_ATTEMPTS = int(os.environ.get('AWS_MAX_ATTEMPTS') or '3')
+AWS_RETRY_MODE = os.environ.get('AWS_RETRY_MODE') or 'standard'
+
+LOG_LEVEL = (os.environ.get('LOG_LEVEL') or 'INFO').upper()
+
+_clients = {}
+_resources = {}
+_client_lock = threading.Lock()
+
+class ConfigError(ValueError):
+    """
+    Raised when a required environment variable is missing
+    """
+    pass
+
+def get_boto_config():
+    """
+    botocore Config shared by every client: pooled keep-alive connections,
+    short connect timeout and standard retries with backoff
+    """
+    from botocore.config import Config
+    return Config(
+        max_pool_connections=AWS_MAX_POOL_CONNECTIONS,
+        connect_timeout=AWS_CONNECT_TIMEOUT_SECONDS,
+        read_timeout=AWS_READ_TIMEOUT_SECONDS,
+        tcp_keepalive=True,
+        retries={'mode': AWS_RETRY_MODE, 'max_attempts': AWS_MAX_ATTEMPTS}
+    )
+
+def get_client(service_name):
+    """
+    Get the module-scope boto3 client for a service, created on first use
+    """
+    client = _clients.get(service_name)
+    if client is not None:
+        return client
+
+    with _client_lock:
+        if service_name not in _clients:
+            import boto3
+            _clients[service_name] = boto3.client(service_name, config=get_boto_config())
+        return _clients[service_name]
+
+def get_resource(service_name):
+    """
+    Get the module-scope boto3 resource for a service, created on first use
+    """
+    resource = _resources.get(service_name)
+    if resource is not None:
+        return resource
+
+    with _client_lock:
+        if service_name not in _resources:
+            import boto3
+            _resources[service_name] = boto3.resource(service_name, config=get_boto_config())
+        return _resources[service_name]
+
+def get_table(table_name):
+    """
+    DynamoDB Table on the shared resource
+    """
+    return get_resource('dynamodb').Table(table_name)
+
+def reset_clients():
+    """
+    Forget cached clients and resources, e.g. after changing credentials in tests
+    """
+    with _client_lock:
+        _clients.clear()
+        _resources.clear()
+
+def env_flag(name, default=False):
+    """
+    Read a true/false environment variable
+    """
+    value = os.environ.get(name)
+    if not value:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+def env_json(name, default=None):
+    """
+    Read a JSON environment variable, e.g. SLACK_POD_CHANNELS
+    """
+    value = os.environ.get(name)
+    if not value:
+        return default
+    return json.loads(value)
+
+def load_config(required=(), optional=None):
+    """
+    Read a handler's settings from the environment.
+
+    Every name in required must be set and non-empty; optional maps names to
+    defaults. Returns one dict keyed by variable name, so a missing setting
+    is reported once, by name, instead of as a bare KeyError mid-handler.
+    """
+    missing = [name for name in required if not os.environ.get(name)]
+    if missing:
+        raise ConfigError(f"Missing required environment variables: {', '.join(missing)}")
+
+    config = {name: os.environ[name] for name in required}
+    for name, default in (optional or {}).items():
+        config[name] = os.environ.get(name) or default
+    return config
+
+def get_logger():
+    """
+    Root logger at LOG_LEVEL, as the Lambda runtime configures it
+    """
+    logger = logging.getLogger()
+    logger.setLevel(LOG_LEVEL)
+    return logger
+
+def json_default(value):
+    """
+    Encode the types our reports and events carry that json can't
+    """
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    return str(value)
+
+def dumps(value, **kwargs):
+    """
+    json.dumps with json_default for datetimes, decimals and UUIDs
+    """
+    return json.dumps(value, default=json_default, **kwargs)
+
+def loads(value):
+    """
+    json.loads that accepts bytes, str or an already-decoded value
+    """
+    if isinstance(value, (dict, list)):
+        return value
+    return json.loads(value)
+
+def response(status_code, body):
+    """
+    Lambda proxy response with a JSON body
+    """
+    return {
+        'statusCode': status_code,
+        'body': dumps(body)
+    }
@@ -0,0 +1,198 @@
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from string import Template
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Slack Web API delivery for the CLOS report lambdas.
+#
+# Messages are rendered from $-style templates (compiled once per
+# container), split into pages that fit Slack's limits, and posted as a
+# parent message with the remaining pages as thread replies. Messages for
+# different channels are posted concurrently over one pooled session.
+#
+# SLACK_API_URL can point at a local HTTP stand-in for testing; see
+# benchmarks/slack_delivery.py.
+
+SLACK_API_URL = os.environ.get('SLACK_API_URL', 'https://slack.com/api')
+SLACK_MAX_BLOCKS = 50
+SLACK_MAX_TEXT_LENGTH = 3000
+SLACK_POST_CONCURRENCY = int(os.environ.get('SLACK_POST_CONCURRENCY', '4'))
+SLACK_TIMEOUT_SECONDS = int(os.environ.get('SLACK_TIMEOUT_SECONDS', '10'))
+SLACK_MAX_RETRIES = 2
+
+_session = {'value': None, 'token': None}
+
+class SlackApiError(Exception):
+    """
+    Raised when the Slack API rejects a request
+    """
+    pass
+
+@lru_cache(maxsize=128)
+def compile_template(source):
+    """
+    Compile a $-style message template, cached per container
+    """
+    return Template(source)
+
+def render_text(source, values=None):
+    """
+    Render a template, truncating to Slack's text limit
+    """
+    text = compile_template(source).safe_substitute(values or {})
+    if len(text) > SLACK_MAX_TEXT_LENGTH:
+        text = text[:SLACK_MAX_TEXT_LENGTH - 1] + '…'
+    return text
+
+def header_block(source, values=None):
+    """
+    Build a header block; Slack caps header text at 150 characters
+    """
+    return {
+        "type": "header",
+        "text": {
+            "type": "plain_text",
+            "text": render_text(source, values)[:150]
+        }
+    }
+
+def section_block(source, values=None):
+    """
+    Build a mrkdwn section block
+    """
+    return {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": render_text(source, values)
+        }
+    }
+
+def context_block(source, values=None):
+    """
+    Build a mrkdwn context block
+    """
+    return {
+        "type": "context",
+        "elements": [
+            {
+                "type": "mrkdwn",
+                "text": render_text(source, values)
+            }
+        ]
+    }
+
+def paginate_blocks(blocks, max_blocks=SLACK_MAX_BLOCKS):
+    """
+    Split a block list into pages of at most max_blocks.
+
+    Every page after the first starts with a context block naming its
+    position, so it stays readable as a thread reply.
+    """
+    if len(blocks) <= max_blocks:
+        return [blocks]
+
+    pages = [blocks[:max_blocks]]
+    remaining = blocks[max_blocks:]
+    while remaining:
+        pages.append(remaining[:max_blocks - 1])
+        remaining = remaining[max_blocks - 1:]
+
+    for number, page in enumerate(pages[1:], start=2):
+        page.insert(0, context_block("_Continued ($number/$total)_", {'number': number, 'total': len(pages)}))
+
+    return pages
+
+def get_session(token):
+    """
+    Get the module-scope Slack session, sized for concurrent posting
+    """
+    if _session['value'] is not None and _session['token'] == token:
+        return _session['value']
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=SLACK_POST_CONCURRENCY)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'Authorization': f'Bearer {token}',
+        'Content-Type': 'application/json; charset=utf-8'
+    })
+
+    _session['value'] = session
+    _session['token'] = token
+    return session
+
+def post_message(session, channel, blocks, text, thread_ts=None):
+    """
+    Post one message with chat.postMessage, honouring rate-limit retries
+    """
+    payload = {'channel': channel, 'blocks': blocks, 'text': text}
+    if thread_ts:
+        payload['thread_ts'] = thread_ts
+
+    for attempt in range(SLACK_MAX_RETRIES + 1):
+        response = session.post(f"{SLACK_API_URL}/chat.postMessage", json=payload, timeout=SLACK_TIMEOUT_SECONDS)
+
+        if response.status_code == 429 and attempt < SLACK_MAX_RETRIES:
+            retry_after = int(response.headers.get('Retry-After', '1'))
+            logger.warning(f"Slack rate limited posting to {channel}, retrying in {retry_after}s")
+            time.sleep(retry_after)
+            continue
+
+        response.raise_for_status()
+        body = response.json()
+        if not body.get('ok'):
+            raise SlackApiError(body.get('error', 'unknown_error'))
+        return body
+
+    raise SlackApiError('rate_limited')
+
+def post_threaded(session, channel, blocks, text):
+    """
+    Post a message, sending any overflow pages as replies in its thread
+    """
+    pages = paginate_blocks(blocks)
+    parent = post_message(session, channel, pages[0], text)
+
+    for page in pages[1:]:
+        post_message(session, channel, page, text, thread_ts=parent['ts'])
+
+    return {'channel': channel, 'ts': parent['ts'], 'messages': len(pages)}
+
+def deliver_messages(token, messages):
+    """
+    Post messages to their channels concurrently.
+
+    messages is a list of {'channel', 'blocks', 'text'}. A failure in one
+    channel does not stop the others; each gets its own result entry.
+    """
+    session = get_session(token)
+
+    def deliver(message):
+        try:
+            return dict(post_threaded(session, message['channel'], message['blocks'], message['text']), status='success')
+        except Exception as e:
+            logger.error(f"Failed to post to Slack channel {message['channel']}: {str(e)}")
+            return {'channel': message['channel'], 'status': 'error', 'error': str(e)}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(SLACK_POST_CONCURRENCY, len(messages)))) as executor:
+        results = list(executor.map(deliver, messages))
+
+    failed = sum(1 for result in results if result['status'] != 'success')
+    if failed == 0:
+        status = 'success'
+    elif failed < len(results):
+        status = 'partial'
+    else:
+        status = 'error'
+
+    return {'status': status, 'channels': results}
@@ -0,0 +1,287 @@
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Timings, counters and histograms for the CLOS lambdas, written to the
+# log as CloudWatch Embedded Metric Format (EMF) lines.
+#
+#   @clos_telemetry.instrument_handler('github-webhook')
+#   def handler(event, context):
+#       clos_telemetry.set_dimensions(event_type='push', pod='Ratio')
+#       with clos_telemetry.timer('signature_check'):
+#           ...
+#       clos_telemetry.count('events_published')
+#
+#   @clos_telemetry.timer('slack_delivery')
+#   def send_daily_unblock_to_slack(report): ...
+#
+# Every metric carries the handler, event_type and pod dimensions current
+# when it was recorded; CloudWatch gets both the per-pod series and the
+# (handler, event_type) series across pods. Values are buffered for the
+# invocation and flushed as one line per dimension combination when the
+# instrumented handler returns. Histogram values are sent as EMF value
+# arrays, so CloudWatch can report percentiles for them.
+#
+# EMF_METRICS_ENABLED=false (the default outside Lambda) makes every call
+# return after a single flag check. EMF_SINK=memory keeps the documents
+# in memory_sink().documents instead of printing them, for tests.
+
+EMF_METRICS_ENABLED = (os.environ.get('EMF_METRICS_ENABLED') or 'false').lower() == 'true'
+EMF_NAMESPACE = os.environ.get('EMF_NAMESPACE') or 'CLOS'
+EMF_SINK = os.environ.get('EMF_SINK') or 'stdout'
+
+# CloudWatch limits per EMF document
+EMF_MAX_METRICS = 100
+EMF_MAX_VALUES = 100
+
+class StdoutSink:
+    """
+    Writes each document as one bare JSON line, which CloudWatch Logs extracts metrics from
+    """
+
+    def write(self, document):
+        sys.stdout.write(json.dumps(document, separators=(',', ':')) + '\n')
+        sys.stdout.flush()
+
+class MemorySink:
+    """
+    Keeps documents in memory, for tests and local runs
+    """
+
+    def __init__(self):
+        self.documents = []
+
+    def write(self, document):
+        self.documents.append(document)
+
+    def values(self, name, **dimensions):
+        """
+        Every value recorded for a metric, optionally filtered by dimension values
+        """
+        found = []
+        for document in self.documents:
+            if name in document and all(document.get(key) == value for key, value in dimensions.items()):
+                value = document[name]
+                found.extend(value if isinstance(value, list) else [value])
+        return found
+
+    def clear(self):
+        self.documents = []
+
+_state = {
+    'enabled': EMF_METRICS_ENABLED,
+    'sink': MemorySink() if EMF_SINK == 'memory' else StdoutSink(),
+    'dimensions': {},
+    'cold_start': True
+}
+# (dimension items) -> metric name -> {'unit', 'kind', 'values'}
+_buffer = {}
+_buffer_lock = threading.Lock()
+
+def enabled():
+    return _state['enabled']
+
+def configure(enabled=None, sink=None):
+    """
+    Turn metrics on or off and swap the sink, e.g. configure(True, MemorySink()) in a test
+    """
+    if enabled is not None:
+        _state['enabled'] = enabled
+    if sink is not None:
+        _state['sink'] = sink
+    return _state['sink']
+
+def memory_sink():
+    """
+    The current sink if it is a MemorySink, else None
+    """
+    sink = _state['sink']
+    return sink if isinstance(sink, MemorySink) else None
+
+def set_dimensions(**dimensions):
+    """
+    Set dimensions (event_type, pod, ...) for the metrics recorded after this call;
+    a None value removes the dimension
+    """
+    if not _state['enabled']:
+        return
+    for key, value in dimensions.items():
+        if value is None:
+            _state['dimensions'].pop(key, None)
+        else:
+            _state['dimensions'][key] = str(value)
+
+def record(name, value, unit, kind, dimensions=None, inherit=True):
+    """
+    Buffer one value; kind is 'counter' (summed) or 'histogram' (kept as a list)
+    """
+    if not _state['enabled']:
+        return
+    merged = dict(_state['dimensions']) if inherit else {'handler': _state['dimensions'].get('handler', 'unknown')}
+    for key, dimension_value in (dimensions or {}).items():
+        if dimension_value is not None:
+            merged[key] = str(dimension_value)
+    key = tuple(sorted(merged.items()))
+
+    with _buffer_lock:
+        metrics = _buffer.setdefault(key, {})
+        metric = metrics.get(name)
+        if metric is None:
+            metric = metrics[name] = {'unit': unit, 'kind': kind, 'values': []}
+        if kind == 'counter' and metric['values']:
+            metric['values'][0] += value
+        else:
+            metric['values'].append(value)
+
+def count(name, value=1, **dimensions):
+    """
+    Add to a counter
+    """
+    if _state['enabled']:
+        record(name, value, 'Count', 'counter', dimensions)
+
+def observe(name, value, unit='None', **dimensions):
+    """
+    Add a sample to a histogram (sizes, lags, durations measured elsewhere)
+    """
+    if _state['enabled']:
+        record(name, value, unit, 'histogram', dimensions)
+
+class Timer:
+    """
+    Times a block or a function in milliseconds, as a context manager or a decorator
+    """
+    __slots__ = ('name', 'dimensions', 'started_at')
+
+    def __init__(self, name, **dimensions):
+        self.name = name
+        self.dimensions = dimensions
+        self.started_at = None
+
+    def __enter__(self):
+        if _state['enabled']:
+            self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if self.started_at is not None:
+            record(self.name, (time.perf_counter() - self.started_at) * 1000, 'Milliseconds', 'histogram',
+                   self.dimensions)
+            self.started_at = None
+        return False
+
+    def __call__(self, func):
+        name = self.name
+        dimensions = self.dimensions
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            if not _state['enabled']:
+                return func(*args, **kwargs)
+            # A fresh timer per call, so concurrent calls don't share a start time
+            with Timer(name, **dimensions):
+                return func(*args, **kwargs)
+        return timed
+
+def timer(name, **dimensions):
+    """
+    Timer for `with clos_telemetry.timer('stage'):` or `@clos_telemetry.timer('stage')`
+    """
+    return Timer(name, **dimensions)
+
+def dimension_sets(keys):
+    """
+    The full dimension set plus, for per-pod metrics, the same set without pod
+    """
+    keys = list(keys)
+    if 'pod' in keys and len(keys) > 1:
+        return [keys, [key for key in keys if key != 'pod']]
+    return [keys]
+
+def build_documents(buffer, timestamp_ms):
+    """
+    EMF documents for the buffered metrics, split to stay within CloudWatch limits
+    """
+    documents = []
+    for key, metrics in buffer.items():
+        dimensions = dict(key)
+        names = list(metrics)
+        for start in range(0, len(names), EMF_MAX_METRICS):
+            batch = names[start:start + EMF_MAX_METRICS]
+            longest = max(len(metrics[name]['values']) for name in batch)
+            for offset in range(0, longest, EMF_MAX_VALUES):
+                document = dict(dimensions)
+                definitions = []
+                for name in batch:
+                    values = metrics[name]['values'][offset:offset + EMF_MAX_VALUES]
+                    if not values:
+                        continue
+                    rounded = [round(value, 3) for value in values]
+                    document[name] = rounded if metrics[name]['kind'] == 'histogram' else rounded[0]
+                    definitions.append({'Name': name, 'Unit': metrics[name]['unit']})
+                document['_aws'] = {
+                    'Timestamp': timestamp_ms,
+                    'CloudWatchMetrics': [{
+                        'Namespace': EMF_NAMESPACE,
+                        'Dimensions': dimension_sets(dimensions),
+                        'Metrics': definitions
+                    }]
+                }
+                documents.append(document)
+    return documents
+
+def flush():
+    """
+    Write the buffered metrics to the sink and clear the buffer
+    """
+    if not _state['enabled']:
+        return 0
+    with _buffer_lock:
+        buffer = dict(_buffer)
+        _buffer.clear()
+    documents = build_documents(buffer, int(time.time() * 1000))
+    for document in documents:
+        _state['sink'].write(document)
+    return len(documents)
+
+def instrument_handler(handler_name):
+    """
+    Decorate a Lambda handler: sets the handler dimension, records its
+    duration, errors and cold starts, and flushes metrics when it returns
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def instrumented(event, context):
+            if not _state['enabled']:
+                return func(event, context)
+
+            _state['dimensions'] = {'handler': handler_name}
+            if _state['cold_start']:
+                _state['cold_start'] = False
+                record('cold_start', 1, 'Count', 'counter', inherit=False)
+
+            started_at = time.perf_counter()
+            failed = True
+            try:
+                result = func(event, context)
+                failed = isinstance(result, dict) and result.get('statusCode', 200) >= 500
+                return result
+            finally:
+                record('invocation_ms', (time.perf_counter() - started_at) * 1000, 'Milliseconds', 'histogram',
+                       inherit=False)
+                record('invocation_errors', 1 if failed else 0, 'Count', 'counter', inherit=False)
+                try:
+                    flush()
+                except Exception as e:
+                    # Metrics must never fail the invocation
+                    logger.error(f"Failed to flush metrics: {str(e)}")
+                _state['dimensions'] = {}
+        return instrumented
+    return decorate
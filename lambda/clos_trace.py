@@ -0,0 +1,127 @@
+import json
+import logging
+import time
+import uuid
+
+import clos_telemetry
+
+logger = logging.getLogger()
+logger.setLevel(logging.INFO)
+
+# Trace context carried from the GitHub webhook through the CLOS pipeline.
+#
+# The webhook starts a trace per delivery: trace_id is the GitHub
+# delivery ID and ingested_at_ms the time API Gateway received it. The
+# trace travels as detail.trace on EventBridge events and as the trace_id /
+# ingested_at_ms attributes on SQS messages, and the processors copy it
+# onto the result events they emit, so one delivery can be followed
+# through every hop.
+#
+# For each SQS record a processor handles, begin_record() measures queue
+# dwell (SentTimestamp to now) and lag since ingest, mark() closes a span
+# since the previous mark, and finish_record() adds the end-to-end time,
+# records every span as a metric and logs them under the trace ID:
+#
+#   trace = clos_trace.begin_record(record, detail)
+#   result = process(detail)
+#   clos_trace.mark(trace, 'process_ms')
+#   emit(clos_trace.attach(result, trace))
+#   clos_trace.mark(trace, 'emit_ms')
+#   clos_trace.finish_record(trace)
+
+TRACE_ID_ATTRIBUTE = 'trace_id'
+INGESTED_AT_ATTRIBUTE = 'ingested_at_ms'
+
+def now_ms():
+    return int(time.time() * 1000)
+
+def start_trace(delivery_id=None, ingested_at_ms=None):
+    """
+    New trace context at ingest; unknown delivery IDs get a random trace ID
+    """
+    if not delivery_id or delivery_id == 'unknown':
+        delivery_id = uuid.uuid4().hex
+    return {
+        'trace_id': str(delivery_id),
+        'ingested_at_ms': int(ingested_at_ms) if ingested_at_ms else now_ms()
+    }
+
+def message_attributes(trace):
+    """
+    SQS MessageAttributes carrying a trace context
+    """
+    if not trace:
+        return {}
+    return {
+        TRACE_ID_ATTRIBUTE: {
+            'StringValue': trace['trace_id'],
+            'DataType': 'String'
+        },
+        INGESTED_AT_ATTRIBUTE: {
+            'StringValue': str(trace['ingested_at_ms']),
+            'DataType': 'Number'
+        }
+    }
+
+def extract(record, detail=None):
+    """
+    Trace context of an SQS record: the event detail's trace, then the
+    message attributes, else a new trace starting when the message was sent
+    """
+    trace = (detail or {}).get('trace')
+    if isinstance(trace, dict) and trace.get('trace_id'):
+        return {'trace_id': str(trace['trace_id']), 'ingested_at_ms': int(trace.get('ingested_at_ms') or now_ms())}
+
+    # The Lambda SQS event uses camelCase keys for message attributes
+    attributes = record.get('messageAttributes') or {}
+    trace_id = (attributes.get(TRACE_ID_ATTRIBUTE) or {}).get('stringValue')
+    ingested_at_ms = (attributes.get(INGESTED_AT_ATTRIBUTE) or {}).get('stringValue')
+    if trace_id:
+        return start_trace(trace_id, ingested_at_ms)
+
+    sent_at_ms = (record.get('attributes') or {}).get('SentTimestamp')
+    return start_trace(record.get('messageId'), sent_at_ms)
+
+def begin_record(record, detail=None):
+    """
+    Start timing one SQS record: queue dwell and lag since ingest
+    """
+    trace = extract(record, detail)
+    received_at_ms = now_ms()
+    spans = {'ingest_lag_ms': max(received_at_ms - trace['ingested_at_ms'], 0)}
+
+    sent_at_ms = (record.get('attributes') or {}).get('SentTimestamp')
+    if sent_at_ms:
+        spans['queue_dwell_ms'] = max(received_at_ms - int(sent_at_ms), 0)
+
+    trace.update(spans=spans, checkpoint=time.perf_counter())
+    return trace
+
+def mark(trace, name):
+    """
+    Close a span covering the time since begin_record() or the previous mark()
+    """
+    now = time.perf_counter()
+    trace['spans'][name] = round((now - trace['checkpoint']) * 1000, 2)
+    trace['checkpoint'] = now
+
+def attach(result, trace):
+    """
+    Copy the trace context onto a result event's detail
+    """
+    if result is not None:
+        result['trace'] = {'trace_id': trace['trace_id'], 'ingested_at_ms': trace['ingested_at_ms']}
+    return result
+
+def finish_record(trace):
+    """
+    Add the end-to-end time, record the spans as metrics and log them
+    """
+    spans = trace['spans']
+    spans['end_to_end_ms'] = max(now_ms() - trace['ingested_at_ms'], 0)
+
+    for name, value in spans.items():
+        clos_telemetry.observe(name, value, unit='Milliseconds')
+
+    logger.info(f"Trace spans: {json.dumps({'trace_id': trace['trace_id'], 'spans': spans})}")
+    return spans
@@ -1,265 +1,1310 @@
 import json
-import boto3
-import logging
-import psycopg2
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone, timedelta
 import os
-import requests
 
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+import clos_cache
+import clos_db
+import clos_metrics
+import clos_partitions
+import clos_profiler
+import clos_runtime
+import clos_slack
+import clos_telemetry
 
+logger = clos_runtime.get_logger()
+
+# Report statements return at most the top rows (per pod for the pod slices)
+# or one row per pod; totals come from COUNT queries
+REPORT_TOP_N = int(os.environ.get('REPORT_TOP_N', '20'))
+
+# Incremental daily unblock reports
+BLOCKED_AFTER_DAYS = 3
+ESCALATE_AFTER_DAYS = int(os.environ.get('ESCALATE_AFTER_DAYS', '7'))
+IMPEDIMENT_WINDOW_DAYS = 7
+FULL_REFRESH_AFTER_DAYS = int(os.environ.get('FULL_REFRESH_AFTER_DAYS', '7'))
+
+# WIP lock aggregation
+WIP_SCAN_SEGMENTS = int(os.environ.get('WIP_SCAN_SEGMENTS', '4'))
+WIP_COUNTER_FAST_PATH = clos_runtime.env_flag('WIP_COUNTER_FAST_PATH', True)
+WIP_COUNTER_MAX_AGE_SECONDS = int(os.environ.get('WIP_COUNTER_MAX_AGE_SECONDS', '86400'))
+WIP_COUNTER_PREFIX = 'COUNTER#'
+
+# Slack delivery: the full report goes to SLACK_REPORT_CHANNEL, and each
+# pod listed in SLACK_POD_CHANNELS ({"Ratio": "#ratio-pod", ...}) also gets its slice
+SLACK_REPORT_CHANNEL = os.environ.get('SLACK_REPORT_CHANNEL', '#clos-daily')
+SLACK_POD_CHANNELS = clos_runtime.env_json('SLACK_POD_CHANNELS', {})
+
+SLACK_TEMPLATES = {
+    'unblock_header': "🚨 Daily Unblock Report",
+    'pod_unblock_header': "🚨 Daily Unblock Report: $pod_name",
+    'unblock_delta': "Since last report: *$newly_blocked_count* newly blocked, *$resolved_count* resolved, *$escalated_count* escalated",
+    'blocked_heading': "*Blocked Items ($count):*",
+    'blocked_item': "• *$name* ($pod_name) - $days_blocked days in $current_stage",
+    'wip_heading': "*WIP Violations ($count):*",
+    'wip_violation': "• *$pod_id*: $current_count/$limit $item_type",
+    'demo_header': "🎯 Weekly Demo Preparation",
+    'pod_demo_header': "🎯 Weekly Demo Preparation: $pod_name",
+    'week_ending': "Week ending: $week_ending",
+    'demo_heading': "*Demo Candidates ($count):*",
+    'demo_candidate': "• *$name* ($pod_name)$url_text",
+    'completed_heading': "*Completed This Week ($count):*",
+    'completed_item': "• *$project_name* - $from_stage → $to_stage"
+}
+
+# Weekly demo fan-out: when a queue is configured, the weekly demo is built
+# as one work item per active pod and merged by whichever worker finishes last
+DEMO_FANOUT_QUEUE_URL = os.environ.get('DEMO_FANOUT_QUEUE_URL', '')
+DEMO_FANOUT_RETENTION_DAYS = 30
+
+WIP_LIMITS = {
+    'Ratio': {'projects': 3, 'pull_requests': 5},
+    'Nanda': {'projects': 2, 'pull_requests': 4},
+    'Meta': {'projects': 2, 'pull_requests': 3}
+}
+
+# Report queries, prepared once per warm connection
+REPORT_STATEMENTS = {
+    'blocked_items': """
+        SELECT 
+            p.id,
+            p.name,
+            p.current_stage,
+            p.updated_at,
+            pod.name as pod_name,
+            u.name as lead_name
+        FROM projects p
+        JOIN pods pod ON p.pod_id = pod.id
+        LEFT JOIN users u ON pod.lead_id = u.id
+        WHERE p.updated_at < NOW() - INTERVAL '3 days'
+            AND p.current_stage != 'monitoring'
+        ORDER BY p.updated_at ASC
+        LIMIT $1
+        """,
+    'active_impediments': """
+        SELECT 
+            a.id,
+            a.action,
+            a.details,
+            a.created_at,
+            u.name as user_name,
+            p.name as project_name
+        FROM activities a
+        JOIN users u ON a.user_id = u.id
+        LEFT JOIN projects p ON a.resource_id = p.id AND a.resource_type = 'project'
+        WHERE a.category IN ('impediment', 'blocked')
+            AND a.created_at > NOW() - INTERVAL '7 days'
+        ORDER BY a.created_at DESC
+        LIMIT $1
+        """,
+    'unblock_totals': """
+        SELECT
+            (SELECT COUNT(*)
+             FROM projects p
+             JOIN pods pod ON p.pod_id = pod.id
+             WHERE p.updated_at < $2::timestamptz - INTERVAL '3 days'
+                AND p.current_stage != 'monitoring') as blocked_items,
+            (SELECT COUNT(*)
+             FROM projects p
+             JOIN pods pod ON p.pod_id = pod.id
+             WHERE p.updated_at >= $1::timestamptz - INTERVAL '3 days'
+                AND p.updated_at < $2::timestamptz - INTERVAL '3 days'
+                AND p.current_stage != 'monitoring') as newly_blocked,
+            (SELECT COUNT(*)
+             FROM projects p
+             JOIN pods pod ON p.pod_id = pod.id
+             WHERE p.updated_at >= $1::timestamptz
+                AND p.updated_at < $2::timestamptz
+                AND COALESCE(
+                    (SELECT MAX(st.approved_at)
+                     FROM stage_transitions st
+                     WHERE st.project_id = p.id AND st.approved_at < $1::timestamptz),
+                    p.created_at
+                ) < $1::timestamptz - INTERVAL '3 days') as resolved
+        """,
+    'newly_blocked_items': """
+        SELECT 
+            p.id,
+            p.name,
+            p.current_stage,
+            p.updated_at,
+            pod.name as pod_name,
+            u.name as lead_name
+        FROM projects p
+        JOIN pods pod ON p.pod_id = pod.id
+        LEFT JOIN users u ON pod.lead_id = u.id
+        WHERE p.updated_at >= $1::timestamptz - INTERVAL '3 days'
+            AND p.updated_at < $2::timestamptz - INTERVAL '3 days'
+            AND p.current_stage != 'monitoring'
+        ORDER BY p.updated_at DESC
+        LIMIT $3
+        """,
+    'escalated_items': """
+        SELECT 
+            p.id,
+            p.name,
+            p.current_stage,
+            p.updated_at,
+            pod.name as pod_name,
+            u.name as lead_name
+        FROM projects p
+        JOIN pods pod ON p.pod_id = pod.id
+        LEFT JOIN users u ON pod.lead_id = u.id
+        WHERE p.updated_at >= $1::timestamptz - make_interval(days => $3)
+            AND p.updated_at < $2::timestamptz - make_interval(days => $3)
+            AND p.current_stage != 'monitoring'
+        ORDER BY p.updated_at ASC
+        LIMIT $4
+        """,
+    'resolved_blocked_items': """
+        SELECT 
+            p.id,
+            p.name,
+            p.current_stage,
+            p.updated_at,
+            pod.name as pod_name,
+            NULL as lead_name
+        FROM projects p
+        JOIN pods pod ON p.pod_id = pod.id
+        WHERE p.updated_at >= $1::timestamptz
+            AND p.updated_at < $2::timestamptz
+            -- Stage approvals are what move updated_at, so the last one before
+            -- the previous watermark says whether the project was blocked then
+            AND COALESCE(
+                (SELECT MAX(st.approved_at)
+                 FROM stage_transitions st
+                 WHERE st.project_id = p.id AND st.approved_at < $1::timestamptz),
+                p.created_at
+            ) < $1::timestamptz - INTERVAL '3 days'
+        ORDER BY p.updated_at DESC
+        LIMIT $3
+        """,
+    'new_impediments': """
+        SELECT 
+            a.id,
+            a.action,
+            a.details,
+            a.created_at,
+            u.name as user_name,
+            p.name as project_name
+        FROM activities a
+        JOIN users u ON a.user_id = u.id
+        LEFT JOIN projects p ON a.resource_id = p.id AND a.resource_type = 'project'
+        WHERE a.category IN ('impediment', 'blocked')
+            AND a.created_at >= $1::timestamptz
+            AND a.created_at < $2::timestamptz
+        ORDER BY a.created_at DESC
+        LIMIT $3
+        """,
+    'impediment_counts_by_day': """
+        SELECT a.created_at::date, COUNT(*)
+        FROM activities a
+        JOIN users u ON a.user_id = u.id
+        WHERE a.category IN ('impediment', 'blocked')
+            AND a.created_at >= $1::timestamptz
+            AND a.created_at < $2::timestamptz
+        GROUP BY a.created_at::date
+        """,
+    'latest_report_snapshot': """
+        SELECT NOW(), rs.watermark, rs.state
+        FROM (SELECT 1) now_row
+        LEFT JOIN LATERAL (
+            SELECT watermark, state
+            FROM report_snapshots
+            WHERE report_type = $1
+            ORDER BY watermark DESC
+            LIMIT 1
+        ) rs ON true
+        """,
+    'weekly_completed_work': """
+        SELECT 
+            st.project_id,
+            p.name,
+            st.from_stage,
+            st.to_stage,
+            st.approved_at,
+            pod.name as pod_name,
+            u.name as approved_by_name
+        FROM stage_transitions st
+        JOIN projects p ON st.project_id = p.id
+        JOIN pods pod ON p.pod_id = pod.id
+        LEFT JOIN users u ON st.approved_by = u.id
+        WHERE st.approved_at > NOW() - INTERVAL '7 days'
+        ORDER BY st.approved_at DESC
+        LIMIT $1
+        """,
+    'demo_candidates': """
+        SELECT 
+            p.id,
+            p.name,
+            p.current_stage,
+            p.deployed_url,
+            pod.name as pod_name,
+            p.updated_at
+        FROM projects p
+        JOIN pods pod ON p.pod_id = pod.id
+        WHERE p.current_stage IN ('deployment', 'monitoring')
+            AND p.updated_at > NOW() - INTERVAL '14 days'
+        ORDER BY p.updated_at DESC
+        LIMIT $1
+        """,
+    'demo_totals': """
+        SELECT
+            (SELECT COUNT(*)
+             FROM stage_transitions st
+             JOIN projects p ON st.project_id = p.id
+             JOIN pods pod ON p.pod_id = pod.id
+             WHERE st.approved_at > NOW() - INTERVAL '7 days') as completed_work,
+            (SELECT COUNT(*)
+             FROM projects p
+             JOIN pods pod ON p.pod_id = pod.id
+             WHERE p.current_stage IN ('deployment', 'monitoring')
+                AND p.updated_at > NOW() - INTERVAL '14 days') as demo_candidates
+        """,
+    'active_pods': """
+        SELECT id, name
+        FROM pods
+        WHERE status = 'active'
+        ORDER BY name
+        """,
+    'top_blocked_items_per_pod': """
+        SELECT id, name, current_stage, updated_at, pod_name, lead_name
+        FROM (
+            SELECT
+                p.id,
+                p.name,
+                p.current_stage,
+                p.updated_at,
+                pod.name as pod_name,
+                u.name as lead_name,
+                ROW_NUMBER() OVER (PARTITION BY p.pod_id ORDER BY p.updated_at ASC) as pod_rank
+            FROM projects p
+            JOIN pods pod ON p.pod_id = pod.id
+            LEFT JOIN users u ON pod.lead_id = u.id
+            WHERE p.updated_at < $1::timestamptz - INTERVAL '3 days'
+                AND p.current_stage != 'monitoring'
+        ) ranked
+        WHERE pod_rank <= $2
+        ORDER BY pod_name, updated_at ASC
+        """,
+    'top_completed_work_per_pod': """
+        SELECT project_id, name, from_stage, to_stage, approved_at, pod_name, approved_by_name
+        FROM (
+            SELECT
+                st.project_id,
+                p.name,
+                st.from_stage,
+                st.to_stage,
+                st.approved_at,
+                pod.name as pod_name,
+                u.name as approved_by_name,
+                ROW_NUMBER() OVER (PARTITION BY p.pod_id ORDER BY st.approved_at DESC) as pod_rank
+            FROM stage_transitions st
+            JOIN projects p ON st.project_id = p.id
+            JOIN pods pod ON p.pod_id = pod.id
+            LEFT JOIN users u ON st.approved_by = u.id
+            WHERE st.approved_at > NOW() - INTERVAL '7 days'
+        ) ranked
+        WHERE pod_rank <= $1
+        ORDER BY pod_name, approved_at DESC
+        """,
+    'top_demo_candidates_per_pod': """
+        SELECT id, name, current_stage, deployed_url, pod_name, updated_at
+        FROM (
+            SELECT
+                p.id,
+                p.name,
+                p.current_stage,
+                p.deployed_url,
+                pod.name as pod_name,
+                p.updated_at,
+                ROW_NUMBER() OVER (PARTITION BY p.pod_id ORDER BY p.updated_at DESC) as pod_rank
+            FROM projects p
+            JOIN pods pod ON p.pod_id = pod.id
+            WHERE p.current_stage IN ('deployment', 'monitoring')
+                AND p.updated_at > NOW() - INTERVAL '14 days'
+        ) ranked
+        WHERE pod_rank <= $1
+        ORDER BY pod_name, updated_at DESC
+        """,
+    'pod_weekly_completed_work': """
+        SELECT 
+            st.project_id,
+            p.name,
+            st.from_stage,
+            st.to_stage,
+            st.approved_at,
+            pod.name as pod_name,
+            u.name as approved_by_name
+        FROM stage_transitions st
+        JOIN projects p ON st.project_id = p.id
+        JOIN pods pod ON p.pod_id = pod.id
+        LEFT JOIN users u ON st.approved_by = u.id
+        WHERE p.pod_id = $1::uuid
+            AND st.approved_at > NOW() - INTERVAL '7 days'
+        ORDER BY st.approved_at DESC
+        LIMIT $2
+        """,
+    'pod_demo_candidates': """
+        SELECT 
+            p.id,
+            p.name,
+            p.current_stage,
+            p.deployed_url,
+            pod.name as pod_name,
+            p.updated_at
+        FROM projects p
+        JOIN pods pod ON p.pod_id = pod.id
+        WHERE p.pod_id = $1::uuid
+            AND p.current_stage IN ('deployment', 'monitoring')
+            AND p.updated_at > NOW() - INTERVAL '14 days'
+        ORDER BY p.updated_at DESC
+        LIMIT $2
+        """,
+    'pod_demo_totals': """
+        SELECT
+            (SELECT COUNT(*)
+             FROM stage_transitions st
+             JOIN projects p ON st.project_id = p.id
+             WHERE p.pod_id = $1::uuid
+                AND st.approved_at > NOW() - INTERVAL '7 days') as completed_work,
+            (SELECT COUNT(*)
+             FROM projects p
+             WHERE p.pod_id = $1::uuid
+                AND p.current_stage IN ('deployment', 'monitoring')
+                AND p.updated_at > NOW() - INTERVAL '14 days') as demo_candidates
+        """,
+    'pod_weekly_summary': """
+        SELECT 
+            pod.name,
+            COALESCE(r.transitions_count, 0) as transitions_this_week,
+            (SELECT COUNT(*) FROM projects WHERE pod_id = pod.id AND current_stage = 'monitoring') as completed_projects,
+            (SELECT COUNT(*) FROM projects WHERE pod_id = pod.id) as total_active_projects,
+            pod.health_score
+        FROM pods pod
+        LEFT JOIN pod_weekly_rollups r
+            ON r.pod_id = pod.id AND r.week_start = date_trunc('week', NOW())::date
+        WHERE pod.id = $1::uuid
+        """,
+    'pod_weekly_summaries': """
+        SELECT 
+            pod.name,
+            COALESCE(r.transitions_count, 0) as transitions_this_week,
+            COALESCE(ps.completed_projects, 0) as completed_projects,
+            COALESCE(ps.total_active_projects, 0) as total_active_projects,
+            pod.health_score
+        FROM pods pod
+        LEFT JOIN pod_weekly_rollups r
+            ON r.pod_id = pod.id AND r.week_start = date_trunc('week', NOW())::date
+        LEFT JOIN (
+            SELECT
+                pod_id,
+                COUNT(*) FILTER (WHERE current_stage = 'monitoring') as completed_projects,
+                COUNT(*) as total_active_projects
+            FROM projects
+            GROUP BY pod_id
+        ) ps ON ps.pod_id = pod.id
+        WHERE pod.status = 'active'
+        """
+}
+
+# Rebuild the most recent weeks of pod_weekly_rollups from stage_transitions
+ROLLUP_REFRESH_WEEKS = int(os.environ.get('ROLLUP_REFRESH_WEEKS', '12'))
+
+ROLLUP_REFRESH_SQL = [
+    """
+    DELETE FROM pod_weekly_rollups
+    WHERE week_start >= (date_trunc('week', NOW()) - make_interval(weeks => %(weeks)s))::date
+    """,
+    """
+    INSERT INTO pod_weekly_rollups (pod_id, week_start, transitions_count, completed_transitions, updated_at)
+    SELECT
+        p.pod_id,
+        date_trunc('week', st.approved_at)::date,
+        COUNT(*),
+        COUNT(*) FILTER (WHERE st.to_stage = 'monitoring'),
+        NOW()
+    FROM stage_transitions st
+    JOIN projects p ON st.project_id = p.id
+    WHERE st.approved_at >= date_trunc('week', NOW()) - make_interval(weeks => %(weeks)s)
+        AND p.pod_id IS NOT NULL
+    GROUP BY p.pod_id, date_trunc('week', st.approved_at)::date
+    ON CONFLICT (pod_id, week_start) DO UPDATE SET
+        transitions_count = EXCLUDED.transitions_count,
+        completed_transitions = EXCLUDED.completed_transitions,
+        updated_at = NOW()
+    """
+]
+
+# Compact row types for report rows
+BlockedItemRow = namedtuple('BlockedItemRow', ['id', 'name', 'current_stage', 'updated_at', 'pod_name', 'lead_name'])
+ImpedimentRow = namedtuple('ImpedimentRow', ['id', 'action', 'details', 'created_at', 'user_name', 'project_name'])
+CompletedWorkRow = namedtuple('CompletedWorkRow', [
+    'project_id', 'project_name', 'from_stage', 'to_stage', 'approved_at', 'pod_name', 'approved_by_name'
+])
+DemoCandidateRow = namedtuple('DemoCandidateRow', ['id', 'name', 'current_stage', 'deployed_url', 'pod_name', 'updated_at'])
+PodSummaryRow = namedtuple('PodSummaryRow', [
+    'pod_name', 'transitions_this_week', 'completed_projects', 'total_active_projects', 'health_score'
+])
+
+@clos_profiler.profile_handler('daily-unblock')
+@clos_telemetry.instrument_handler('daily-unblock')
 def handler(event, context):
     """
     Handle daily unblock and weekly demo preparation
     """
     try:
+        if 'Records' in event:
+            # Weekly demo pod work items from the fan-out queue
+            clos_telemetry.set_dimensions(event_type='weekly_demo_pod')
+            return handle_demo_pod_work_items(event, context)
+        
         # Determine event type
         event_type = event.get('event_type', 'daily_unblock')
+        clos_telemetry.set_dimensions(event_type=event_type)
         
         logger.info(f"Processing {event_type} event")
         
         if event_type == 'weekly_demo':
+            if DEMO_FANOUT_QUEUE_URL and event.get('mode') != 'single':
+                return handle_weekly_demo_fanout(event, context)
             return handle_weekly_demo_preparation(event, context)
+        elif event_type == 'weekly_demo_aggregate':
+            return handle_weekly_demo_aggregate(event, context)
+        elif event_type == 'rollup_refresh':
+            return handle_rollup_refresh(event, context)
+        elif event_type == 'partition_maintenance':
+            return handle_partition_maintenance(event, context)
+        elif event_type == 'metric_rollup':
+            return handle_metric_rollup(event, context)
         else:
             return handle_daily_unblock(event, context)
             
     except Exception as e:
         logger.error(f"Daily unblock processor failed: {str(e)}")
-        return {
-            'statusCode': 500,
-            'body': json.dumps({'error': str(e)})
-        }
+        return clos_runtime.response(500, {'error': str(e)})
+
+def handle_daily_unblock(event, context):
+    """
+    Handle the daily unblock process.
+    
+    Runs incrementally from the last report's watermark: only projects and
+    activities that changed since then are listed, and the blocked, newly
+    blocked and resolved totals are COUNTs bounded by the two watermarks. A
+    full recompute of the lists and the impediment window happens on the
+    first run, when the snapshot is older than FULL_REFRESH_AFTER_DAYS, or
+    when the event sets full_refresh.
+    """
+    try:
+        snapshot = load_report_snapshot('daily_unblock')
+        # Replica reads may miss the most recent commits; keep the watermark
+        # behind them so the next incremental run still picks them up
+        watermark = snapshot['now'] - timedelta(seconds=clos_db.read_staleness_bound_seconds())
+        previous_watermark = snapshot['watermark']
+        previous_state = snapshot['state'] or {}
+        
+        full_refresh = (
+            event.get('full_refresh', False)
+            or previous_watermark is None
+            or watermark - previous_watermark > timedelta(days=FULL_REFRESH_AFTER_DAYS)
+        )
+        
+        if full_refresh:
+            window_start = watermark - timedelta(days=IMPEDIMENT_WINDOW_DAYS)
+            db_queries = {
+                'blocked_items': get_blocked_items,
+                'impediments': get_active_impediments,
+                'impediments_by_day': lambda cur: get_impediment_counts_by_day(cur, window_start, watermark)
+            }
+        else:
+            db_queries = {
+                'impediments': lambda cur: get_new_impediments(cur, previous_watermark, watermark),
+                'impediments_by_day': lambda cur: get_impediment_counts_by_day(cur, previous_watermark, watermark)
+            }
+        
+        db_queries['totals'] = lambda cur: get_unblock_totals(cur, previous_watermark, watermark)
+        if previous_watermark is not None:
+            db_queries['newly_blocked'] = lambda cur: get_newly_blocked_items(cur, previous_watermark, watermark)
+            db_queries['resolved'] = lambda cur: get_resolved_blocked_items(cur, previous_watermark, watermark)
+            db_queries['escalated'] = lambda cur: get_escalated_items(cur, previous_watermark, watermark)
+        
+        # Every pod's cache slice is rebuilt from its own blocked items, not the report's top N
+        db_queries['pod_blocked_items'] = lambda cur: get_blocked_items_per_pod(cur, watermark)
+        db_queries['pod_names'] = get_active_pod_names
+
+        # Run the report queries and the WIP violation scan concurrently
+        results, query_timings = run_report_queries(db_queries, {'wip_violations': get_wip_violations})
+        wip_violations = results['wip_violations']
+        
+        state, delta = build_unblock_delta(previous_state, results, full_refresh, watermark)
+        
+        if full_refresh:
+            blocked_items = results['blocked_items']
+        else:
+            # Only what changed is actionable: escalations first, then newly blocked items
+            blocked_items = (delta['escalated'] + delta['newly_blocked'])[:REPORT_TOP_N]
+        
+        # Generate unblock report
+        report = generate_unblock_report(
+            blocked_items,
+            results['impediments'],
+            wip_violations,
+            query_timings,
+            {
+                'blocked_items': results['totals']['blocked_items'],
+                'impediments': sum(state['impediments_by_day'].values())
+            },
+            delta
+        )
+        report['mode'] = 'full' if full_refresh else 'incremental'
+        report['watermark'] = watermark.isoformat()
+        report['previous_watermark'] = previous_watermark.isoformat() if previous_watermark else None
+        
+        save_report_snapshot('daily_unblock', watermark, state)
+        
+        # Publish for interactive readers (Slack bot, dashboard)
+        pod_slices = build_unblock_pod_slices(report, results['pod_blocked_items'], results['pod_names'])
+        with clos_telemetry.timer('cache_publish_ms'):
+            cache_version = clos_cache.publish_report('daily_unblock', report, pod_slices)
+        
+        # Send to Slack
+        slack_result = send_daily_unblock_to_slack(report, pod_slices)
+        
+        # Emit event
+        eventbridge_result = emit_daily_unblock_event(report)
+        
+        return clos_runtime.response(200, {
+            'message': 'Daily unblock processed successfully',
+            'mode': report['mode'],
+            'blocked_items': report['summary']['blocked_items_count'],
+            'impediments': report['summary']['impediments_count'],
+            'wip_violations': len(wip_violations),
+            'newly_blocked': report['summary']['newly_blocked_count'],
+            'resolved': report['summary']['resolved_count'],
+            'escalated': report['summary']['escalated_count'],
+            'query_timings_ms': query_timings,
+            'cache_version': cache_version,
+            'slack_sent': slack_result['status'] == 'success',
+            'event_emitted': eventbridge_result['status'] == 'success'
+        })
+        
+    except Exception as e:
+        logger.error(f"Daily unblock failed: {str(e)}")
+        raise
+
+@clos_telemetry.timer('delta_ms')
+def build_unblock_delta(previous_state, results, full_refresh, watermark):
+    """
+    Work out what changed since the previous report and the state to store for the next one
+    """
+    impediments_by_day = {} if full_refresh else dict(previous_state.get('impediments_by_day', {}))
+    totals = results['totals']
+    
+    for day, count in results['impediments_by_day'].items():
+        impediments_by_day[day] = impediments_by_day.get(day, 0) + count
+    
+    # Keep only the days inside the active impediment window
+    window_start = (watermark - timedelta(days=IMPEDIMENT_WINDOW_DAYS)).date().isoformat()
+    impediments_by_day = {day: count for day, count in impediments_by_day.items() if day >= window_start}
+    
+    violation_keys = {f"{v['pod_id']}/{v['item_type']}" for v in results['wip_violations']}
+    previous_violation_keys = set(previous_state.get('wip_violation_keys', []))
+    
+    state = {
+        'impediments_by_day': impediments_by_day,
+        'wip_violation_keys': sorted(violation_keys)
+    }
+    
+    delta = {
+        'newly_blocked_count': totals['newly_blocked'],
+        'resolved_count': totals['resolved'],
+        'escalated_count': len(results.get('escalated', [])),
+        'newly_blocked': results.get('newly_blocked', []),
+        'resolved': results.get('resolved', []),
+        'escalated': results.get('escalated', []),
+        'new_wip_violations': sorted(violation_keys - previous_violation_keys),
+        'resolved_wip_violations': sorted(previous_violation_keys - violation_keys)
+    }
+    
+    return state, delta
+
+@clos_telemetry.timer('snapshot_load_ms')
+def load_report_snapshot(report_type):
+    """
+    Get the database clock and the latest stored snapshot for a report type
+    """
+    with clos_db.pooled_connection(REPORT_STATEMENTS) as conn:
+        cur = conn.cursor()
+        try:
+            clos_db.execute_prepared(cur, 'latest_report_snapshot', (report_type,))
+            now, watermark, state = cur.fetchone()
+        finally:
+            cur.close()
+    
+    return {
+        'now': now,
+        'watermark': watermark,
+        'state': state
+    }
+
+@clos_telemetry.timer('snapshot_save_ms')
+def save_report_snapshot(report_type, watermark, state):
+    """
+    Store the report watermark and state for the next incremental run
+    """
+    try:
+        with clos_db.pooled_connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute("""
+                INSERT INTO report_snapshots (report_type, watermark, state)
+                VALUES (%s, %s, %s)
+                """, (report_type, watermark, json.dumps(state)))
+                cur.execute("""
+                DELETE FROM report_snapshots
+                WHERE report_type = %s AND watermark < %s - INTERVAL '30 days'
+                """, (report_type, watermark))
+                conn.commit()
+            finally:
+                cur.close()
+        
+    except Exception as e:
+        # The next run falls back to the previous snapshot, so don't fail the report
+        logger.error(f"Failed to save {report_type} snapshot: {str(e)}")
+
+def handle_weekly_demo_preparation(event, context):
+    """
+    Handle weekly demo preparation
+    """
+    try:
+        # Get completed work, demo candidates and pod summaries concurrently
+        results, query_timings = run_report_queries({
+            'completed_work': get_weekly_completed_work,
+            'demo_candidates': get_demo_candidates,
+            'pod_summaries': get_pod_weekly_summaries,
+            'totals': get_demo_totals,
+            'pod_completed_work': get_completed_work_per_pod,
+            'pod_demo_candidates': get_demo_candidates_per_pod
+        })
+        completed_work = results['completed_work']
+        demo_candidates = results['demo_candidates']
+        pod_summaries = results['pod_summaries']
+        
+        # Generate demo preparation report
+        demo_report = generate_demo_report(
+            completed_work, demo_candidates, pod_summaries, query_timings, results['totals']
+        )
+        demo_report['mode'] = 'single'
+        
+        pod_work = {}
+        for pod_name, pod_completed_work in results['pod_completed_work'].items():
+            pod_work.setdefault(pod_name, {'completed_work': [], 'demo_candidates': []})['completed_work'] = pod_completed_work
+        for pod_name, pod_candidates in results['pod_demo_candidates'].items():
+            pod_work.setdefault(pod_name, {'completed_work': [], 'demo_candidates': []})['demo_candidates'] = pod_candidates
+        
+        return deliver_demo_report(demo_report, pod_work)
+        
+    except Exception as e:
+        logger.error(f"Weekly demo preparation failed: {str(e)}")
+        raise
+
+def deliver_demo_report(demo_report, pod_work):
+    """
+    Publish, post and emit a finished weekly demo report; pod_work holds
+    each pod's own completed work and demo candidates, keyed by pod name
+    """
+    # Publish for interactive readers (Slack bot, dashboard)
+    pod_slices = build_demo_pod_slices(demo_report, pod_work)
+    with clos_telemetry.timer('cache_publish_ms'):
+        cache_version = clos_cache.publish_report('weekly_demo', demo_report, pod_slices)
+    
+    # Send to Slack
+    slack_result = send_weekly_demo_to_slack(demo_report, pod_slices)
+    
+    # Emit event
+    eventbridge_result = emit_weekly_demo_event(demo_report)
+    
+    return clos_runtime.response(200, {
+        'message': 'Weekly demo preparation processed successfully',
+        'mode': demo_report['mode'],
+        'completed_work': demo_report['summary']['completed_work_count'],
+        'demo_candidates': demo_report['summary']['demo_candidates_count'],
+        'query_timings_ms': demo_report['query_timings_ms'],
+        'cache_version': cache_version,
+        'slack_sent': slack_result['status'] == 'success',
+        'event_emitted': eventbridge_result['status'] == 'success'
+    })
+
+def handle_weekly_demo_fanout(event, context):
+    """
+    Coordinate a fanned-out weekly demo: record the run and queue one work item per active pod
+    """
+    sqs = clos_runtime.get_client('sqs')
+    
+    with clos_db.pooled_connection(REPORT_STATEMENTS) as conn:
+        cur = conn.cursor()
+        try:
+            clos_db.execute_prepared(cur, 'active_pods')
+            pods = [(str(row[0]), row[1]) for row in cur.fetchall()]
+            
+            cur.execute("""
+            INSERT INTO demo_fanout_runs (expected_pods)
+            VALUES (%s)
+            RETURNING run_id
+            """, (len(pods),))
+            run_id = str(cur.fetchone()[0])
+            
+            cur.execute("""
+            DELETE FROM demo_fanout_runs
+            WHERE created_at < NOW() - make_interval(days => %s)
+            """, (DEMO_FANOUT_RETENTION_DAYS,))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+    
+    if not pods:
+        logger.info(f"No active pods for weekly demo run {run_id}")
+        return handle_weekly_demo_aggregate({'run_id': run_id}, context)
+    
+    failed = []
+    for start in range(0, len(pods), 10):
+        entries = [{
+            'Id': str(index),
+            'MessageBody': json.dumps({
+                'event_type': 'weekly_demo_pod',
+                'run_id': run_id,
+                'pod_id': pod_id,
+                'pod_name': pod_name
+            })
+        } for index, (pod_id, pod_name) in enumerate(pods[start:start + 10], start=start)]
+        
+        with clos_telemetry.timer('sqs_send_ms'):
+            response = sqs.send_message_batch(QueueUrl=DEMO_FANOUT_QUEUE_URL, Entries=entries)
+        failed.extend(pods[int(entry['Id'])][1] for entry in response.get('Failed', []))
+    
+    if failed:
+        # The run can never complete without every pod, so surface it rather than wait forever
+        raise RuntimeError(f"Failed to queue weekly demo work items for pods: {', '.join(failed)}")
+    
+    logger.info(f"Queued weekly demo run {run_id} for {len(pods)} pods")
+    
+    return clos_runtime.response(202, {
+        'message': 'Weekly demo fan-out queued',
+        'mode': 'fanout',
+        'run_id': run_id,
+        'pods': len(pods)
+    })
+
+def handle_demo_pod_work_items(event, context):
+    """
+    Build pod-scoped weekly demo reports from fan-out queue messages.
+    
+    Failed messages are reported individually so SQS only retries those.
+    """
+    failures = []
+    
+    for record in event['Records']:
+        try:
+            work_item = json.loads(record['body'])
+            clos_telemetry.set_dimensions(pod=work_item.get('pod_name'))
+            pod_report = build_pod_demo_report(work_item['pod_id'], work_item['pod_name'])
+            
+            if record_pod_demo_report(work_item['run_id'], work_item['pod_id'], pod_report):
+                aggregate_weekly_demo(work_item['run_id'])
+                
+        except Exception as e:
+            logger.error(f"Weekly demo work item {record.get('messageId')} failed: {str(e)}")
+            clos_telemetry.count('work_item_failures')
+            failures.append({'itemIdentifier': record['messageId']})
+    
+    return {'batchItemFailures': failures}
+
+def build_pod_demo_report(pod_id, pod_name):
+    """
+    Run the pod-filtered weekly demo queries concurrently
+    """
+    results, query_timings = run_report_queries({
+        'completed_work': lambda cur: get_weekly_completed_work(cur, pod_id),
+        'demo_candidates': lambda cur: get_demo_candidates(cur, pod_id),
+        'pod_summaries': lambda cur: get_pod_weekly_summaries(cur, pod_id),
+        'totals': lambda cur: get_demo_totals(cur, pod_id)
+    })
+    
+    return {
+        'pod_id': pod_id,
+        'pod_name': pod_name,
+        'completed_work': results['completed_work'],
+        'demo_candidates': results['demo_candidates'],
+        'pod_summaries': results['pod_summaries'],
+        'totals': results['totals'],
+        'query_timings_ms': query_timings
+    }
+
+@clos_telemetry.timer('pod_report_save_ms')
+def record_pod_demo_report(run_id, pod_id, pod_report):
+    """
+    Store a pod report and count it toward its run.
+    
+    Returns True for exactly one caller per run: the one whose report
+    completes it, which then owns aggregation. Redelivered work items
+    overwrite their report without being counted twice.
+    """
+    with clos_db.pooled_connection() as conn:
+        cur = conn.cursor()
+        try:
+            cur.execute("""
+            INSERT INTO demo_fanout_pod_reports (run_id, pod_id, report)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (run_id, pod_id) DO UPDATE SET report = EXCLUDED.report
+            RETURNING (xmax = 0) as inserted
+            """, (run_id, pod_id, clos_runtime.dumps(pod_report)))
+            inserted = cur.fetchone()[0]
+            
+            if inserted:
+                cur.execute("""
+                UPDATE demo_fanout_runs
+                SET completed_pods = completed_pods + 1
+                WHERE run_id = %s
+                """, (run_id,))
+            
+            # Claim aggregation once every pod has reported
+            cur.execute("""
+            UPDATE demo_fanout_runs
+            SET aggregated_at = NOW()
+            WHERE run_id = %s
+                AND aggregated_at IS NULL
+                AND completed_pods >= expected_pods
+            RETURNING run_id
+            """, (run_id,))
+            claimed = cur.fetchone() is not None
+            
+            conn.commit()
+            return claimed
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+
+def handle_weekly_demo_aggregate(event, context):
+    """
+    Merge a fan-out run's pod reports on demand (e.g. after fixing a failed pod)
+    """
+    return aggregate_weekly_demo(event['run_id'])
+
+@clos_telemetry.timer('aggregate_ms')
+def aggregate_weekly_demo(run_id):
+    """
+    Merge a run's pod reports into the org-wide weekly demo report and deliver it
+    """
+    try:
+        with clos_db.pooled_connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute("""
+                SELECT report
+                FROM demo_fanout_pod_reports
+                WHERE run_id = %s
+                """, (run_id,))
+                pod_reports = [row[0] for row in cur.fetchall()]
+            finally:
+                cur.close()
+        
+        demo_report = merge_pod_demo_reports(pod_reports)
+        demo_report['mode'] = 'fanout'
+        demo_report['run_id'] = run_id
+        
+        logger.info(f"Aggregated weekly demo run {run_id} from {len(pod_reports)} pods")
+        return deliver_demo_report(demo_report, {report['pod_name']: report for report in pod_reports})
+        
+    except Exception as e:
+        logger.error(f"Weekly demo aggregation for run {run_id} failed: {str(e)}")
+        release_demo_aggregation(run_id)
+        raise
+
+def release_demo_aggregation(run_id):
+    """
+    Release an aggregation claim so a retried work item can aggregate again
+    """
+    try:
+        with clos_db.pooled_connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute("""
+                UPDATE demo_fanout_runs SET aggregated_at = NULL WHERE run_id = %s
+                """, (run_id,))
+                conn.commit()
+            finally:
+                cur.close()
+                
+    except Exception as e:
+        logger.error(f"Failed to release weekly demo aggregation for run {run_id}: {str(e)}")
+
+def merge_pod_demo_reports(pod_reports):
+    """
+    Merge pod-scoped demo reports into the org summary
+    """
+    completed_work = sorted(
+        (work for report in pod_reports for work in report['completed_work']),
+        key=lambda work: work['completed_at'] or '',
+        reverse=True
+    )[:REPORT_TOP_N]
+    demo_candidates = sorted(
+        (candidate for report in pod_reports for candidate in report['demo_candidates']),
+        key=lambda candidate: candidate['updated_at'] or '',
+        reverse=True
+    )[:REPORT_TOP_N]
+    pod_summaries = sorted(
+        (summary for report in pod_reports for summary in report['pod_summaries']),
+        key=lambda summary: summary['pod_name']
+    )
+    totals = {
+        'completed_work': sum(report['totals'].get('completed_work', 0) for report in pod_reports),
+        'demo_candidates': sum(report['totals'].get('demo_candidates', 0) for report in pod_reports)
+    }
+    query_timings = {
+        report['pod_name']: report['query_timings_ms'].get('total') for report in pod_reports
+    }
+    
+    return generate_demo_report(completed_work, demo_candidates, pod_summaries, query_timings, totals)
+
+@clos_telemetry.timer('rollup_refresh_ms')
+def handle_rollup_refresh(event, context):
+    """
+    Recompute recent pod weekly rollups from stage_transitions
+    """
+    weeks = int(event.get('weeks', ROLLUP_REFRESH_WEEKS))
+    
+    with clos_db.pooled_connection() as conn:
+        cur = conn.cursor()
+        try:
+            for sql in ROLLUP_REFRESH_SQL:
+                cur.execute(sql, {'weeks': weeks})
+            rows_written = cur.rowcount
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Rollup refresh failed: {str(e)}")
+            raise
+        finally:
+            cur.close()
+    
+    logger.info(f"Refreshed {rows_written} pod weekly rollups over {weeks} weeks")
+    
+    return clos_runtime.response(200, {
+        'message': 'Pod weekly rollups refreshed successfully',
+        'weeks': weeks,
+        'rollups_written': rows_written
+    })
+
+@clos_telemetry.timer('partition_maintenance_ms')
+def handle_partition_maintenance(event, context):
+    """
+    Pre-create upcoming activities/metrics partitions and expire old ones
+    """
+    dry_run = bool(event.get('dry_run', False))
+    
+    with clos_db.pooled_connection() as conn:
+        result = clos_partitions.maintain_partitions(conn, dry_run=dry_run)
+    
+    if result['failed']:
+        logger.error(f"Partition maintenance failed for {len(result['failed'])} partitions")
+    
+    return clos_runtime.response(500 if result['failed'] else 200, {
+        'message': 'Partition maintenance completed' if not result['failed'] else 'Partition maintenance failed',
+        'partitions': result
+    })
+
+@clos_telemetry.timer('metric_rollup_ms')
+def handle_metric_rollup(event, context):
+    """
+    Roll new raw metrics up into the 1m/1h/1d metric_rollups
+    """
+    with clos_db.pooled_connection() as conn:
+        result = clos_metrics.refresh_rollups(conn)
+    
+    logger.info(f"Metric rollups: {result['batches']} batches, rows written {result['rows_written']}")
+    
+    return clos_runtime.response(200, {
+        'message': 'Metric rollups refreshed successfully',
+        'rollups': result
+    })
+
+def run_report_queries(db_queries, tasks=None):
+    """
+    Run independent report queries concurrently.
+    
+    db_queries maps a result name to a function taking a cursor; each one
+    runs on its own pooled connection to the read replica (or the primary
+    when the replica is missing or lagging). tasks maps a result name to a
+    function taking no arguments (e.g. the DynamoDB scan). Returns the
+    results and the per-query timings in milliseconds.
+    """
+    tasks = tasks or {}
+    results = {}
+    query_timings = {}
+    started_at = time.perf_counter()
+    
+    def run_db_query(query):
+        with clos_db.pooled_connection(REPORT_STATEMENTS, role=clos_db.REPLICA) as conn:
+            cur = conn.cursor()
+            try:
+                return query(cur)
+            finally:
+                cur.close()
+    
+    def timed(func, *args):
+        query_started_at = time.perf_counter()
+        result = func(*args)
+        return result, round((time.perf_counter() - query_started_at) * 1000, 1)
+    
+    with ThreadPoolExecutor(max_workers=len(db_queries) + len(tasks)) as executor:
+        futures = {}
+        for name, query in db_queries.items():
+            futures[executor.submit(timed, run_db_query, query)] = name
+        for name, task in tasks.items():
+            futures[executor.submit(timed, task)] = name
+        
+        for future in as_completed(futures):
+            name = futures[future]
+            results[name], query_timings[name] = future.result()
+    
+    query_timings['total'] = round((time.perf_counter() - started_at) * 1000, 1)
+    for name, elapsed_ms in query_timings.items():
+        clos_telemetry.observe('query_ms', elapsed_ms, unit='Milliseconds', query=name)
+    logger.info(f"Report queries completed: {json.dumps(query_timings)}")
+    
+    return results, query_timings
+
+def fetch_rows(cursor, row_type):
+    """
+    Read a LIMITed result as compact row tuples.
+
+    The statements run through EXECUTE, which Postgres cannot DECLARE a
+    server-side cursor over, so the whole result is already client-side
+    once execute returns; the LIMIT in each statement is what bounds it.
+    """
+    return [row_type._make(row) for row in cursor.fetchall()]
+
+def format_blocked_item(row):
+    """
+    Convert a BlockedItemRow to its report form
+    """
+    return {
+        'id': str(row.id),
+        'name': row.name,
+        'current_stage': row.current_stage,
+        'last_updated': row.updated_at.isoformat() if row.updated_at else None,
+        'pod_name': row.pod_name,
+        'lead_name': row.lead_name,
+        'days_blocked': (datetime.now() - row.updated_at).days if row.updated_at else None
+    }
+
+def format_impediment(row):
+    """
+    Convert an ImpedimentRow to its report form
+    """
+    return {
+        'id': str(row.id),
+        'action': row.action,
+        'details': row.details,
+        'created_at': row.created_at.isoformat() if row.created_at else None,
+        'user_name': row.user_name,
+        'project_name': row.project_name or 'Unknown'
+    }
+
+def format_completed_work(row):
+    """
+    Convert a CompletedWorkRow to its report form
+    """
+    return {
+        'project_id': str(row.project_id),
+        'project_name': row.project_name,
+        'from_stage': row.from_stage,
+        'to_stage': row.to_stage,
+        'completed_at': row.approved_at.isoformat() if row.approved_at else None,
+        'pod_name': row.pod_name,
+        'approved_by': row.approved_by_name or 'System'
+    }
+
+def format_demo_candidate(row):
+    """
+    Convert a DemoCandidateRow to its report form
+    """
+    return {
+        'id': str(row.id),
+        'name': row.name,
+        'current_stage': row.current_stage,
+        'deployed_url': row.deployed_url,
+        'pod_name': row.pod_name,
+        'updated_at': row.updated_at.isoformat() if row.updated_at else None
+    }
+
+def group_by_pod(items):
+    """
+    Group report items by their pod_name, keeping the query's order within each pod
+    """
+    grouped = {}
+    for item in items:
+        grouped.setdefault(item['pod_name'], []).append(item)
+    return grouped
+
+def get_blocked_items(cursor):
+    """
+    Get items that are blocked or stuck
+    """
+    try:
+        # Look for projects that haven't had activity in 3+ days
+        clos_db.execute_prepared(cursor, 'blocked_items', (REPORT_TOP_N,))
+        
+        return [format_blocked_item(row) for row in fetch_rows(cursor, BlockedItemRow)]
+        
+    except Exception as e:
+        logger.error(f"Failed to get blocked items: {str(e)}")
+        return []
+
+def get_blocked_items_per_pod(cursor, watermark):
+    """
+    Get each pod's longest-blocked items as of the watermark, keyed by pod name
+    """
+    try:
+        clos_db.execute_prepared(cursor, 'top_blocked_items_per_pod', (watermark, REPORT_TOP_N))
+        return group_by_pod(format_blocked_item(row) for row in fetch_rows(cursor, BlockedItemRow))
+        
+    except Exception as e:
+        logger.error(f"Failed to get blocked items per pod: {str(e)}")
+        raise
 
-def handle_daily_unblock(event, context):
+def get_active_pod_names(cursor):
     """
-    Handle the daily unblock process
+    Get the names of the active pods
     """
     try:
-        # Get database connection
-        conn = get_database_connection()
-        cur = conn.cursor()
-        
-        # Get blocked items and impediments
-        blocked_items = get_blocked_items(cur)
-        impediments = get_active_impediments(cur)
-        wip_violations = get_wip_violations()
-        
-        # Generate unblock report
-        report = generate_unblock_report(blocked_items, impediments, wip_violations)
-        
-        # Send to Slack
-        slack_result = send_daily_unblock_to_slack(report)
-        
-        # Emit event
-        eventbridge_result = emit_daily_unblock_event(report)
-        
-        return {
-            'statusCode': 200,
-            'body': json.dumps({
-                'message': 'Daily unblock processed successfully',
-                'blocked_items': len(blocked_items),
-                'impediments': len(impediments),
-                'wip_violations': len(wip_violations),
-                'slack_sent': slack_result['status'] == 'success',
-                'event_emitted': eventbridge_result['status'] == 'success'
-            })
-        }
+        clos_db.execute_prepared(cursor, 'active_pods')
+        return [row[1] for row in cursor.fetchall()]
         
     except Exception as e:
-        logger.error(f"Daily unblock failed: {str(e)}")
+        logger.error(f"Failed to get active pods: {str(e)}")
         raise
-    
-    finally:
-        if 'cur' in locals():
-            cur.close()
-        if 'conn' in locals():
-            conn.close()
 
-def handle_weekly_demo_preparation(event, context):
+def get_active_impediments(cursor):
     """
-    Handle weekly demo preparation
+    Get active impediments from activities table
     """
     try:
-        # Get database connection
-        conn = get_database_connection()
-        cur = conn.cursor()
-        
-        # Get completed work for the week
-        completed_work = get_weekly_completed_work(cur)
-        demo_candidates = get_demo_candidates(cur)
-        pod_summaries = get_pod_weekly_summaries(cur)
-        
-        # Generate demo preparation report
-        demo_report = generate_demo_report(completed_work, demo_candidates, pod_summaries)
-        
-        # Send to Slack
-        slack_result = send_weekly_demo_to_slack(demo_report)
+        # Look for impediment-related activities
+        clos_db.execute_prepared(cursor, 'active_impediments', (REPORT_TOP_N,))
         
-        # Emit event
-        eventbridge_result = emit_weekly_demo_event(demo_report)
+        return [format_impediment(row) for row in fetch_rows(cursor, ImpedimentRow)]
         
+    except Exception as e:
+        logger.error(f"Failed to get impediments: {str(e)}")
+        return []
+
+def get_unblock_totals(cursor, previous_watermark, watermark):
+    """
+    Count blocked projects as of the watermark, and those that became blocked
+    or were resolved since the previous one (both 0 on the first run)
+    """
+    try:
+        clos_db.execute_prepared(cursor, 'unblock_totals', (previous_watermark, watermark))
+        blocked_items, newly_blocked, resolved = cursor.fetchone()
         return {
-            'statusCode': 200,
-            'body': json.dumps({
-                'message': 'Weekly demo preparation processed successfully',
-                'completed_work': len(completed_work),
-                'demo_candidates': len(demo_candidates),
-                'slack_sent': slack_result['status'] == 'success',
-                'event_emitted': eventbridge_result['status'] == 'success'
-            })
+            'blocked_items': blocked_items,
+            'newly_blocked': newly_blocked,
+            'resolved': resolved
         }
         
     except Exception as e:
-        logger.error(f"Weekly demo preparation failed: {str(e)}")
+        logger.error(f"Failed to count blocked items: {str(e)}")
         raise
-    
-    finally:
-        if 'cur' in locals():
-            cur.close()
-        if 'conn' in locals():
-            conn.close()
 
-def get_database_connection():
+def get_newly_blocked_items(cursor, previous_watermark, watermark):
     """
-    Get database connection using secrets manager
+    Get projects that crossed the blocked threshold since the previous report
     """
     try:
-        secret_arn = os.environ['SECRET_ARN']
-        secrets_client = boto3.client('secretsmanager')
-        
-        secret_response = secrets_client.get_secret_value(SecretId=secret_arn)
-        secret = json.loads(secret_response['SecretString'])
-        
-        return psycopg2.connect(
-            host=os.environ['RDS_ENDPOINT'],
-            database='clos',
-            user=secret['username'],
-            password=secret['password'],
-            port=5432
-        )
+        clos_db.execute_prepared(cursor, 'newly_blocked_items', (previous_watermark, watermark, REPORT_TOP_N))
+        return [format_blocked_item(row) for row in fetch_rows(cursor, BlockedItemRow)]
         
     except Exception as e:
-        logger.error(f"Database connection failed: {str(e)}")
+        logger.error(f"Failed to get newly blocked items: {str(e)}")
         raise
 
-def get_blocked_items(cursor):
+def get_escalated_items(cursor, previous_watermark, watermark):
     """
-    Get items that are blocked or stuck
+    Get blocked projects that crossed the escalation threshold since the previous report
     """
     try:
-        # Look for projects that haven't had activity in 3+ days
-        cursor.execute("""
-        SELECT 
-            p.id,
-            p.name,
-            p.current_stage,
-            p.updated_at,
-            pod.name as pod_name,
-            u.name as lead_name
-        FROM projects p
-        JOIN pods pod ON p.pod_id = pod.id
-        LEFT JOIN users u ON pod.lead_id = u.id
-        WHERE p.updated_at < NOW() - INTERVAL '3 days'
-            AND p.current_stage != 'monitoring'
-        ORDER BY p.updated_at ASC
-        """)
-        
-        blocked_items = []
-        for row in cursor.fetchall():
-            blocked_items.append({
-                'id': str(row[0]),
-                'name': row[1],
-                'current_stage': row[2],
-                'last_updated': row[3].isoformat() if row[3] else None,
-                'pod_name': row[4],
-                'lead_name': row[5],
-                'days_blocked': (datetime.now() - row[3]).days if row[3] else None
-            })
-        
-        return blocked_items
+        clos_db.execute_prepared(
+            cursor, 'escalated_items', (previous_watermark, watermark, ESCALATE_AFTER_DAYS, REPORT_TOP_N)
+        )
+        return [format_blocked_item(row) for row in fetch_rows(cursor, BlockedItemRow)]
         
     except Exception as e:
-        logger.error(f"Failed to get blocked items: {str(e)}")
+        logger.error(f"Failed to get escalated items: {str(e)}")
         return []
 
-def get_active_impediments(cursor):
+def get_resolved_blocked_items(cursor, previous_watermark, watermark):
     """
-    Get active impediments from activities table
+    Get projects blocked at the previous report that have been updated since, up to the watermark
     """
     try:
-        # Look for impediment-related activities
-        cursor.execute("""
-        SELECT 
-            a.id,
-            a.action,
-            a.details,
-            a.created_at,
-            u.name as user_name,
-            p.name as project_name
-        FROM activities a
-        JOIN users u ON a.user_id = u.id
-        LEFT JOIN projects p ON a.resource_id = p.id AND a.resource_type = 'project'
-        WHERE a.action LIKE '%impediment%' OR a.action LIKE '%blocked%'
-            AND a.created_at > NOW() - INTERVAL '7 days'
-        ORDER BY a.created_at DESC
-        LIMIT 50
-        """)
-        
-        impediments = []
-        for row in cursor.fetchall():
-            impediments.append({
-                'id': str(row[0]),
-                'action': row[1],
-                'details': row[2],
-                'created_at': row[3].isoformat() if row[3] else None,
-                'user_name': row[4],
-                'project_name': row[5] or 'Unknown'
-            })
+        clos_db.execute_prepared(
+            cursor, 'resolved_blocked_items', (previous_watermark, watermark, REPORT_TOP_N)
+        )
+        return [format_blocked_item(row) for row in fetch_rows(cursor, BlockedItemRow)]
         
-        return impediments
+    except Exception as e:
+        logger.error(f"Failed to get resolved blocked items: {str(e)}")
+        raise
+
+def get_new_impediments(cursor, previous_watermark, watermark):
+    """
+    Get impediments raised in [previous_watermark, watermark)
+    """
+    try:
+        clos_db.execute_prepared(cursor, 'new_impediments', (previous_watermark, watermark, REPORT_TOP_N))
+        return [format_impediment(row) for row in fetch_rows(cursor, ImpedimentRow)]
         
     except Exception as e:
-        logger.error(f"Failed to get impediments: {str(e)}")
+        logger.error(f"Failed to get new impediments: {str(e)}")
         return []
 
+def get_impediment_counts_by_day(cursor, start, end):
+    """
+    Count impediment activities per day in [start, end)
+    """
+    try:
+        clos_db.execute_prepared(cursor, 'impediment_counts_by_day', (start, end))
+        return {day.isoformat(): count for day, count in cursor.fetchall()}
+        
+    except Exception as e:
+        logger.error(f"Failed to count impediments: {str(e)}")
+        raise
+
 def get_wip_violations():
     """
     Get current WIP limit violations from DynamoDB
     """
     try:
-        dynamodb = boto3.resource('dynamodb')
+        dynamodb = clos_runtime.get_client('dynamodb')
         table_name = os.environ.get('DYNAMODB_TABLE', 'clos-v2-wip-locks')
-        wip_locks_table = dynamodb.Table(table_name)
         
-        # This is a simplified check - in reality you'd aggregate by pod and type
-        response = wip_locks_table.scan(
-            FilterExpression='attribute_not_exists(released_at)'
-        )
-        
-        # Group by pod and count violations
-        pod_counts = {}
-        for item in response['Items']:
-            pod_id = item.get('pod_id')
-            lock_type = item.get('lock_type', 'unknown')
-            
-            if pod_id not in pod_counts:
-                pod_counts[pod_id] = {}
-            if lock_type not in pod_counts[pod_id]:
-                pod_counts[pod_id][lock_type] = 0
-            
-            pod_counts[pod_id][lock_type] += 1
+        # Fast path: per-pod counters maintained by the WIP limit processor
+        pod_counts, seen_counters = read_wip_counters(dynamodb, table_name)
+        if pod_counts is None:
+            pod_counts = scan_wip_counts(dynamodb, table_name)
+            write_wip_counters(dynamodb, table_name, pod_counts, seen_counters)
         
-        # Check against limits (simplified)
         violations = []
-        limits = {
-            'Ratio': {'projects': 3, 'pull_requests': 5},
-            'Nanda': {'projects': 2, 'pull_requests': 4},
-            'Meta': {'projects': 2, 'pull_requests': 3}
-        }
-        
         for pod_id, counts in pod_counts.items():
-            pod_limits = limits.get(pod_id, {})
+            pod_limits = WIP_LIMITS.get(pod_id, {})
             for item_type, count in counts.items():
                 limit = pod_limits.get(item_type, float('inf'))
                 if count > limit:
@@ -276,110 +1321,235 @@ def get_wip_violations():
         logger.error(f"Failed to get WIP violations: {str(e)}")
         return []
 
-def get_weekly_completed_work(cursor):
+def scan_wip_counts(dynamodb, table_name):
+    """
+    Count active WIP locks per pod and lock type with a parallel segmented scan
+    """
+    with ThreadPoolExecutor(max_workers=WIP_SCAN_SEGMENTS) as executor:
+        segment_counts = list(executor.map(
+            lambda segment: scan_wip_segment(dynamodb, table_name, segment),
+            range(WIP_SCAN_SEGMENTS)
+        ))
+    
+    pod_counts = {}
+    for counts in segment_counts:
+        for (pod_id, lock_type), count in counts.items():
+            pod_type_counts = pod_counts.setdefault(pod_id, {})
+            pod_type_counts[lock_type] = pod_type_counts.get(lock_type, 0) + count
+    
+    return pod_counts
+
+def scan_wip_segment(dynamodb, table_name, segment):
+    """
+    Scan one segment page by page, keeping only running counts
+    """
+    counts = {}
+    scan_kwargs = {
+        'TableName': table_name,
+        'Segment': segment,
+        'TotalSegments': WIP_SCAN_SEGMENTS,
+        'ProjectionExpression': 'pod_id, lock_type',
+        'FilterExpression': 'attribute_not_exists(released_at) AND NOT begins_with(item_id, :counter_prefix)',
+        'ExpressionAttributeValues': {':counter_prefix': {'S': WIP_COUNTER_PREFIX}}
+    }
+    
+    while True:
+        response = dynamodb.scan(**scan_kwargs)
+        for item in response['Items']:
+            key = (item['pod_id']['S'], item.get('lock_type', {}).get('S', 'unknown'))
+            counts[key] = counts.get(key, 0) + 1
+        
+        if 'LastEvaluatedKey' not in response:
+            return counts
+        scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def read_wip_counters(dynamodb, table_name):
+    """
+    Read precomputed per-pod counters.
+    
+    Returns (pod_counts, seen): pod_counts is None if any counter is missing
+    or stale, and seen maps (pod_id, lock_type) to the counter's updates and
+    reconciled_at values, for write_wip_counters() to check against.
+    """
+    if not WIP_COUNTER_FAST_PATH:
+        return None, {}
+    
+    now = int(time.time())
+    pod_counts = {}
+    seen = {}
+    fresh = True
+    for pod_id in WIP_LIMITS:
+        response = dynamodb.query(
+            TableName=table_name,
+            KeyConditionExpression='pod_id = :pod_id AND begins_with(item_id, :counter_prefix)',
+            ExpressionAttributeValues={
+                ':pod_id': {'S': pod_id},
+                ':counter_prefix': {'S': WIP_COUNTER_PREFIX}
+            },
+            ConsistentRead=True
+        )
+        
+        counters = response['Items']
+        if not counters:
+            fresh = False
+        
+        for counter in counters:
+            lock_type = counter['item_id']['S'][len(WIP_COUNTER_PREFIX):]
+            updates = counter.get('updates', {}).get('N')
+            reconciled_at = counter.get('reconciled_at', {}).get('N')
+            seen[(pod_id, lock_type)] = (updates, reconciled_at)
+            
+            if reconciled_at is None or now - int(reconciled_at) > WIP_COUNTER_MAX_AGE_SECONDS:
+                fresh = False
+            pod_counts.setdefault(pod_id, {})[lock_type] = int(counter.get('active_count', {}).get('N', '0'))
+    
+    return (pod_counts if fresh else None), seen
+
+def write_wip_counters(dynamodb, table_name, pod_counts, seen=None):
+    """
+    Store scanned counts as the reconciled per-pod counters.
+    
+    Each write is conditional on the counter's updates and reconciled_at
+    still being what read_wip_counters() saw, so a lock acquired, released
+    or expired since then (or another reconciliation) is never overwritten;
+    that counter is left for the next reconciliation instead.
+    """
+    if not WIP_COUNTER_FAST_PATH:
+        return
+    
+    seen = seen or {}
+    now = str(int(time.time()))
+    for pod_id in WIP_LIMITS:
+        counts = pod_counts.get(pod_id, {})
+        # Always record the limited types so an idle pod still has fresh counters
+        for lock_type in set(counts) | set(WIP_LIMITS[pod_id]):
+            updates, reconciled_at = seen.get((pod_id, lock_type), (None, None))
+            values = {
+                ':count': {'N': str(counts.get(lock_type, 0))},
+                ':now': {'N': now}
+            }
+            conditions = []
+            if updates is None:
+                conditions.append('attribute_not_exists(updates)')
+            else:
+                conditions.append('updates = :seen_updates')
+                values[':seen_updates'] = {'N': updates}
+            if reconciled_at is None:
+                conditions.append('attribute_not_exists(reconciled_at)')
+            else:
+                conditions.append('reconciled_at = :seen_reconciled_at')
+                values[':seen_reconciled_at'] = {'N': reconciled_at}
+            
+            try:
+                dynamodb.update_item(
+                    TableName=table_name,
+                    Key={
+                        'pod_id': {'S': pod_id},
+                        'item_id': {'S': f'{WIP_COUNTER_PREFIX}{lock_type}'}
+                    },
+                    UpdateExpression='SET active_count = :count, reconciled_at = :now',
+                    ConditionExpression=' AND '.join(conditions),
+                    ExpressionAttributeValues=values
+                )
+            except dynamodb.exceptions.ConditionalCheckFailedException:
+                logger.info(f"WIP counter {pod_id}/{lock_type} changed during reconciliation; leaving it")
+            except Exception as e:
+                logger.warning(f"Failed to write WIP counter {pod_id}/{lock_type}: {str(e)}")
+
+def get_weekly_completed_work(cursor, pod_id=None):
     """
-    Get completed work for the past week
+    Get completed work for the past week, optionally for one pod
     """
     try:
-        cursor.execute("""
-        SELECT 
-            st.project_id,
-            p.name,
-            st.from_stage,
-            st.to_stage,
-            st.approved_at,
-            pod.name as pod_name,
-            u.name as approved_by_name
-        FROM stage_transitions st
-        JOIN projects p ON st.project_id = p.id
-        JOIN pods pod ON p.pod_id = pod.id
-        LEFT JOIN users u ON st.approved_by = u.id
-        WHERE st.approved_at > NOW() - INTERVAL '7 days'
-        ORDER BY st.approved_at DESC
-        """)
-        
-        completed_work = []
-        for row in cursor.fetchall():
-            completed_work.append({
-                'project_id': str(row[0]),
-                'project_name': row[1],
-                'from_stage': row[2],
-                'to_stage': row[3],
-                'completed_at': row[4].isoformat() if row[4] else None,
-                'pod_name': row[5],
-                'approved_by': row[6] or 'System'
-            })
+        if pod_id:
+            clos_db.execute_prepared(cursor, 'pod_weekly_completed_work', (pod_id, REPORT_TOP_N))
+        else:
+            clos_db.execute_prepared(cursor, 'weekly_completed_work', (REPORT_TOP_N,))
         
-        return completed_work
+        return [format_completed_work(row) for row in fetch_rows(cursor, CompletedWorkRow)]
         
     except Exception as e:
         logger.error(f"Failed to get completed work: {str(e)}")
         return []
 
-def get_demo_candidates(cursor):
+def get_demo_candidates(cursor, pod_id=None):
     """
-    Get projects that are good candidates for demo
+    Get projects that are good candidates for demo, optionally for one pod
     """
     try:
-        cursor.execute("""
-        SELECT 
-            p.id,
-            p.name,
-            p.current_stage,
-            p.deployed_url,
-            pod.name as pod_name,
-            p.updated_at
-        FROM projects p
-        JOIN pods pod ON p.pod_id = pod.id
-        WHERE p.current_stage IN ('deployment', 'monitoring')
-            AND p.updated_at > NOW() - INTERVAL '14 days'
-        ORDER BY p.updated_at DESC
-        """)
-        
-        candidates = []
-        for row in cursor.fetchall():
-            candidates.append({
-                'id': str(row[0]),
-                'name': row[1],
-                'current_stage': row[2],
-                'deployed_url': row[3],
-                'pod_name': row[4],
-                'updated_at': row[5].isoformat() if row[5] else None
-            })
+        if pod_id:
+            clos_db.execute_prepared(cursor, 'pod_demo_candidates', (pod_id, REPORT_TOP_N))
+        else:
+            clos_db.execute_prepared(cursor, 'demo_candidates', (REPORT_TOP_N,))
         
-        return candidates
+        return [format_demo_candidate(row) for row in fetch_rows(cursor, DemoCandidateRow)]
         
     except Exception as e:
         logger.error(f"Failed to get demo candidates: {str(e)}")
         return []
 
-def get_pod_weekly_summaries(cursor):
+def get_completed_work_per_pod(cursor):
     """
-    Get weekly summaries for each pod
+    Get each pod's most recent completed work for the past week, keyed by pod name
     """
     try:
-        cursor.execute("""
-        SELECT 
-            pod.name,
-            COUNT(CASE WHEN st.approved_at > NOW() - INTERVAL '7 days' THEN 1 END) as transitions_this_week,
-            COUNT(CASE WHEN p.current_stage = 'monitoring' THEN 1 END) as completed_projects,
-            COUNT(p.id) as total_active_projects,
-            pod.health_score
-        FROM pods pod
-        LEFT JOIN projects p ON pod.id = p.pod_id
-        LEFT JOIN stage_transitions st ON p.id = st.project_id
-        WHERE pod.status = 'active'
-        GROUP BY pod.id, pod.name, pod.health_score
-        """)
+        clos_db.execute_prepared(cursor, 'top_completed_work_per_pod', (REPORT_TOP_N,))
+        return group_by_pod(format_completed_work(row) for row in fetch_rows(cursor, CompletedWorkRow))
+        
+    except Exception as e:
+        logger.error(f"Failed to get completed work per pod: {str(e)}")
+        raise
+
+def get_demo_candidates_per_pod(cursor):
+    """
+    Get each pod's demo candidates, keyed by pod name
+    """
+    try:
+        clos_db.execute_prepared(cursor, 'top_demo_candidates_per_pod', (REPORT_TOP_N,))
+        return group_by_pod(format_demo_candidate(row) for row in fetch_rows(cursor, DemoCandidateRow))
+        
+    except Exception as e:
+        logger.error(f"Failed to get demo candidates per pod: {str(e)}")
+        raise
+
+def get_demo_totals(cursor, pod_id=None):
+    """
+    Get total completed work and demo candidate counts, optionally for one pod
+    """
+    try:
+        if pod_id:
+            clos_db.execute_prepared(cursor, 'pod_demo_totals', (pod_id,))
+        else:
+            clos_db.execute_prepared(cursor, 'demo_totals')
+        row = cursor.fetchone()
+        
+        return {
+            'completed_work': row[0],
+            'demo_candidates': row[1]
+        }
+        
+    except Exception as e:
+        logger.error(f"Failed to get demo totals: {str(e)}")
+        return {}
+
+def get_pod_weekly_summaries(cursor, pod_id=None):
+    """
+    Get weekly summaries for each active pod, or for one pod
+    """
+    try:
+        if pod_id:
+            clos_db.execute_prepared(cursor, 'pod_weekly_summary', (pod_id,))
+        else:
+            clos_db.execute_prepared(cursor, 'pod_weekly_summaries')
         
         summaries = []
-        for row in cursor.fetchall():
+        for row in fetch_rows(cursor, PodSummaryRow):
             summaries.append({
-                'pod_name': row[0],
-                'transitions_this_week': row[1] or 0,
-                'completed_projects': row[2] or 0,
-                'total_active_projects': row[3] or 0,
-                'health_score': float(row[4]) if row[4] else 100.0
+                'pod_name': row.pod_name,
+                'transitions_this_week': row.transitions_this_week or 0,
+                'completed_projects': row.completed_projects or 0,
+                'total_active_projects': row.total_active_projects or 0,
+                'health_score': float(row.health_score) if row.health_score else 100.0
             })
         
         return summaries
@@ -388,43 +1558,95 @@ def get_pod_weekly_summaries(cursor):
         logger.error(f"Failed to get pod summaries: {str(e)}")
         return []
 
-def generate_unblock_report(blocked_items, impediments, wip_violations):
+@clos_telemetry.timer('report_build_ms')
+def generate_unblock_report(blocked_items, impediments, wip_violations, query_timings=None, totals=None, delta=None):
     """
     Generate daily unblock report
     """
+    totals = totals or {}
+    delta = delta or {}
     return {
         'date': datetime.now(timezone.utc).isoformat(),
         'type': 'daily_unblock',
         'summary': {
-            'blocked_items_count': len(blocked_items),
-            'impediments_count': len(impediments),
-            'wip_violations_count': len(wip_violations)
+            'blocked_items_count': totals.get('blocked_items', len(blocked_items)),
+            'impediments_count': totals.get('impediments', len(impediments)),
+            'wip_violations_count': len(wip_violations),
+            'newly_blocked_count': delta.get('newly_blocked_count', 0),
+            'resolved_count': delta.get('resolved_count', 0),
+            'escalated_count': delta.get('escalated_count', 0)
         },
+        'delta': delta,
         'blocked_items': blocked_items,
         'impediments': impediments,
         'wip_violations': wip_violations,
-        'action_required': len(blocked_items) > 0 or len(wip_violations) > 0
+        'action_required': len(blocked_items) > 0 or len(wip_violations) > 0,
+        'query_timings_ms': query_timings or {}
     }
 
-def generate_demo_report(completed_work, demo_candidates, pod_summaries):
+@clos_telemetry.timer('report_build_ms')
+def generate_demo_report(completed_work, demo_candidates, pod_summaries, query_timings=None, totals=None):
     """
     Generate weekly demo report
     """
+    totals = totals or {}
     return {
         'date': datetime.now(timezone.utc).isoformat(),
         'type': 'weekly_demo',
         'week_ending': (datetime.now() + timedelta(days=(4 - datetime.now().weekday()))).date().isoformat(),
         'summary': {
-            'completed_work_count': len(completed_work),
-            'demo_candidates_count': len(demo_candidates),
+            'completed_work_count': totals.get('completed_work', len(completed_work)),
+            'demo_candidates_count': totals.get('demo_candidates', len(demo_candidates)),
             'active_pods': len(pod_summaries)
         },
         'completed_work': completed_work,
         'demo_candidates': demo_candidates,
-        'pod_summaries': pod_summaries
+        'pod_summaries': pod_summaries,
+        'query_timings_ms': query_timings or {}
     }
 
-def send_daily_unblock_to_slack(report):
+def build_unblock_pod_slices(report, pod_blocked_items, pod_names):
+    """
+    Build a cache slice for every pod (active or with a WIP limit), empty or
+    not, so a pod with nothing blocked replaces its previous slice
+    """
+    slices = {}
+    for pod_name in [*pod_names, *WIP_LIMITS, *pod_blocked_items]:
+        slices.setdefault(pod_name, {
+            'blocked_items': pod_blocked_items.get(pod_name, []),
+            'wip_violations': [],
+            'date': report['date']
+        })
+    for violation in report['wip_violations']:
+        pod_slice = slices.setdefault(violation['pod_id'], {
+            'blocked_items': [], 'wip_violations': [], 'date': report['date']
+        })
+        pod_slice['wip_violations'].append(violation)
+    
+    return slices
+
+def build_demo_pod_slices(demo_report, pod_work):
+    """
+    Build a cache slice for every pod (active or with a WIP limit) from its
+    own completed work and demo candidates, empty or not
+    """
+    summaries = {summary['pod_name']: summary for summary in demo_report['pod_summaries']}
+    
+    slices = {}
+    for pod_name in [*summaries, *WIP_LIMITS, *pod_work]:
+        work = pod_work.get(pod_name, {})
+        slices.setdefault(pod_name, {
+            'summary': summaries.get(pod_name),
+            'demo_candidates': work.get('demo_candidates', []),
+            'completed_work': work.get('completed_work', []),
+            'date': demo_report['date'],
+            'week_ending': demo_report['week_ending']
+        })
+    
+    return slices
+
+@clos_telemetry.timer('slack_delivery_ms')
+def send_daily_unblock_to_slack(report, pod_slices=None):
     """
     Send daily unblock report to Slack
     """
@@ -433,22 +1655,26 @@ def send_daily_unblock_to_slack(report):
         if not slack_token:
             return {'status': 'skipped', 'reason': 'No Slack token configured'}
         
-        # Format Slack message
-        blocks = format_unblock_slack_message(report)
+        text = f"Daily Unblock Report: {report['summary']['blocked_items_count']} blocked items"
+        messages = [{'channel': SLACK_REPORT_CHANNEL, 'blocks': format_unblock_slack_message(report), 'text': text}]
         
-        # Send to appropriate channels (this would be configured)
-        slack_client = boto3.client('ssm')  # Using SSM for channel configuration
+        for pod_name, pod_slice in (pod_slices or {}).items():
+            channel = SLACK_POD_CHANNELS.get(pod_name)
+            if channel and (pod_slice['blocked_items'] or pod_slice['wip_violations']):
+                messages.append({
+                    'channel': channel,
+                    'blocks': format_pod_unblock_slack_message(pod_name, pod_slice),
+                    'text': f"Daily Unblock Report: {pod_name}"
+                })
         
-        # For demo purposes, we'll log the message
-        logger.info(f"Would send to Slack: {json.dumps(blocks, indent=2)}")
-        
-        return {'status': 'success', 'message': 'Slack message prepared'}
+        return clos_slack.deliver_messages(slack_token, messages)
         
     except Exception as e:
         logger.error(f"Failed to send to Slack: {str(e)}")
         return {'status': 'error', 'error': str(e)}
 
-def send_weekly_demo_to_slack(demo_report):
+@clos_telemetry.timer('slack_delivery_ms')
+def send_weekly_demo_to_slack(demo_report, pod_slices=None):
     """
     Send weekly demo report to Slack
     """
@@ -457,68 +1683,84 @@ def send_weekly_demo_to_slack(demo_report):
         if not slack_token:
             return {'status': 'skipped', 'reason': 'No Slack token configured'}
         
-        # Format Slack message
-        blocks = format_demo_slack_message(demo_report)
+        text = f"Weekly Demo Preparation: {demo_report['summary']['demo_candidates_count']} demo candidates"
+        messages = [{'channel': SLACK_REPORT_CHANNEL, 'blocks': format_demo_slack_message(demo_report), 'text': text}]
         
-        # For demo purposes, we'll log the message
-        logger.info(f"Would send demo report to Slack: {json.dumps(blocks, indent=2)}")
+        for pod_name, pod_slice in (pod_slices or {}).items():
+            channel = SLACK_POD_CHANNELS.get(pod_name)
+            if channel and (pod_slice['demo_candidates'] or pod_slice['completed_work']):
+                messages.append({
+                    'channel': channel,
+                    'blocks': format_pod_demo_slack_message(pod_name, pod_slice),
+                    'text': f"Weekly Demo Preparation: {pod_name}"
+                })
         
-        return {'status': 'success', 'message': 'Demo report prepared'}
+        return clos_slack.deliver_messages(slack_token, messages)
         
     except Exception as e:
         logger.error(f"Failed to send demo report to Slack: {str(e)}")
         return {'status': 'error', 'error': str(e)}
 
+def format_blocked_item_blocks(blocked_items, count):
+    """
+    Format the blocked item list; pagination keeps long lists within Slack's limits
+    """
+    if not blocked_items:
+        return []
+    
+    blocks = [clos_slack.section_block(SLACK_TEMPLATES['blocked_heading'], {'count': count})]
+    for item in blocked_items:
+        blocks.append(clos_slack.section_block(SLACK_TEMPLATES['blocked_item'], item))
+    return blocks
+
+def format_wip_violation_blocks(wip_violations):
+    """
+    Format the WIP violation list
+    """
+    if not wip_violations:
+        return []
+    
+    blocks = [clos_slack.section_block(SLACK_TEMPLATES['wip_heading'], {'count': len(wip_violations)})]
+    for violation in wip_violations:
+        blocks.append(clos_slack.section_block(SLACK_TEMPLATES['wip_violation'], violation))
+    return blocks
+
 def format_unblock_slack_message(report):
     """
     Format unblock report for Slack
     """
-    blocks = [
-        {
-            "type": "header",
-            "text": {
-                "type": "plain_text",
-                "text": "🚨 Daily Unblock Report"
-            }
-        }
-    ]
+    blocks = [clos_slack.header_block(SLACK_TEMPLATES['unblock_header'])]
     
-    if report['blocked_items']:
-        blocks.append({
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": f"*Blocked Items ({len(report['blocked_items'])}):*"
-            }
-        })
-        
-        for item in report['blocked_items'][:5]:  # Show top 5
-            blocks.append({
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"• *{item['name']}* ({item['pod_name']}) - {item['days_blocked']} days in {item['current_stage']}"
-                }
-            })
+    summary = report['summary']
+    if report.get('previous_watermark'):
+        blocks.append(clos_slack.section_block(SLACK_TEMPLATES['unblock_delta'], summary))
     
-    if report['wip_violations']:
-        blocks.append({
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": f"*WIP Violations ({len(report['wip_violations'])}):*"
-            }
-        })
-        
-        for violation in report['wip_violations']:
-            blocks.append({
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"• *{violation['pod_id']}*: {violation['current_count']}/{violation['limit']} {violation['item_type']}"
-                }
-            })
+    blocks.extend(format_blocked_item_blocks(report['blocked_items'], summary['blocked_items_count']))
+    
+    blocks.extend(format_wip_violation_blocks(report['wip_violations']))
+    
+    return blocks
+
+def format_pod_unblock_slack_message(pod_name, pod_slice):
+    """
+    Format one pod's slice of the unblock report for its channel
+    """
+    blocks = [clos_slack.header_block(SLACK_TEMPLATES['pod_unblock_header'], {'pod_name': pod_name})]
+    blocks.extend(format_blocked_item_blocks(pod_slice['blocked_items'], len(pod_slice['blocked_items'])))
+    blocks.extend(format_wip_violation_blocks(pod_slice['wip_violations']))
+    return blocks
+
+def format_demo_candidate_blocks(demo_candidates, count):
+    """
+    Format the demo candidate list
+    """
+    if not demo_candidates:
+        return []
     
+    blocks = [clos_slack.section_block(SLACK_TEMPLATES['demo_heading'], {'count': count})]
+    for candidate in demo_candidates:
+        url_text = f" - <{candidate['deployed_url']}|View>" if candidate['deployed_url'] else ""
+        blocks.append(clos_slack.section_block(SLACK_TEMPLATES['demo_candidate'], dict(candidate, url_text=url_text)))
     return blocks
 
 def format_demo_slack_message(demo_report):
@@ -526,57 +1768,51 @@ def format_demo_slack_message(demo_report):
     Format demo report for Slack
     """
     blocks = [
-        {
-            "type": "header",
-            "text": {
-                "type": "plain_text",
-                "text": "🎯 Weekly Demo Preparation"
-            }
-        },
-        {
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": f"Week ending: {demo_report['week_ending']}"
-            }
-        }
+        clos_slack.header_block(SLACK_TEMPLATES['demo_header']),
+        clos_slack.section_block(SLACK_TEMPLATES['week_ending'], demo_report)
     ]
     
-    if demo_report['demo_candidates']:
-        blocks.append({
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": f"*Demo Candidates ({len(demo_report['demo_candidates'])}):*"
-            }
-        })
-        
-        for candidate in demo_report['demo_candidates'][:5]:
-            url_text = f" - <{candidate['deployed_url']}|View>" if candidate['deployed_url'] else ""
-            blocks.append({
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": f"• *{candidate['name']}* ({candidate['pod_name']}){url_text}"
-                }
-            })
+    blocks.extend(format_demo_candidate_blocks(
+        demo_report['demo_candidates'], demo_report['summary']['demo_candidates_count']
+    ))
+    
+    return blocks
+
+def format_pod_demo_slack_message(pod_name, pod_slice):
+    """
+    Format one pod's slice of the demo report for its channel
+    """
+    blocks = [
+        clos_slack.header_block(SLACK_TEMPLATES['pod_demo_header'], {'pod_name': pod_name}),
+        clos_slack.section_block(SLACK_TEMPLATES['week_ending'], pod_slice)
+    ]
+    
+    blocks.extend(format_demo_candidate_blocks(pod_slice['demo_candidates'], len(pod_slice['demo_candidates'])))
+    
+    if pod_slice['completed_work']:
+        blocks.append(clos_slack.section_block(
+            SLACK_TEMPLATES['completed_heading'], {'count': len(pod_slice['completed_work'])}
+        ))
+        for work in pod_slice['completed_work']:
+            blocks.append(clos_slack.section_block(SLACK_TEMPLATES['completed_item'], work))
     
     return blocks
 
+@clos_telemetry.timer('eventbridge_put_ms')
 def emit_daily_unblock_event(report):
     """
     Emit daily unblock event to EventBridge
     """
     try:
-        eventbridge = boto3.client('events')
-        event_bus_name = os.environ['EVENT_BUS_NAME']
+        eventbridge = clos_runtime.get_client('events')
+        event_bus_name = clos_runtime.load_config(required=('EVENT_BUS_NAME',))['EVENT_BUS_NAME']
         
         response = eventbridge.put_events(
             Entries=[
                 {
                     'Source': 'clos.daily-rhythm',
                     'DetailType': 'Daily Unblock Report',
-                    'Detail': json.dumps(report),
+                    'Detail': clos_runtime.dumps(report),
                     'EventBusName': event_bus_name
                 }
             ]
@@ -591,20 +1827,21 @@ def emit_daily_unblock_event(report):
         logger.error(f"Failed to emit unblock event: {str(e)}")
         return {'status': 'error', 'error': str(e)}
 
+@clos_telemetry.timer('eventbridge_put_ms')
 def emit_weekly_demo_event(demo_report):
     """
     Emit weekly demo event to EventBridge
     """
     try:
-        eventbridge = boto3.client('events')
-        event_bus_name = os.environ['EVENT_BUS_NAME']
+        eventbridge = clos_runtime.get_client('events')
+        event_bus_name = clos_runtime.load_config(required=('EVENT_BUS_NAME',))['EVENT_BUS_NAME']
         
         response = eventbridge.put_events(
             Entries=[
                 {
                     'Source': 'clos.weekly-rhythm',
                     'DetailType': 'Weekly Demo Preparation',
-                    'Detail': json.dumps(demo_report),
+                    'Detail': clos_runtime.dumps(demo_report),
                     'EventBusName': event_bus_name
                 }
             ]
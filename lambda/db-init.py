@@ -1,46 +1,24 @@
-import json
-import boto3
-import psycopg2
-import logging
-from botocore.exceptions import ClientError
+import clos_db
+import clos_indexes
+import clos_migrations
+import clos_profiler
+import clos_runtime
+import clos_telemetry
 
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger = clos_runtime.get_logger()
 
-def handler(event, context):
-    """
-    Initialize the CLOS v2.0 database with required tables and schema
-    """
-    try:
-        # Get database credentials from Secrets Manager
-        secret_arn = context['SECRET_ARN']
-        secrets_client = boto3.client('secretsmanager')
-        
-        secret_response = secrets_client.get_secret_value(SecretId=secret_arn)
-        secret = json.loads(secret_response['SecretString'])
-        
-        # Database connection parameters
-        db_params = {
-            'host': context['DATABASE_HOST'],
-            'database': context['DATABASE_NAME'],
-            'user': secret['username'],
-            'password': secret['password'],
-            'port': 5432
-        }
-        
-        # Connect to database
-        logger.info("Connecting to database...")
-        conn = psycopg2.connect(**db_params)
-        cur = conn.cursor()
-        
-        # Create extensions
-        logger.info("Creating database extensions...")
-        cur.execute("CREATE EXTENSION IF NOT EXISTS \"uuid-ossp\";")
-        cur.execute("CREATE EXTENSION IF NOT EXISTS \"pg_stat_statements\";")
+# Schema migrations, applied in order by clos_migrations. Applied
+# migrations are checksummed, so never edit one; add a new version.
+# The early migrations are idempotent so databases created before the
+# migrations table existed can adopt it.
+MIGRATIONS = [
+    {
+        'version': 1,
+        'name': 'core_schema',
+        'sql': """
+        CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+        CREATE EXTENSION IF NOT EXISTS "pg_stat_statements";
         
-        # Create enums
-        logger.info("Creating enum types...")
-        create_enums = """
         DO $$ BEGIN
             CREATE TYPE stage_type AS ENUM (
                 'inception', 'problem_definition', 'solution_design',
@@ -73,14 +51,7 @@ def handler(event, context):
         EXCEPTION
             WHEN duplicate_object THEN null;
         END $$;
-        """
-        cur.execute(create_enums)
-        
-        # Create core tables
-        logger.info("Creating core tables...")
         
-        # Users table
-        cur.execute("""
         CREATE TABLE IF NOT EXISTS users (
             id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
             email VARCHAR(255) UNIQUE NOT NULL,
@@ -91,10 +62,7 @@ def handler(event, context):
             created_at TIMESTAMP DEFAULT NOW(),
             updated_at TIMESTAMP DEFAULT NOW()
         );
-        """)
         
-        # Pods table
-        cur.execute("""
         CREATE TABLE IF NOT EXISTS pods (
             id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
             name VARCHAR(255) NOT NULL UNIQUE,
@@ -106,20 +74,14 @@ def handler(event, context):
             created_at TIMESTAMP DEFAULT NOW(),
             updated_at TIMESTAMP DEFAULT NOW()
         );
-        """)
         
-        # Add foreign key constraint to users table
-        cur.execute("""
         DO $$ BEGIN
-            ALTER TABLE users ADD CONSTRAINT fk_users_pod_id 
+            ALTER TABLE users ADD CONSTRAINT fk_users_pod_id
                 FOREIGN KEY (pod_id) REFERENCES pods(id);
         EXCEPTION
             WHEN duplicate_object THEN null;
         END $$;
-        """)
         
-        # Projects table
-        cur.execute("""
         CREATE TABLE IF NOT EXISTS projects (
             id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
             name VARCHAR(255) NOT NULL,
@@ -133,10 +95,7 @@ def handler(event, context):
             created_at TIMESTAMP DEFAULT NOW(),
             updated_at TIMESTAMP DEFAULT NOW()
         );
-        """)
         
-        # Stage transitions table
-        cur.execute("""
         CREATE TABLE IF NOT EXISTS stage_transitions (
             id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
             project_id UUID REFERENCES projects(id) ON DELETE CASCADE,
@@ -148,10 +107,7 @@ def handler(event, context):
             notes TEXT,
             created_at TIMESTAMP DEFAULT NOW()
         );
-        """)
         
-        # WIP locks table
-        cur.execute("""
         CREATE TABLE IF NOT EXISTS wip_locks (
             id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
             pod_id UUID REFERENCES pods(id) ON DELETE CASCADE,
@@ -163,10 +119,7 @@ def handler(event, context):
             expires_at TIMESTAMP,
             UNIQUE(pod_id, item_type, item_id)
         );
-        """)
         
-        # Ideas table
-        cur.execute("""
         CREATE TABLE IF NOT EXISTS ideas (
             id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
             title VARCHAR(500) NOT NULL,
@@ -180,10 +133,8 @@ def handler(event, context):
             created_at TIMESTAMP DEFAULT NOW(),
             updated_at TIMESTAMP DEFAULT NOW()
         );
-        """)
         
-        # Activities table for audit log
-        cur.execute("""
+        -- Audit log
         CREATE TABLE IF NOT EXISTS activities (
             id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
             user_id UUID REFERENCES users(id),
@@ -195,10 +146,7 @@ def handler(event, context):
             user_agent TEXT,
             created_at TIMESTAMP DEFAULT NOW()
         );
-        """)
         
-        # Metrics table
-        cur.execute("""
         CREATE TABLE IF NOT EXISTS metrics (
             id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
             pod_id UUID REFERENCES pods(id),
@@ -208,78 +156,398 @@ def handler(event, context):
             timestamp TIMESTAMP DEFAULT NOW(),
             created_at TIMESTAMP DEFAULT NOW()
         );
-        """)
-        
-        # Create indexes for performance
-        logger.info("Creating database indexes...")
-        indexes = [
-            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_projects_pod_id ON projects(pod_id);",
-            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_projects_current_stage ON projects(current_stage);",
-            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_stage_transitions_project_id ON stage_transitions(project_id);",
-            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_wip_locks_pod_id ON wip_locks(pod_id);",
-            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_wip_locks_item_type ON wip_locks(item_type);",
-            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_ideas_status ON ideas(status);",
-            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_ideas_submitted_by ON ideas(submitted_by);",
-            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_activities_user_id ON activities(user_id);",
-            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_activities_created_at ON activities(created_at);",
-            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_metrics_pod_id ON metrics(pod_id);",
-            "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_metrics_timestamp ON metrics(timestamp);",
-        ]
-        
-        for index_sql in indexes:
-            try:
-                cur.execute(index_sql)
-            except psycopg2.Error as e:
-                logger.warning(f"Index creation failed (might already exist): {e}")
-        
-        # Create initial data
-        logger.info("Inserting initial data...")
-        
-        # Create default pods
-        cur.execute("""
+        """
+    },
+    {
+        'version': 2,
+        'name': 'seed_pods_and_system_user',
+        'sql': """
+        -- Health scores run 0-100; DECIMAL(3,2) from version 1 overflows on
+        -- the 100.00 default, so this seed could never apply before the widening
+        ALTER TABLE pods ALTER COLUMN health_score TYPE DECIMAL(5,2);
+        ALTER TABLE projects ALTER COLUMN health_score TYPE DECIMAL(5,2);
+
         INSERT INTO pods (name, description, wip_limits) VALUES
             ('Ratio', 'Core architecture and infrastructure pod', '{"projects": 3, "pull_requests": 5}'),
             ('Nanda', 'AI and automation systems pod', '{"projects": 2, "pull_requests": 4}'),
             ('Meta', 'Operations and process optimization pod', '{"projects": 2, "pull_requests": 3}')
         ON CONFLICT (name) DO NOTHING;
-        """)
         
-        # Create system user
-        cur.execute("""
         INSERT INTO users (email, name, role) VALUES
             ('system@candlefish.ai', 'System User', 'system')
         ON CONFLICT (email) DO NOTHING;
-        """)
+        """
+    },
+    {
+        'version': 3,
+        'name': 'pod_weekly_rollups',
+        'sql': """
+        -- Per-pod, per-week transition counters for the weekly demo report
+        CREATE TABLE IF NOT EXISTS pod_weekly_rollups (
+            pod_id UUID REFERENCES pods(id) ON DELETE CASCADE,
+            week_start DATE NOT NULL,
+            transitions_count INTEGER NOT NULL DEFAULT 0,
+            completed_transitions INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT NOW(),
+            PRIMARY KEY (pod_id, week_start)
+        );
         
-        # Commit all changes
-        conn.commit()
-        logger.info("Database initialization completed successfully")
+        -- Keep the rollup current as transitions are written
+        CREATE OR REPLACE FUNCTION rollup_stage_transition() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO pod_weekly_rollups (pod_id, week_start, transitions_count, completed_transitions, updated_at)
+            SELECT p.pod_id,
+                   date_trunc('week', COALESCE(NEW.approved_at, NOW()))::date,
+                   1,
+                   CASE WHEN NEW.to_stage = 'monitoring' THEN 1 ELSE 0 END,
+                   NOW()
+            FROM projects p
+            WHERE p.id = NEW.project_id AND p.pod_id IS NOT NULL
+            ON CONFLICT (pod_id, week_start) DO UPDATE SET
+                transitions_count = pod_weekly_rollups.transitions_count + EXCLUDED.transitions_count,
+                completed_transitions = pod_weekly_rollups.completed_transitions + EXCLUDED.completed_transitions,
+                updated_at = NOW();
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+        
+        DROP TRIGGER IF EXISTS trg_rollup_stage_transition ON stage_transitions;
+        CREATE TRIGGER trg_rollup_stage_transition
+            AFTER INSERT ON stage_transitions
+            FOR EACH ROW EXECUTE FUNCTION rollup_stage_transition();
+        """
+    },
+    {
+        'version': 4,
+        'name': 'report_snapshots',
+        'sql': """
+        -- Report snapshots for incremental daily reports
+        CREATE TABLE IF NOT EXISTS report_snapshots (
+            id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+            report_type VARCHAR(100) NOT NULL,
+            watermark TIMESTAMPTZ NOT NULL,
+            state JSONB NOT NULL DEFAULT '{}',
+            created_at TIMESTAMP DEFAULT NOW()
+        );
+        """
+    },
+    {
+        'version': 5,
+        'name': 'activity_categories',
+        'sql': """
+        -- Classify activities at write time so reports don't need LIKE '%...%' scans
+        DO $$ BEGIN
+            CREATE TYPE activity_category AS ENUM (
+                'general', 'impediment', 'blocked'
+            );
+        EXCEPTION
+            WHEN duplicate_object THEN null;
+        END $$;
+        
+        ALTER TABLE activities
+            ADD COLUMN IF NOT EXISTS category activity_category NOT NULL DEFAULT 'general';
+        
+        CREATE OR REPLACE FUNCTION classify_activity() RETURNS trigger AS $$
+        BEGIN
+            NEW.category := CASE
+                WHEN NEW.action ILIKE '%impediment%' THEN 'impediment'::activity_category
+                WHEN NEW.action ILIKE '%blocked%' THEN 'blocked'::activity_category
+                ELSE 'general'::activity_category
+            END;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+        
+        DROP TRIGGER IF EXISTS trg_classify_activity ON activities;
+        CREATE TRIGGER trg_classify_activity
+            BEFORE INSERT OR UPDATE OF action ON activities
+            FOR EACH ROW EXECUTE FUNCTION classify_activity();
+        
+        -- Backfill categories for activities written before the trigger existed
+        UPDATE activities SET action = action
+        WHERE category = 'general'
+            AND (action ILIKE '%impediment%' OR action ILIKE '%blocked%');
+        """
+    },
+    {
+        'version': 6,
+        'name': 'demo_fanout',
+        'sql': """
+        -- Weekly demo fan-out runs and the pod reports merged into them
+        CREATE TABLE IF NOT EXISTS demo_fanout_runs (
+            run_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+            expected_pods INTEGER NOT NULL,
+            completed_pods INTEGER NOT NULL DEFAULT 0,
+            aggregated_at TIMESTAMPTZ,
+            created_at TIMESTAMPTZ DEFAULT NOW()
+        );
+        
+        CREATE TABLE IF NOT EXISTS demo_fanout_pod_reports (
+            run_id UUID REFERENCES demo_fanout_runs(run_id) ON DELETE CASCADE,
+            pod_id UUID REFERENCES pods(id) ON DELETE CASCADE,
+            report JSONB NOT NULL,
+            created_at TIMESTAMPTZ DEFAULT NOW(),
+            PRIMARY KEY (run_id, pod_id)
+        );
+        """
+    },
+    {
+        'version': 7,
+        'name': 'partition_activities_and_metrics',
+        'sql': """
+        -- Monthly range partitions; clos_partitions keeps future months created
+        -- and applies retention to old ones
+        CREATE OR REPLACE FUNCTION create_monthly_partition(parent TEXT, month_start DATE) RETURNS TEXT AS $$
+        DECLARE
+            partition_name TEXT := parent || '_' || to_char(month_start, 'YYYY_MM');
+        BEGIN
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                partition_name, parent, month_start, (month_start + INTERVAL '1 month')::date
+            );
+            RETURN partition_name;
+        END;
+        $$ LANGUAGE plpgsql;
+        
+        CREATE OR REPLACE FUNCTION create_monthly_partitions(parent TEXT, first_month DATE, last_month DATE) RETURNS INTEGER AS $$
+        DECLARE
+            month DATE := date_trunc('month', first_month)::date;
+            created INTEGER := 0;
+        BEGIN
+            WHILE month <= last_month LOOP
+                PERFORM create_monthly_partition(parent, month);
+                month := (month + INTERVAL '1 month')::date;
+                created := created + 1;
+            END LOOP;
+            RETURN created;
+        END;
+        $$ LANGUAGE plpgsql;
+        
+        -- activities, partitioned by created_at
+        ALTER TABLE activities RENAME TO activities_unpartitioned;
+        DROP TRIGGER IF EXISTS trg_classify_activity ON activities_unpartitioned;
+        
+        CREATE TABLE activities (
+            id UUID NOT NULL DEFAULT uuid_generate_v4(),
+            user_id UUID REFERENCES users(id),
+            action VARCHAR(100) NOT NULL,
+            category activity_category NOT NULL DEFAULT 'general',
+            resource_type VARCHAR(100),
+            resource_id UUID,
+            details JSONB DEFAULT '{}',
+            ip_address INET,
+            user_agent TEXT,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at);
+        
+        CREATE TRIGGER trg_classify_activity
+            BEFORE INSERT OR UPDATE OF action ON activities
+            FOR EACH ROW EXECUTE FUNCTION classify_activity();
+        
+        SELECT create_monthly_partitions(
+            'activities',
+            COALESCE(MIN(created_at), NOW())::date,
+            GREATEST(MAX(created_at), NOW() + INTERVAL '3 months')::date
+        )
+        FROM activities_unpartitioned;
+        
+        INSERT INTO activities (
+            id, user_id, action, category, resource_type, resource_id,
+            details, ip_address, user_agent, created_at
+        )
+        SELECT
+            id, user_id, action, category, resource_type, resource_id,
+            details, ip_address, user_agent, COALESCE(created_at, NOW())
+        FROM activities_unpartitioned;
+        
+        DROP TABLE activities_unpartitioned;
+        
+        -- metrics, partitioned by timestamp
+        ALTER TABLE metrics RENAME TO metrics_unpartitioned;
+        
+        CREATE TABLE metrics (
+            id UUID NOT NULL DEFAULT uuid_generate_v4(),
+            pod_id UUID REFERENCES pods(id),
+            metric_type VARCHAR(100) NOT NULL,
+            metric_value DECIMAL(10,4) NOT NULL,
+            dimensions JSONB DEFAULT '{}',
+            timestamp TIMESTAMP NOT NULL DEFAULT NOW(),
+            created_at TIMESTAMP DEFAULT NOW(),
+            PRIMARY KEY (id, timestamp)
+        ) PARTITION BY RANGE (timestamp);
         
-        return {
-            'statusCode': 200,
-            'body': json.dumps({
-                'message': 'Database initialized successfully',
-                'tables_created': [
-                    'users', 'pods', 'projects', 'stage_transitions',
-                    'wip_locks', 'ideas', 'activities', 'metrics'
-                ]
-            })
-        }
+        SELECT create_monthly_partitions(
+            'metrics',
+            COALESCE(MIN(timestamp), NOW())::date,
+            GREATEST(MAX(timestamp), NOW() + INTERVAL '3 months')::date
+        )
+        FROM metrics_unpartitioned;
         
+        INSERT INTO metrics (id, pod_id, metric_type, metric_value, dimensions, timestamp, created_at)
+        SELECT id, pod_id, metric_type, metric_value, dimensions, COALESCE(timestamp, NOW()), created_at
+        FROM metrics_unpartitioned;
+        
+        DROP TABLE metrics_unpartitioned;
+        """
+    },
+    {
+        'version': 8,
+        'name': 'metric_rollups',
+        'sql': """
+        -- 1m/1h/1d metric aggregates maintained by clos_metrics; sketch holds
+        -- mergeable log-bucket counts for percentile estimates
+        CREATE TABLE IF NOT EXISTS metric_rollups (
+            resolution VARCHAR(4) NOT NULL CHECK (resolution IN ('1m', '1h', '1d')),
+            bucket_start TIMESTAMP NOT NULL,
+            pod_id UUID REFERENCES pods(id),
+            metric_type VARCHAR(100) NOT NULL,
+            dimensions JSONB NOT NULL DEFAULT '{}',
+            sample_count BIGINT NOT NULL,
+            value_sum DOUBLE PRECISION NOT NULL,
+            value_min DOUBLE PRECISION NOT NULL,
+            value_max DOUBLE PRECISION NOT NULL,
+            sketch JSONB NOT NULL,
+            updated_at TIMESTAMP DEFAULT NOW(),
+            CONSTRAINT metric_rollups_bucket_key
+                UNIQUE NULLS NOT DISTINCT (resolution, metric_type, pod_id, dimensions, bucket_start)
+        );
+        
+        -- Raw metrics are rolled up to this point
+        CREATE TABLE IF NOT EXISTS metric_rollup_state (
+            name VARCHAR(50) PRIMARY KEY,
+            watermark TIMESTAMP NOT NULL,
+            updated_at TIMESTAMP DEFAULT NOW()
+        );
+        """
+    },
+    {
+        'version': 9,
+        'name': 'drop_btree_time_indexes',
+        'sql': """
+        -- Replaced by BRIN indexes (see INDEXES): rows arrive in time order,
+        -- so block ranges summarise these columns at a fraction of the size
+        DROP INDEX IF EXISTS idx_activities_created_at;
+        DROP INDEX IF EXISTS idx_metrics_timestamp;
+        """
+    },
+    {
+        'version': 10,
+        'name': 'idea_ledger_columns',
+        'sql': """
+        -- Ideas imported from the idea ledger CSV: the owning pod, and a
+        -- stable key (hash of title and pod) so re-imports update in place
+        ALTER TABLE ideas ADD COLUMN IF NOT EXISTS pod_id UUID REFERENCES pods(id);
+        ALTER TABLE ideas ADD COLUMN IF NOT EXISTS ledger_key CHAR(64);
+        ALTER TABLE ideas ADD CONSTRAINT ideas_ledger_key_key UNIQUE (ledger_key);
+        """
+    },
+    {
+        'version': 11,
+        'name': 'idea_evaluation_rank',
+        'sql': """
+        -- Rank of the idea's evaluation_score within its pod and gate (1 = best)
+        ALTER TABLE ideas ADD COLUMN IF NOT EXISTS evaluation_rank INTEGER;
+        """
+    },
+    {
+        'version': 12,
+        'name': 'drop_projects_updated_at_index',
+        'sql': """
+        -- Every stale/blocked project query also filters out 'monitoring', which
+        -- idx_projects_stale covers; the planner kept picking this smaller
+        -- plain index instead and paid a heap lookup per row
+        DROP INDEX IF EXISTS idx_projects_updated_at;
+        """
+    }
+]
+
+# Declared indexes, built online by clos_indexes. Columns are written the
+# way pg_get_indexdef prints them so the spec can be checked against the catalog.
+INDEXES = [
+    {'name': 'idx_projects_pod_id', 'table': 'projects', 'columns': 'pod_id'},
+    {'name': 'idx_projects_current_stage', 'table': 'projects', 'columns': 'current_stage'},
+    {
+        # Covers the stale/blocked project report queries without heap lookups
+        'name': 'idx_projects_stale',
+        'table': 'projects',
+        'columns': 'updated_at',
+        'include': 'id, name, current_stage, pod_id',
+        'where': "current_stage <> 'monitoring'"
+    },
+    {'name': 'idx_projects_pod_stage_updated', 'table': 'projects', 'columns': 'pod_id, current_stage, updated_at DESC'},
+    {'name': 'idx_stage_transitions_project_id', 'table': 'stage_transitions', 'columns': 'project_id'},
+    {'name': 'idx_stage_transitions_project_approved', 'table': 'stage_transitions', 'columns': 'project_id, approved_at DESC'},
+    {'name': 'idx_stage_transitions_evidence', 'table': 'stage_transitions', 'columns': 'evidence jsonb_path_ops', 'method': 'gin'},
+    {'name': 'idx_wip_locks_pod_id', 'table': 'wip_locks', 'columns': 'pod_id'},
+    {'name': 'idx_wip_locks_item_type', 'table': 'wip_locks', 'columns': 'item_type'},
+    {'name': 'idx_ideas_status', 'table': 'ideas', 'columns': 'status'},
+    {'name': 'idx_ideas_submitted_by', 'table': 'ideas', 'columns': 'submitted_by'},
+    {'name': 'idx_ideas_pod_id', 'table': 'ideas', 'columns': 'pod_id'},
+    {'name': 'idx_ideas_tags', 'table': 'ideas', 'columns': 'tags jsonb_path_ops', 'method': 'gin'},
+    # Also serves the LSH bucket lookups in clos_idea_similarity
+    {'name': 'idx_ideas_metadata', 'table': 'ideas', 'columns': 'metadata jsonb_path_ops', 'method': 'gin'},
+    {'name': 'idx_activities_user_id', 'table': 'activities', 'columns': 'user_id'},
+    {'name': 'idx_activities_created_at_brin', 'table': 'activities', 'columns': 'created_at', 'method': 'brin'},
+    {
+        'name': 'idx_activities_impediments',
+        'table': 'activities',
+        'columns': 'created_at DESC',
+        'where': "category IN ('impediment', 'blocked')"
+    },
+    {'name': 'idx_metrics_pod_id', 'table': 'metrics', 'columns': 'pod_id'},
+    {'name': 'idx_metrics_timestamp_brin', 'table': 'metrics', 'columns': '"timestamp"', 'method': 'brin'},
+    {'name': 'idx_metrics_dimensions', 'table': 'metrics', 'columns': 'dimensions jsonb_path_ops', 'method': 'gin'},
+    {'name': 'idx_report_snapshots_type_watermark', 'table': 'report_snapshots', 'columns': 'report_type, watermark DESC'},
+    {'name': 'idx_metric_rollups_type_bucket', 'table': 'metric_rollups', 'columns': 'resolution, metric_type, bucket_start'},
+]
+
+@clos_profiler.profile_handler('db-init')
+@clos_telemetry.instrument_handler('db-init')
+def handler(event, context):
+    """
+    Bring the CLOS v2.0 database schema up to date.
+    
+    Pass {"dry_run": true} to list pending migrations and index builds,
+    and check the index spec against the catalog, without changing anything.
+    """
+    event = event or {}
+    dry_run = bool(event.get('dry_run', False))
+    clos_telemetry.set_dimensions(event_type='dry_run' if dry_run else 'migrate')
+    
+    try:
+        # Connect to database (credentials and connection are reused while warm)
+        logger.info("Connecting to database...")
+        with clos_telemetry.timer('connect_ms'):
+            conn = clos_db.get_connection()
+        
+        logger.info("Running schema migrations...")
+        with clos_telemetry.timer('migrations_ms'):
+            result = clos_migrations.run_migrations(conn, MIGRATIONS, dry_run=dry_run)
+        
+        # Create indexes for performance, online and outside any transaction
+        logger.info("Checking database indexes...")
+        with clos_telemetry.timer('indexes_ms'):
+            index_result = clos_indexes.ensure_indexes(conn, INDEXES, dry_run=dry_run)
+        
+        logger.info("Database initialization completed successfully")
+        
+        return clos_runtime.response(200, {
+            'message': 'Database migration dry run completed' if dry_run else 'Database initialized successfully',
+            'schema_version': max(migration['version'] for migration in MIGRATIONS),
+            'migrations': result,
+            'indexes': index_result
+        })
+    
     except Exception as e:
         logger.error(f"Database initialization failed: {str(e)}")
-        if 'conn' in locals():
+        if 'conn' in locals() and not conn.closed:
             conn.rollback()
         
-        return {
-            'statusCode': 500,
-            'body': json.dumps({
-                'error': f'Database initialization failed: {str(e)}'
-            })
-        }
+        return clos_runtime.response(500, {
+            'error': f'Database initialization failed: {str(e)}'
+        })
     
     finally:
-        if 'cur' in locals():
-            cur.close()
         if 'conn' in locals():
-            conn.close()
\ No newline at end of file
+            clos_db.release_connection(conn)
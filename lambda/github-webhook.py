@@ -1,51 +1,56 @@
 import json
-import boto3
-import logging
 import hmac
 import hashlib
-import os
 from datetime import datetime, timezone
 
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+import clos_profiler
+import clos_runtime
+import clos_telemetry
+import clos_trace
 
+logger = clos_runtime.get_logger()
+
+@clos_profiler.profile_handler('github-webhook')
+@clos_telemetry.instrument_handler('github-webhook')
 def handler(event, context):
     """
     Handle GitHub webhook events and route them to EventBridge
     """
     try:
-        eventbridge = boto3.client('events')
-        sqs = boto3.client('sqs')
-        
-        event_bus_name = os.environ['EVENT_BUS_NAME']
-        github_secret = os.environ.get('GITHUB_SECRET', '')
-        queue_url = os.environ['QUEUE_URL']
+        config = clos_runtime.load_config(
+            required=('EVENT_BUS_NAME', 'QUEUE_URL'),
+            optional={'GITHUB_SECRET': ''}
+        )
+        event_bus_name = config['EVENT_BUS_NAME']
+        github_secret = config['GITHUB_SECRET']
+        queue_url = config['QUEUE_URL']
         
         # Parse the incoming webhook request
         if 'body' in event:
             # API Gateway event
             body = event['body']
             headers = event.get('headers', {})
+            clos_telemetry.set_dimensions(event_type=headers.get('X-GitHub-Event', 'unknown'))
+            clos_telemetry.observe('payload_bytes', len(body or ''), unit='Bytes')
             
             # Verify GitHub signature if secret is configured
             if github_secret:
                 signature = headers.get('X-Hub-Signature-256', '')
-                if not verify_github_signature(body, signature, github_secret):
+                with clos_telemetry.timer('signature_check_ms'):
+                    signature_valid = verify_github_signature(body, signature, github_secret)
+                if not signature_valid:
                     logger.warning("Invalid GitHub signature")
-                    return {
-                        'statusCode': 403,
-                        'body': json.dumps({'error': 'Invalid signature'})
-                    }
+                    clos_telemetry.count('invalid_signatures')
+                    return clos_runtime.response(403, {'error': 'Invalid signature'})
             
             # Parse webhook payload
             try:
-                payload = json.loads(body)
+                with clos_telemetry.timer('parse_ms'):
+                    payload = json.loads(body)
             except json.JSONDecodeError:
                 logger.error("Invalid JSON payload")
-                return {
-                    'statusCode': 400,
-                    'body': json.dumps({'error': 'Invalid JSON'})
-                }
+                clos_telemetry.count('invalid_payloads')
+                return clos_runtime.response(400, {'error': 'Invalid JSON'})
             
         else:
             # Direct Lambda invocation (for testing)
@@ -56,67 +61,75 @@ def handler(event, context):
         event_type = headers.get('X-GitHub-Event', 'unknown')
         delivery_id = headers.get('X-GitHub-Delivery', 'unknown')
         
-        logger.info(f"Processing GitHub webhook: {event_type} (delivery: {delivery_id})")
+        # Trace the delivery through EventBridge, SQS and the processors
+        received_at_ms = (event.get('requestContext') or {}).get('requestTimeEpoch')
+        trace = clos_trace.start_trace(delivery_id, received_at_ms)
+        
+        logger.info(f"Processing GitHub webhook: {event_type} (delivery: {delivery_id}, trace: {trace['trace_id']})")
+        clos_telemetry.set_dimensions(event_type=event_type)
         
         # Process based on event type
         processed_events = []
-        
-        if event_type == 'pull_request':
-            processed_events.append(process_pull_request_event(payload))
-        elif event_type == 'push':
-            processed_events.append(process_push_event(payload))
-        elif event_type == 'deployment':
-            processed_events.append(process_deployment_event(payload))
-        elif event_type == 'deployment_status':
-            processed_events.append(process_deployment_status_event(payload))
-        elif event_type == 'issues':
-            processed_events.append(process_issues_event(payload))
-        elif event_type == 'workflow_run':
-            processed_events.append(process_workflow_run_event(payload))
-        else:
-            logger.info(f"Unhandled GitHub event type: {event_type}")
-            processed_events.append({
-                'source': 'github.webhook',
-                'detail_type': f'GitHub {event_type.title()}',
-                'detail': {
-                    'event_type': event_type,
-                    'delivery_id': delivery_id,
-                    'repository': payload.get('repository', {}),
-                    'sender': payload.get('sender', {}),
-                    'raw_payload': payload
-                }
-            })
+        with clos_telemetry.timer('transform_ms'):
+            if event_type == 'pull_request':
+                processed_events.append(process_pull_request_event(payload))
+            elif event_type == 'push':
+                processed_events.append(process_push_event(payload))
+            elif event_type == 'deployment':
+                processed_events.append(process_deployment_event(payload))
+            elif event_type == 'deployment_status':
+                processed_events.append(process_deployment_status_event(payload))
+            elif event_type == 'issues':
+                processed_events.append(process_issues_event(payload))
+            elif event_type == 'workflow_run':
+                processed_events.append(process_workflow_run_event(payload))
+            else:
+                logger.info(f"Unhandled GitHub event type: {event_type}")
+                processed_events.append({
+                    'source': 'github.webhook',
+                    'detail_type': f'GitHub {event_type.title()}',
+                    'detail': {
+                        'event_type': event_type,
+                        'delivery_id': delivery_id,
+                        'repository': payload.get('repository', {}),
+                        'sender': payload.get('sender', {}),
+                        'raw_payload': payload
+                    }
+                })
         
         # Send events to EventBridge and SQS
+        eventbridge = clos_runtime.get_client('events')
+        sqs = clos_runtime.get_client('sqs')
         results = []
         for processed_event in processed_events:
             if processed_event:
+                processed_event['detail']['trace'] = trace
+                clos_telemetry.set_dimensions(pod=processed_event['detail'].get('pod_id'))
+                
                 # Send to EventBridge
                 eventbridge_result = send_to_eventbridge(eventbridge, event_bus_name, processed_event)
                 
                 # Send to SQS for processing
                 sqs_result = send_to_sqs(sqs, queue_url, processed_event)
                 
+                published = eventbridge_result['status'] == 'success' and sqs_result['status'] == 'success'
+                clos_telemetry.count('events_published' if published else 'publish_failures')
+                
                 results.append({
                     'event_type': processed_event['detail_type'],
                     'eventbridge': eventbridge_result,
                     'sqs': sqs_result
                 })
         
-        return {
-            'statusCode': 200,
-            'body': json.dumps({
-                'message': f'Processed {len(results)} GitHub events',
-                'results': results
-            })
-        }
+        return clos_runtime.response(200, {
+            'message': f'Processed {len(results)} GitHub events',
+            'trace_id': trace['trace_id'],
+            'results': results
+        })
         
     except Exception as e:
         logger.error(f"GitHub webhook processor failed: {str(e)}")
-        return {
-            'statusCode': 500,
-            'body': json.dumps({'error': str(e)})
-        }
+        return clos_runtime.response(500, {'error': str(e)})
 
 def verify_github_signature(payload, signature, secret):
     """
@@ -363,6 +376,7 @@ def determine_pod_from_repository(repo_name, labels=None):
     # Default to Ratio for unknown repositories
     return 'Ratio'
 
+@clos_telemetry.timer('eventbridge_put_ms')
 def send_to_eventbridge(eventbridge, event_bus_name, processed_event):
     """
     Send processed event to EventBridge
@@ -373,7 +387,7 @@ def send_to_eventbridge(eventbridge, event_bus_name, processed_event):
                 {
                     'Source': processed_event['source'],
                     'DetailType': processed_event['detail_type'],
-                    'Detail': json.dumps(processed_event['detail']),
+                    'Detail': clos_runtime.dumps(processed_event['detail']),
                     'EventBusName': event_bus_name
                 }
             ]
@@ -389,6 +403,7 @@ def send_to_eventbridge(eventbridge, event_bus_name, processed_event):
         logger.error(f"Failed to send to EventBridge: {str(e)}")
         return {'status': 'error', 'error': str(e)}
 
+@clos_telemetry.timer('sqs_send_ms')
 def send_to_sqs(sqs, queue_url, processed_event):
     """
     Send processed event to SQS for further processing
@@ -396,7 +411,7 @@ def send_to_sqs(sqs, queue_url, processed_event):
     try:
         response = sqs.send_message(
             QueueUrl=queue_url,
-            MessageBody=json.dumps(processed_event),
+            MessageBody=clos_runtime.dumps(processed_event),
             MessageAttributes={
                 'event_type': {
                     'StringValue': processed_event['detail_type'],
@@ -409,7 +424,8 @@ def send_to_sqs(sqs, queue_url, processed_event):
                 'pod_id': {
                     'StringValue': processed_event['detail'].get('pod_id', 'unknown'),
                     'DataType': 'String'
-                }
+                },
+                **clos_trace.message_attributes(processed_event['detail'].get('trace'))
             }
         )
         
@@ -1,26 +1,111 @@
 import json
-import boto3
-import logging
+import time
 from datetime import datetime, timezone
 import os
 
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+import clos_db
+import clos_profiler
+import clos_runtime
+import clos_telemetry
+import clos_trace
 
+logger = clos_runtime.get_logger()
+
+# Ordered stage_type enum values (see db-init.py)
+STAGE_ORDER = (
+    'inception', 'problem_definition', 'solution_design',
+    'development', 'testing', 'deployment', 'monitoring'
+)
+
+def compile_stage_machine(stage_order):
+    """
+    Precompute the legal-transition graph for the stage state machine.
+
+    Projects may advance exactly one stage at a time or move back to any
+    earlier stage for rework. Returns the adjacency set, the reachability
+    table and a next-hop table used to answer path queries.
+    """
+    index = {stage: i for i, stage in enumerate(stage_order)}
+    adjacency = {}
+    for stage, i in index.items():
+        targets = set(stage_order[:i])
+        if i + 1 < len(stage_order):
+            targets.add(stage_order[i + 1])
+        adjacency[stage] = frozenset(targets)
+
+    transitions = frozenset(
+        (from_stage, to_stage)
+        for from_stage, targets in adjacency.items()
+        for to_stage in targets
+    )
+
+    # Breadth-first search from every stage gives shortest paths and reachability
+    next_hop = {}
+    reachable = {}
+    for source in stage_order:
+        parents = {source: None}
+        frontier = [source]
+        while frontier:
+            next_frontier = []
+            for stage in frontier:
+                for target in sorted(adjacency[stage], key=index.get):
+                    if target not in parents:
+                        parents[target] = stage
+                        next_frontier.append(target)
+            frontier = next_frontier
+
+        reachable[source] = frozenset(parents) - {source}
+        for target in parents:
+            if target == source:
+                continue
+            hop = target
+            while parents[hop] != source:
+                hop = parents[hop]
+            next_hop[(source, target)] = hop
+
+    return {
+        'index': index,
+        'adjacency': adjacency,
+        'transitions': transitions,
+        'reachable': reachable,
+        'next_hop': next_hop
+    }
+
+STAGE_MACHINE = compile_stage_machine(STAGE_ORDER)
+
+# Last known stage per project -> (stage, cached_at), kept across warm invocations.
+# Only a pre-filter: approvals are checked against projects.current_stage
+STAGE_CACHE_TTL_SECONDS = int(os.environ.get('STAGE_CACHE_TTL_SECONDS', '30'))
+
+_project_stage_cache = {}
+
+# Repository -> (project, cached_at) map, loaded in one query and kept across warm
+# invocations; entries expire on their own so each container converges on the
+# database without relying on project-update events reaching it
+REPO_CACHE_TTL_SECONDS = int(os.environ.get('REPO_CACHE_TTL_SECONDS', '300'))
+REPO_NEGATIVE_TTL_SECONDS = int(os.environ.get('REPO_NEGATIVE_TTL_SECONDS', '60'))
+
+_repo_project_cache = {
+    'loaded_at': None,
+    'projects': {},
+    'missing': {}
+}
+
+@clos_profiler.profile_handler('stage-gate-processor')
+@clos_telemetry.instrument_handler('stage-gate-processor')
 def handler(event, context):
     """
     Process stage gate transition requests
     """
     try:
-        dynamodb = boto3.resource('dynamodb')
-        eventbridge = boto3.client('events')
-        
-        table_name = os.environ['DYNAMODB_TABLE']
-        event_bus_name = os.environ['EVENT_BUS_NAME']
+        config = clos_runtime.load_config(required=('DYNAMODB_TABLE', 'EVENT_BUS_NAME'))
+        event_bus_name = config['EVENT_BUS_NAME']
         
-        wip_locks_table = dynamodb.Table(table_name)
+        eventbridge = clos_runtime.get_client('events')
+        wip_locks_table = clos_runtime.get_table(config['DYNAMODB_TABLE'])
         
         # Process each SQS record
+        clos_telemetry.observe('batch_size', len(event.get('Records', [])), unit='Count')
         for record in event.get('Records', []):
             try:
                 # Parse the message body
@@ -30,37 +115,46 @@ def handler(event, context):
                 if 'detail' in message_body:
                     detail = message_body['detail']
                     event_type = message_body.get('detail-type', '')
+                    clos_telemetry.set_dimensions(event_type=event_type, pod=detail.get('pod_id'))
+                    trace = clos_trace.begin_record(record, detail)
                     
-                    logger.info(f"Processing stage gate event: {event_type}")
+                    logger.info(f"Processing stage gate event: {event_type} (trace: {trace['trace_id']})")
                     
                     if event_type == "Stage Transition Request":
                         result = process_stage_transition_request(detail, wip_locks_table)
+                    elif event_type == "Stage Path Request":
+                        result = process_stage_path_request(detail)
                     elif event_type == "Pull Request":
                         result = process_pull_request_event(detail, wip_locks_table)
                     elif event_type == "Push":
                         result = process_push_event(detail, wip_locks_table)
                     else:
                         logger.info(f"Unhandled event type: {event_type}")
+                        clos_telemetry.count('records_skipped')
                         continue
                     
-                    # Emit result event
-                    emit_stage_gate_result(eventbridge, event_bus_name, result)
+                    clos_trace.mark(trace, 'process_ms')
+                    
+                    # Emit result event, carrying the trace on to the next hop
+                    emit_stage_gate_result(eventbridge, event_bus_name, clos_trace.attach(result, trace))
+                    clos_telemetry.count(result['event_type'] if result else 'no_result')
+                    clos_trace.mark(trace, 'emit_ms')
+                    clos_trace.finish_record(trace)
                     
             except Exception as e:
                 logger.error(f"Error processing record: {str(e)}")
+                clos_telemetry.count('record_errors')
                 raise
         
-        return {
-            'statusCode': 200,
-            'body': json.dumps({
-                'message': f'Processed {len(event.get("Records", []))} stage gate events'
-            })
-        }
+        return clos_runtime.response(200, {
+            'message': f'Processed {len(event.get("Records", []))} stage gate events'
+        })
         
     except Exception as e:
         logger.error(f"Stage gate processor failed: {str(e)}")
         raise
 
+@clos_telemetry.timer('transition_ms')
 def process_stage_transition_request(detail, wip_locks_table):
     """
     Process a stage transition request
@@ -72,10 +166,37 @@ def process_stage_transition_request(detail, wip_locks_table):
     
     logger.info(f"Processing stage transition: {project_id} from {from_stage} to {to_stage}")
     
+    # Reject illegal or stale transitions before looking at evidence
+    transition_check = validate_stage_transition(project_id, from_stage, to_stage)
+    if not transition_check['valid']:
+        logger.warning(f"Invalid stage transition for {project_id}: {transition_check['reasons']}")
+        return {
+            'event_type': 'stage_gate_rejected',
+            'project_id': project_id,
+            'from_stage': from_stage,
+            'to_stage': to_stage,
+            'rejected_at': datetime.now(timezone.utc).isoformat(),
+            'reasons': transition_check['reasons']
+        }
+    
     # Validate stage gate criteria
     validation_result = validate_stage_gate_criteria(to_stage, evidence)
     
     if validation_result['approved']:
+        # The project may have moved since the request was made, so the stage
+        # change itself decides whether the approval stands
+        applied = apply_stage_transition(project_id, from_stage, to_stage, evidence)
+        if not applied['applied']:
+            logger.warning(f"Stale stage transition for {project_id}: {applied['reasons']}")
+            return {
+                'event_type': 'stage_gate_rejected',
+                'project_id': project_id,
+                'from_stage': from_stage,
+                'to_stage': to_stage,
+                'rejected_at': datetime.now(timezone.utc).isoformat(),
+                'reasons': applied['reasons']
+            }
+        
         # Stage gate approved
         return {
             'event_type': 'stage_gate_approved',
@@ -96,6 +217,147 @@ def process_stage_transition_request(detail, wip_locks_table):
             'reasons': validation_result['reasons']
         }
 
+@clos_telemetry.timer('path_ms')
+def process_stage_path_request(detail):
+    """
+    Answer a "path to stage" query from the precomputed transition table
+    """
+    project_id = detail.get('project_id')
+    from_stage = detail.get('from_stage') or get_cached_stage(project_id)
+    to_stage = detail.get('to_stage')
+    
+    path = get_stage_path(from_stage, to_stage)
+    
+    return {
+        'event_type': 'stage_path_resolved',
+        'project_id': project_id,
+        'from_stage': from_stage,
+        'to_stage': to_stage,
+        'reachable': path is not None,
+        'path': path or [],
+        'resolved_at': datetime.now(timezone.utc).isoformat()
+    }
+
+def validate_stage_transition(project_id, from_stage, to_stage):
+    """
+    Check a requested transition against the compiled stage machine and,
+    when this container saw it recently, the last known stage of the project
+    """
+    reasons = []
+    
+    if from_stage not in STAGE_MACHINE['index']:
+        reasons.append(f'unknown_from_stage:{from_stage}')
+    if to_stage not in STAGE_MACHINE['index']:
+        reasons.append(f'unknown_to_stage:{to_stage}')
+    
+    if not reasons and (from_stage, to_stage) not in STAGE_MACHINE['transitions']:
+        reasons.append(f'illegal_transition:{from_stage}->{to_stage}')
+    
+    # Another container may have moved the project since this one cached it,
+    # so a mismatch is confirmed against the database before rejecting
+    current_stage = get_cached_stage(project_id)
+    if current_stage and from_stage != current_stage:
+        current_stage = fetch_project_stage(project_id)
+    if current_stage and from_stage != current_stage:
+        reasons.append(f'stale_from_stage:current_stage={current_stage}')
+    
+    return {
+        'valid': len(reasons) == 0,
+        'reasons': reasons
+    }
+
+def apply_stage_transition(project_id, from_stage, to_stage, evidence):
+    """
+    Move the project to to_stage and record the transition in one transaction,
+    only if it is still in from_stage
+    """
+    conn = clos_db.get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+        UPDATE projects
+        SET current_stage = %s, updated_at = NOW()
+        WHERE id = %s AND current_stage = %s
+        RETURNING id
+        """, (to_stage, project_id, from_stage))
+        
+        if cur.fetchone() is None:
+            cur.execute("SELECT current_stage FROM projects WHERE id = %s", (project_id,))
+            row = cur.fetchone()
+            conn.rollback()
+            
+            if row is None:
+                return {'applied': False, 'reasons': [f'unknown_project:{project_id}']}
+            cache_project_stage(project_id, row[0])
+            return {'applied': False, 'reasons': [f'stale_from_stage:current_stage={row[0]}']}
+        
+        cur.execute("""
+        INSERT INTO stage_transitions (project_id, from_stage, to_stage, evidence)
+        VALUES (%s, %s, %s, %s)
+        """, (project_id, from_stage, to_stage, json.dumps(evidence)))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        clos_db.release_connection(conn)
+    
+    cache_project_stage(project_id, to_stage)
+    return {'applied': True, 'reasons': []}
+
+def fetch_project_stage(project_id):
+    """
+    Read the current stage of a project and refresh its cache entry
+    """
+    conn = clos_db.get_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT current_stage FROM projects WHERE id = %s", (project_id,))
+        row = cur.fetchone()
+        cur.close()
+    finally:
+        clos_db.release_connection(conn)
+    
+    if row is None:
+        return None
+    cache_project_stage(project_id, row[0])
+    return row[0]
+
+def cache_project_stage(project_id, stage):
+    """
+    Remember the last stage seen for a project
+    """
+    _project_stage_cache[str(project_id)] = (stage, time.monotonic())
+
+def get_cached_stage(project_id):
+    """
+    Return the cached stage of a project, or None once it is older than STAGE_CACHE_TTL_SECONDS
+    """
+    cached = _project_stage_cache.get(project_id)
+    if cached is None or time.monotonic() - cached[1] > STAGE_CACHE_TTL_SECONDS:
+        return None
+    return cached[0]
+
+def get_stage_path(from_stage, to_stage):
+    """
+    Return the shortest legal sequence of stages from from_stage to
+    to_stage (inclusive), or None if to_stage is unreachable
+    """
+    if from_stage not in STAGE_MACHINE['index'] or to_stage not in STAGE_MACHINE['index']:
+        return None
+    if from_stage == to_stage:
+        return [from_stage]
+    if to_stage not in STAGE_MACHINE['reachable'][from_stage]:
+        return None
+    
+    path = [from_stage]
+    while path[-1] != to_stage:
+        path.append(STAGE_MACHINE['next_hop'][(path[-1], to_stage)])
+    
+    return path
+
+@clos_telemetry.timer('pull_request_ms')
 def process_pull_request_event(detail, wip_locks_table):
     """
     Process GitHub pull request events for stage gate automation
@@ -104,18 +366,24 @@ def process_pull_request_event(detail, wip_locks_table):
     pull_request = detail.get('pull_request', {})
     repository = detail.get('repository', {})
     
-    repo_name = repository.get('name')
+    repo_name = repository.get('name') if isinstance(repository, dict) else repository
     pr_number = pull_request.get('number')
     
     logger.info(f"Processing PR event: {action} for {repo_name}#{pr_number}")
     
+    project_id = resolve_project_id(repo_name)
+    if not project_id:
+        logger.info(f"No project registered for repository {repo_name}, skipping PR event")
+        return None
+    
     if action == 'opened':
         # Check if this PR triggers a stage transition
         stage_info = extract_stage_from_pr(pull_request)
         if stage_info:
             return {
                 'event_type': 'stage_transition_detected',
-                'project_id': repo_name,
+                'project_id': project_id,
+                'repository': repo_name,
                 'stage_info': stage_info,
                 'pr_number': pr_number,
                 'detected_at': datetime.now(timezone.utc).isoformat()
@@ -124,13 +392,15 @@ def process_pull_request_event(detail, wip_locks_table):
         # PR merged - potential stage completion
         return {
             'event_type': 'stage_completion_detected',
-            'project_id': repo_name,
+            'project_id': project_id,
+            'repository': repo_name,
             'pr_number': pr_number,
             'merged_at': pull_request.get('merged_at')
         }
     
     return None
 
+@clos_telemetry.timer('push_ms')
 def process_push_event(detail, wip_locks_table):
     """
     Process GitHub push events for deployment detection
@@ -139,15 +409,21 @@ def process_push_event(detail, wip_locks_table):
     repository = detail.get('repository', {})
     commits = detail.get('commits', [])
     
-    repo_name = repository.get('name')
+    repo_name = repository.get('name') if isinstance(repository, dict) else repository
     
     # Check if push to main/production branch
     if ref in ['refs/heads/main', 'refs/heads/production']:
         logger.info(f"Deployment detected for {repo_name}")
         
+        project_id = resolve_project_id(repo_name)
+        if not project_id:
+            logger.info(f"No project registered for repository {repo_name}, skipping push event")
+            return None
+        
         return {
             'event_type': 'deployment_detected',
-            'project_id': repo_name,
+            'project_id': project_id,
+            'repository': repo_name,
             'ref': ref,
             'commit_count': len(commits),
             'head_commit': detail.get('head_commit', {}),
@@ -156,6 +432,119 @@ def process_push_event(detail, wip_locks_table):
     
     return None
 
+def normalize_repo_name(repo):
+    """
+    Reduce 'owner/name', clone URLs and bare names to a lowercase repository name
+    """
+    if not repo:
+        return None
+    
+    name = repo.strip().rstrip('/')
+    if name.endswith('.git'):
+        name = name[:-4]
+    
+    return name.rsplit('/', 1)[-1].rsplit(':', 1)[-1].lower() or None
+
+@clos_telemetry.timer('repo_map_load_ms')
+def load_repo_project_map():
+    """
+    Load the whole repository -> project map in a single query
+    """
+    conn = clos_db.get_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+        SELECT github_repo, id, current_stage
+        FROM projects
+        WHERE github_repo IS NOT NULL
+        """)
+        
+        loaded_at = time.monotonic()
+        projects = {}
+        for github_repo, project_id, current_stage in cur.fetchall():
+            repo_key = normalize_repo_name(github_repo)
+            if repo_key:
+                projects[repo_key] = (str(project_id), loaded_at)
+                cache_project_stage(project_id, current_stage)
+        
+        cur.close()
+    finally:
+        clos_db.release_connection(conn)
+    
+    _repo_project_cache['projects'] = projects
+    _repo_project_cache['missing'] = {}
+    _repo_project_cache['loaded_at'] = loaded_at
+    
+    logger.info(f"Loaded {len(projects)} repository mappings")
+    return projects
+
+def resolve_project_id(repo_name):
+    """
+    Resolve a GitHub repository name to its project UUID using the warm cache
+    """
+    repo_key = normalize_repo_name(repo_name)
+    if not repo_key:
+        return None
+    
+    clos_telemetry.count('repo_lookups')
+    now = time.monotonic()
+    loaded_at = _repo_project_cache['loaded_at']
+    
+    if loaded_at is None or now - loaded_at > REPO_CACHE_TTL_SECONDS:
+        clos_telemetry.count('repo_cache_reloads')
+        load_repo_project_map()
+        now = time.monotonic()
+    
+    cached = _repo_project_cache['projects'].get(repo_key)
+    if cached is not None and now - cached[1] <= REPO_CACHE_TTL_SECONDS:
+        return cached[0]
+    
+    # Unknown repositories are remembered briefly so they don't hit the database per event
+    missed_at = _repo_project_cache['missing'].get(repo_key)
+    if cached is None and missed_at is not None and now - missed_at <= REPO_NEGATIVE_TTL_SECONDS:
+        return None
+    
+    # Missing or expired: ask the database about this repository alone
+    return lookup_repo_project(repo_key)
+
+@clos_telemetry.timer('repo_lookup_ms')
+def lookup_repo_project(repo_key):
+    """
+    Look up the project registered for a single repository and refresh its cache entry
+    """
+    clos_telemetry.count('repo_db_lookups')
+    pattern = '%' + repo_key.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+    
+    conn = clos_db.get_connection()
+    try:
+        cur = conn.cursor()
+        cur.execute("""
+        SELECT github_repo, id, current_stage
+        FROM projects
+        WHERE github_repo IS NOT NULL
+          AND lower(github_repo) LIKE %s
+        """, (pattern,))
+        
+        project_id = None
+        for github_repo, candidate_id, current_stage in cur.fetchall():
+            if normalize_repo_name(github_repo) == repo_key:
+                project_id = str(candidate_id)
+                cache_project_stage(project_id, current_stage)
+                break
+        
+        cur.close()
+    finally:
+        clos_db.release_connection(conn)
+    
+    if project_id is None:
+        _repo_project_cache['projects'].pop(repo_key, None)
+        _repo_project_cache['missing'][repo_key] = time.monotonic()
+    else:
+        _repo_project_cache['projects'][repo_key] = (project_id, time.monotonic())
+        _repo_project_cache['missing'].pop(repo_key, None)
+    
+    return project_id
+
 def validate_stage_gate_criteria(stage, evidence):
     """
     Validate if criteria are met for stage gate transition
@@ -237,6 +626,7 @@ def extract_stage_from_pr(pull_request):
     
     return None
 
+@clos_telemetry.timer('eventbridge_put_ms')
 def emit_stage_gate_result(eventbridge, event_bus_name, result):
     """
     Emit stage gate processing result to EventBridge
@@ -250,7 +640,7 @@ def emit_stage_gate_result(eventbridge, event_bus_name, result):
                 {
                     'Source': 'clos.stage-gates',
                     'DetailType': result['event_type'].replace('_', ' ').title(),
-                    'Detail': json.dumps(result),
+                    'Detail': clos_runtime.dumps(result),
                     'EventBusName': event_bus_name
                 }
             ]
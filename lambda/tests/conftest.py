@@ -0,0 +1,17 @@
+import importlib.util
+import os
+import sys
+
+LAMBDA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The clos_* modules are imported by name, as the Lambda packages do
+sys.path.insert(0, LAMBDA_DIR)
+
+def load_source(name, relative_path):
+    """
+    Import a handler or benchmark script whose file name isn't a module name (db-init.py, ...)
+    """
+    spec = importlib.util.spec_from_file_location(name, os.path.join(LAMBDA_DIR, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,131 @@
+import psycopg2
+import pytest
+
+import clos_migrations
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = []
+
+    def execute(self, sql, params=None):
+        self.conn.statements.append(sql.strip())
+        if sql.startswith("SELECT version, checksum"):
+            if not self.conn.table_exists:
+                raise psycopg2.errors.UndefinedTable('relation "schema_migrations" does not exist')
+            self.rows = sorted(self.conn.committed.items())
+        elif 'pg_try_advisory_lock' in sql:
+            self.conn.locked = True
+            self.rows = [(True,)]
+        elif 'pg_advisory_unlock' in sql:
+            self.conn.locked = False
+            self.rows = [(True,)]
+        elif sql.strip().startswith('CREATE TABLE IF NOT EXISTS schema_migrations'):
+            self.conn.table_exists = True
+        elif 'INSERT INTO schema_migrations' in sql:
+            version, name, checksum, execution_ms = params
+            self.conn.pending[version] = checksum
+        elif 'FAIL' in sql:
+            raise psycopg2.ProgrammingError('syntax error at or near "FAIL"')
+        else:
+            self.conn.executed.append(sql)
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return self.rows[0]
+
+    def close(self):
+        pass
+
+class FakeConnection:
+    """
+    Just enough of a psycopg2 connection for the runner: schema_migrations
+    rows become visible on commit, the advisory lock is a flag
+    """
+
+    def __init__(self, applied=None):
+        self.table_exists = applied is not None
+        self.committed = dict(applied or {})
+        self.pending = {}
+        self.executed = []
+        self.statements = []
+        self.locked = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.committed.update(self.pending)
+        self.pending = {}
+
+    def rollback(self):
+        self.pending = {}
+
+MIGRATIONS = [
+    {'version': 1, 'name': 'initial_schema', 'sql': "CREATE TABLE pods (id UUID PRIMARY KEY);"},
+    {'version': 2, 'name': 'seed_pods', 'sql': "INSERT INTO pods VALUES (gen_random_uuid());"},
+    {'version': 3, 'name': 'projects', 'sql': "CREATE TABLE projects (id UUID PRIMARY KEY);"}
+]
+
+def applied_checksums(migrations):
+    return {m['version']: clos_migrations.migration_checksum(m['sql']) for m in migrations}
+
+def test_validate_migrations_rejects_duplicate_or_unordered_versions():
+    clos_migrations.validate_migrations(MIGRATIONS)
+
+    with pytest.raises(clos_migrations.MigrationError):
+        clos_migrations.validate_migrations([MIGRATIONS[1], MIGRATIONS[0]])
+    with pytest.raises(clos_migrations.MigrationError):
+        clos_migrations.validate_migrations([MIGRATIONS[0], MIGRATIONS[0]])
+
+def test_find_pending_migrations_ignores_surrounding_whitespace():
+    reindented = [dict(MIGRATIONS[0], sql="\n        " + MIGRATIONS[0]['sql'] + "\n        ")]
+
+    assert clos_migrations.find_pending_migrations(reindented, applied_checksums(MIGRATIONS[:1])) == []
+
+def test_find_pending_migrations_rejects_an_edited_applied_migration():
+    edited = [dict(MIGRATIONS[0], sql="CREATE TABLE pods (id BIGINT PRIMARY KEY);")]
+
+    with pytest.raises(clos_migrations.MigrationError, match='changed after it was applied'):
+        clos_migrations.find_pending_migrations(edited, applied_checksums(MIGRATIONS[:1]))
+
+def test_run_migrations_applies_pending_migrations_in_order():
+    conn = FakeConnection()
+
+    result = clos_migrations.run_migrations(conn, MIGRATIONS)
+
+    assert [m['version'] for m in result['applied']] == [1, 2, 3]
+    assert result['already_applied'] == 0
+    assert conn.executed == [m['sql'] for m in MIGRATIONS]
+    assert conn.committed == applied_checksums(MIGRATIONS)
+    assert not conn.locked
+
+def test_run_migrations_is_a_single_query_when_up_to_date():
+    conn = FakeConnection(applied_checksums(MIGRATIONS))
+
+    result = clos_migrations.run_migrations(conn, MIGRATIONS)
+
+    assert result == {'dry_run': False, 'already_applied': 3, 'applied': []}
+    assert len(conn.statements) == 1
+
+def test_run_migrations_dry_run_reports_without_executing():
+    conn = FakeConnection(applied_checksums(MIGRATIONS[:1]))
+
+    result = clos_migrations.run_migrations(conn, MIGRATIONS, dry_run=True)
+
+    assert result['pending'] == [{'version': 2, 'name': 'seed_pods'}, {'version': 3, 'name': 'projects'}]
+    assert conn.executed == []
+    assert conn.committed == applied_checksums(MIGRATIONS[:1])
+
+def test_run_migrations_stops_at_a_failing_migration():
+    failing = MIGRATIONS[:2] + [dict(MIGRATIONS[2], sql="FAIL;")]
+    conn = FakeConnection()
+
+    with pytest.raises(clos_migrations.MigrationError, match=r'Migration 3 \(projects\) failed'):
+        clos_migrations.run_migrations(conn, failing)
+
+    # The earlier migrations stay applied, and the lock is released for the next run
+    assert conn.committed == applied_checksums(MIGRATIONS[:2])
+    assert not conn.locked
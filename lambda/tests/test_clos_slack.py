@@ -0,0 +1,77 @@
+import pytest
+
+import clos_slack
+
+class FakeResponse:
+    def __init__(self, body, status_code=200, headers=None):
+        self.body = body
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self.body
+
+class FakeSession:
+    """
+    Records chat.postMessage payloads and answers with queued responses, then ok
+    """
+
+    def __init__(self, responses=None):
+        self.payloads = []
+        self.responses = list(responses or [])
+
+    def post(self, url, json=None, timeout=None):
+        self.payloads.append(json)
+        if self.responses:
+            return self.responses.pop(0)
+        return FakeResponse({'ok': True, 'ts': f"1700000000.{len(self.payloads):06d}"})
+
+def blocks(count):
+    return [clos_slack.section_block("item $n", {'n': n}) for n in range(count)]
+
+def test_paginate_blocks_keeps_a_short_message_on_one_page():
+    message = blocks(clos_slack.SLACK_MAX_BLOCKS)
+
+    assert clos_slack.paginate_blocks(message) == [message]
+
+def test_paginate_blocks_numbers_the_overflow_pages():
+    pages = clos_slack.paginate_blocks(blocks(120))
+
+    assert [len(page) for page in pages] == [50, 50, 22]
+    assert all(len(page) <= clos_slack.SLACK_MAX_BLOCKS for page in pages)
+    assert pages[1][0]['elements'][0]['text'] == "_Continued (2/3)_"
+    assert pages[2][0]['elements'][0]['text'] == "_Continued (3/3)_"
+    # Every original block is sent exactly once, in order
+    sent = [block['text']['text'] for page in pages for block in page if block['type'] == 'section']
+    assert sent == [f"item {n}" for n in range(120)]
+
+def test_post_threaded_replies_in_the_parent_thread():
+    session = FakeSession()
+
+    result = clos_slack.post_threaded(session, '#clos-daily', blocks(75), 'Daily Unblock Report')
+
+    parent, reply = session.payloads
+    assert 'thread_ts' not in parent
+    assert reply['thread_ts'] == result['ts'] == '1700000000.000001'
+    assert result == {'channel': '#clos-daily', 'ts': '1700000000.000001', 'messages': 2}
+
+def test_post_threaded_retries_after_a_rate_limit(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(clos_slack.time, 'sleep', sleeps.append)
+    session = FakeSession([FakeResponse({}, status_code=429, headers={'Retry-After': '2'})])
+
+    result = clos_slack.post_threaded(session, '#clos-daily', blocks(3), 'Daily Unblock Report')
+
+    assert sleeps == [2]
+    assert len(session.payloads) == 2
+    assert result['messages'] == 1
+
+def test_post_threaded_raises_slack_errors():
+    session = FakeSession([FakeResponse({'ok': False, 'error': 'channel_not_found'})])
+
+    with pytest.raises(clos_slack.SlackApiError, match='channel_not_found'):
+        clos_slack.post_threaded(session, '#missing', blocks(3), 'Daily Unblock Report')
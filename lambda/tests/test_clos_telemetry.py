@@ -0,0 +1,78 @@
+import pytest
+
+import clos_telemetry
+
+@pytest.fixture
+def sink():
+    """
+    Metrics on, written to a fresh MemorySink, restored afterwards
+    """
+    previous_enabled = clos_telemetry.enabled()
+    previous_sink = clos_telemetry.configure()
+    sink = clos_telemetry.configure(True, clos_telemetry.MemorySink())
+    yield sink
+    clos_telemetry.configure(previous_enabled, previous_sink)
+
+def buffered(metrics, dimensions=(('handler', 'daily-unblock'),)):
+    return {tuple(dimensions): metrics}
+
+def test_build_documents_writes_counters_as_scalars_and_histograms_as_arrays():
+    documents = clos_telemetry.build_documents(buffered({
+        'records_skipped': {'unit': 'Count', 'kind': 'counter', 'values': [3]},
+        'query_ms': {'unit': 'Milliseconds', 'kind': 'histogram', 'values': [1.23456, 7.0]}
+    }), 1700000000000)
+
+    document, = documents
+    assert document['handler'] == 'daily-unblock'
+    assert document['records_skipped'] == 3
+    assert document['query_ms'] == [1.235, 7.0]
+    assert document['_aws']['Timestamp'] == 1700000000000
+    directive, = document['_aws']['CloudWatchMetrics']
+    assert directive['Namespace'] == clos_telemetry.EMF_NAMESPACE
+    assert directive['Dimensions'] == [['handler']]
+    assert directive['Metrics'] == [
+        {'Name': 'records_skipped', 'Unit': 'Count'},
+        {'Name': 'query_ms', 'Unit': 'Milliseconds'}
+    ]
+
+def test_build_documents_splits_at_the_cloudwatch_limits():
+    metrics = {
+        f"metric_{n}": {'unit': 'Count', 'kind': 'counter', 'values': [n]}
+        for n in range(clos_telemetry.EMF_MAX_METRICS + 1)
+    }
+    metrics['metric_0'] = {'unit': 'Milliseconds', 'kind': 'histogram', 'values': list(range(250))}
+
+    documents = clos_telemetry.build_documents(buffered(metrics), 0)
+
+    assert all(len(document['_aws']['CloudWatchMetrics'][0]['Metrics']) <= clos_telemetry.EMF_MAX_METRICS
+               for document in documents)
+    assert all(len(document.get('metric_0', [])) <= clos_telemetry.EMF_MAX_VALUES for document in documents)
+    # 101 metrics need two batches; the 250-value histogram spreads over three documents of the first
+    assert len(documents) == 4
+    assert sum((document.get('metric_0', []) for document in documents), []) == list(range(250))
+    assert documents[-1]['metric_100'] == 100
+
+def test_build_documents_adds_the_cross_pod_dimension_set():
+    documents = clos_telemetry.build_documents(buffered(
+        {'events_published': {'unit': 'Count', 'kind': 'counter', 'values': [1]}},
+        (('event_type', 'push'), ('handler', 'github-webhook'), ('pod', 'Ratio'))
+    ), 0)
+
+    assert documents[0]['_aws']['CloudWatchMetrics'][0]['Dimensions'] == [
+        ['event_type', 'handler', 'pod'],
+        ['event_type', 'handler']
+    ]
+
+def test_instrumented_handler_flushes_to_the_memory_sink(sink):
+    @clos_telemetry.instrument_handler('stage-gate-processor')
+    def handler(event, context):
+        clos_telemetry.set_dimensions(event_type='Push', pod='Meta')
+        clos_telemetry.count('records_skipped')
+        clos_telemetry.count('records_skipped')
+        return {'statusCode': 200}
+
+    handler({}, None)
+
+    assert sink.values('records_skipped', pod='Meta') == [2]
+    assert sink.values('invocation_errors', handler='stage-gate-processor') == [0]
+    assert len(sink.values('invocation_ms')) == 1
@@ -0,0 +1,60 @@
+import re
+
+import pytest
+
+import clos_migrations
+from conftest import load_source
+
+@pytest.fixture(scope='module')
+def db_init():
+    return load_source('db_init', 'db-init.py')
+
+@pytest.fixture(scope='module')
+def index_plans():
+    return load_source('index_plans', 'benchmarks/index_plans.py')
+
+def column_names(definition):
+    """
+    Column names declared in a CREATE TABLE body, skipping table constraints
+    """
+    names = set()
+    for line in definition.strip().splitlines():
+        name = line.strip().split(' ', 1)[0]
+        if name and name not in ('PRIMARY', 'UNIQUE', 'FOREIGN', 'CONSTRAINT', 'CHECK'):
+            names.add(name)
+    return names
+
+def index_columns(spec):
+    """
+    Columns an INDEXES spec refers to in its key, INCLUDE and WHERE parts
+    """
+    columns = {part.split()[0].strip('"') for part in spec['columns'].split(',')}
+    if spec.get('include'):
+        columns.update(part.strip() for part in spec['include'].split(','))
+    if spec.get('where'):
+        columns.update(re.findall(r"\b([a-z_]+)\s*(?:<>|!=|=|<|>|IN\b|IS\b)", spec['where']))
+    return columns
+
+def test_migrations_are_unique_and_ascending(db_init):
+    clos_migrations.validate_migrations(db_init.MIGRATIONS)
+
+def test_index_names_are_unique(db_init):
+    names = [spec['name'] for spec in db_init.INDEXES]
+
+    assert len(names) == len(set(names))
+
+def test_index_plan_schema_has_every_indexed_column(db_init, index_plans):
+    # index_plans builds the db-init INDEXES for its scratch tables; a column
+    # missing there fails the benchmark before it gets to the plans
+    specs = index_plans.load_index_specs()
+    assert specs
+
+    for spec in specs:
+        missing = index_columns(spec) - column_names(index_plans.TABLES[spec['table']])
+        assert not missing, f"{spec['name']} needs {sorted(missing)} in the scratch {spec['table']} table"
+
+def test_index_plan_checks_expect_indexes_db_init_creates(db_init, index_plans):
+    names = {spec['name'] for spec in db_init.INDEXES}
+
+    for label, sql, params, expected in index_plans.plan_checks():
+        assert expected in names, f"{label} expects {expected}, which db-init no longer creates"
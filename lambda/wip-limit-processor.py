@@ -1,30 +1,43 @@
 import json
-import boto3
-import logging
 from datetime import datetime, timezone
-import os
-import requests
 
-logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+import clos_profiler
+import clos_runtime
+import clos_telemetry
+import clos_trace
 
+logger = clos_runtime.get_logger()
+
+# Per-pod counter items read by the daily unblock report's fast path
+WIP_COUNTER_PREFIX = 'COUNTER#'
+
+@clos_profiler.profile_handler('wip-limit-processor')
+@clos_telemetry.instrument_handler('wip-limit-processor')
 def handler(event, context):
     """
     Process WIP limit events and enforce constraints
     """
     try:
-        dynamodb = boto3.resource('dynamodb')
-        eventbridge = boto3.client('events')
-        
-        table_name = os.environ['DYNAMODB_TABLE']
-        event_bus_name = os.environ['EVENT_BUS_NAME']
-        slack_webhook = os.environ.get('SLACK_WEBHOOK', '')
+        config = clos_runtime.load_config(
+            required=('DYNAMODB_TABLE', 'EVENT_BUS_NAME'),
+            optional={'SLACK_WEBHOOK': ''}
+        )
+        event_bus_name = config['EVENT_BUS_NAME']
+        slack_webhook = config['SLACK_WEBHOOK']
         
-        wip_locks_table = dynamodb.Table(table_name)
+        eventbridge = clos_runtime.get_client('events')
+        wip_locks_table = clos_runtime.get_table(config['DYNAMODB_TABLE'])
         
         # Process each SQS record
+        clos_telemetry.observe('batch_size', len(event.get('Records', [])), unit='Count')
         for record in event.get('Records', []):
             try:
+                # Locks removed by the table's TTL arrive from its stream, not SQS
+                if record.get('eventSource') == 'aws:dynamodb':
+                    clos_telemetry.set_dimensions(event_type='lock_expired', pod=None)
+                    handle_wip_lock_expired(record, wip_locks_table)
+                    continue
+                
                 # Parse the message body
                 message_body = json.loads(record['body'])
                 
@@ -32,8 +45,10 @@ def handler(event, context):
                 if 'detail' in message_body:
                     detail = message_body['detail']
                     event_type = message_body.get('detail-type', '')
+                    clos_telemetry.set_dimensions(event_type=event_type, pod=detail.get('pod_id'))
+                    trace = clos_trace.begin_record(record, detail)
                     
-                    logger.info(f"Processing WIP limit event: {event_type}")
+                    logger.info(f"Processing WIP limit event: {event_type} (trace: {trace['trace_id']})")
                     
                     if event_type == "WIP Limit Exceeded":
                         result = handle_wip_limit_exceeded(detail, wip_locks_table, slack_webhook)
@@ -45,25 +60,29 @@ def handler(event, context):
                         # Check for WIP limit violations on any project activity
                         result = check_wip_limits(detail, wip_locks_table)
                     
-                    # Emit result event if needed
+                    clos_trace.mark(trace, 'process_ms')
+                    
+                    # Emit result event if needed, carrying the trace on to the next hop
                     if result:
-                        emit_wip_result(eventbridge, event_bus_name, result)
+                        emit_wip_result(eventbridge, event_bus_name, clos_trace.attach(result, trace))
+                    clos_telemetry.count(result['event_type'] if result else 'no_result')
+                    clos_trace.mark(trace, 'emit_ms')
+                    clos_trace.finish_record(trace)
                     
             except Exception as e:
                 logger.error(f"Error processing WIP record: {str(e)}")
+                clos_telemetry.count('record_errors')
                 raise
         
-        return {
-            'statusCode': 200,
-            'body': json.dumps({
-                'message': f'Processed {len(event.get("Records", []))} WIP events'
-            })
-        }
+        return clos_runtime.response(200, {
+            'message': f'Processed {len(event.get("Records", []))} WIP events'
+        })
         
     except Exception as e:
         logger.error(f"WIP limit processor failed: {str(e)}")
         raise
 
+@clos_telemetry.timer('limit_exceeded_ms')
 def handle_wip_limit_exceeded(detail, wip_locks_table, slack_webhook):
     """
     Handle WIP limit exceeded event
@@ -97,6 +116,7 @@ def handle_wip_limit_exceeded(detail, wip_locks_table, slack_webhook):
         'reason': f'WIP limit exceeded: {current_count}/{limit}'
     }
 
+@clos_telemetry.timer('lock_acquired_ms')
 def handle_wip_lock_acquired(detail, wip_locks_table):
     """
     Handle WIP lock acquisition
@@ -110,7 +130,7 @@ def handle_wip_lock_acquired(detail, wip_locks_table):
     
     # Record the lock in DynamoDB
     try:
-        wip_locks_table.put_item(
+        response = wip_locks_table.put_item(
             Item={
                 'pod_id': pod_id,
                 'item_id': item_id,
@@ -118,9 +138,15 @@ def handle_wip_lock_acquired(detail, wip_locks_table):
                 'acquired_by': user_id,
                 'acquired_at': datetime.now(timezone.utc).isoformat(),
                 'expires_at': int((datetime.now(timezone.utc).timestamp() + 86400))  # 24 hours TTL
-            }
+            },
+            ReturnValues='ALL_OLD'
         )
         
+        # Only count the lock once, even if the acquisition is redelivered
+        previous = response.get('Attributes')
+        if not previous or 'released_at' in previous:
+            adjust_wip_counter(wip_locks_table, pod_id, item_type, 1)
+        
         # Check if this acquisition puts us over the limit
         current_count = count_active_wip_items(wip_locks_table, pod_id, item_type)
         pod_limits = get_pod_wip_limits(pod_id)  # You'd implement this
@@ -140,6 +166,7 @@ def handle_wip_lock_acquired(detail, wip_locks_table):
     
     return None
 
+@clos_telemetry.timer('lock_released_ms')
 def handle_wip_lock_released(detail, wip_locks_table):
     """
     Handle WIP lock release
@@ -152,16 +179,21 @@ def handle_wip_lock_released(detail, wip_locks_table):
     
     try:
         # Update the lock record to mark as released
-        wip_locks_table.update_item(
-            Key={
-                'pod_id': pod_id,
-                'item_id': item_id
-            },
-            UpdateExpression='SET released_at = :released_at',
-            ExpressionAttributeValues={
-                ':released_at': datetime.now(timezone.utc).isoformat()
-            }
-        )
+        try:
+            wip_locks_table.update_item(
+                Key={
+                    'pod_id': pod_id,
+                    'item_id': item_id
+                },
+                UpdateExpression='SET released_at = :released_at',
+                ConditionExpression='attribute_exists(pod_id) AND attribute_not_exists(released_at)',
+                ExpressionAttributeValues={
+                    ':released_at': datetime.now(timezone.utc).isoformat()
+                }
+            )
+            adjust_wip_counter(wip_locks_table, pod_id, item_type, -1)
+        except wip_locks_table.meta.client.exceptions.ConditionalCheckFailedException:
+            logger.info(f"WIP lock {pod_id}/{item_id} already released or missing")
         
         # Check if we can unblock work for this pod/item type
         current_count = count_active_wip_items(wip_locks_table, pod_id, item_type)
@@ -183,6 +215,33 @@ def handle_wip_lock_released(detail, wip_locks_table):
     
     return None
 
+@clos_telemetry.timer('lock_expired_ms')
+def handle_wip_lock_expired(record, wip_locks_table):
+    """
+    Decrement the counter for a lock the table's TTL deleted while still held
+    """
+    # TTL deletions are the only REMOVEs made by the DynamoDB service itself
+    identity = record.get('userIdentity') or {}
+    if record.get('eventName') != 'REMOVE' or identity.get('type') != 'Service':
+        return None
+    
+    old_image = (record.get('dynamodb') or {}).get('OldImage') or {}
+    item_id = old_image.get('item_id', {}).get('S', '')
+    if item_id.startswith(WIP_COUNTER_PREFIX) or 'released_at' in old_image:
+        # Released locks were already counted down when they were released
+        return None
+    
+    pod_id = old_image.get('pod_id', {}).get('S')
+    lock_type = old_image.get('lock_type', {}).get('S')
+    if not pod_id or not lock_type:
+        return None
+    
+    logger.info(f"WIP lock expired: {pod_id}/{lock_type}/{item_id}")
+    clos_telemetry.count('locks_expired', pod=pod_id)
+    adjust_wip_counter(wip_locks_table, pod_id, lock_type, -1)
+    return None
+
+@clos_telemetry.timer('limit_check_ms')
 def check_wip_limits(detail, wip_locks_table):
     """
     Check WIP limits for any project activity
@@ -218,6 +277,7 @@ def check_wip_limits(detail, wip_locks_table):
     
     return None
 
+@clos_telemetry.timer('dynamodb_query_ms')
 def count_active_wip_items(wip_locks_table, pod_id, item_type):
     """
     Count active WIP items for a pod and item type
@@ -251,6 +311,7 @@ def get_pod_wip_limits(pod_id):
     
     return default_limits.get(pod_id, {'projects': 2, 'pull_requests': 3, 'deployments': 1})
 
+@clos_telemetry.timer('dynamodb_query_ms')
 def get_pod_wip_status(wip_locks_table, pod_id):
     """
     Get current WIP status for a pod
@@ -258,9 +319,10 @@ def get_pod_wip_status(wip_locks_table, pod_id):
     try:
         response = wip_locks_table.query(
             KeyConditionExpression='pod_id = :pod_id',
-            FilterExpression='attribute_not_exists(released_at)',
+            FilterExpression='attribute_not_exists(released_at) AND NOT begins_with(item_id, :counter_prefix)',
             ExpressionAttributeValues={
-                ':pod_id': pod_id
+                ':pod_id': pod_id,
+                ':counter_prefix': WIP_COUNTER_PREFIX
             }
         )
         
@@ -276,6 +338,40 @@ def get_pod_wip_status(wip_locks_table, pod_id):
         logger.error(f"Failed to get WIP status: {str(e)}")
         return {}
 
+@clos_telemetry.timer('counter_update_ms')
+def adjust_wip_counter(wip_locks_table, pod_id, item_type, delta):
+    """
+    Increment or decrement the active lock counter for a pod/item type.
+    
+    Every change also bumps the counter's updates attribute, which the daily
+    unblock reconciliation checks so it never overwrites a change made after
+    its scan. Decrements stop at zero.
+    """
+    update = {
+        'Key': {
+            'pod_id': pod_id,
+            'item_id': f'{WIP_COUNTER_PREFIX}{item_type}'
+        },
+        'UpdateExpression': 'ADD active_count :delta, updates :one',
+        'ExpressionAttributeValues': {
+            ':delta': delta,
+            ':one': 1
+        }
+    }
+    if delta < 0:
+        update['ConditionExpression'] = 'active_count >= :minimum'
+        update['ExpressionAttributeValues'][':minimum'] = -delta
+    
+    try:
+        wip_locks_table.update_item(**update)
+        
+    except wip_locks_table.meta.client.exceptions.ConditionalCheckFailedException:
+        logger.info(f"WIP counter {pod_id}/{item_type} already at zero")
+    except Exception as e:
+        # Counters are reconciled by the daily unblock scan, so don't fail the lock
+        logger.warning(f"Failed to update WIP counter: {str(e)}")
+
+@clos_telemetry.timer('block_work_ms')
 def block_new_work(wip_locks_table, pod_id, item_type):
     """
     Block new work for a pod/item type
@@ -293,16 +389,22 @@ def block_new_work(wip_locks_table, pod_id, item_type):
                 'reason': 'WIP limit exceeded'
             }
         )
+        # The reconciliation scan counts blocks under their own lock type too
+        adjust_wip_counter(wip_locks_table, pod_id, f'{item_type}_block', 1)
         return True
         
     except Exception as e:
         logger.error(f"Failed to block new work: {str(e)}")
         return False
 
+@clos_telemetry.timer('slack_notify_ms')
 def send_slack_notification(webhook_url, data):
     """
     Send Slack notification for WIP limit violations
     """
+    # Imported here so invocations that never notify don't pay for it at cold start
+    import requests
+    
     try:
         if data['type'] == 'wip_limit_exceeded':
             message = {
@@ -337,6 +439,7 @@ def send_slack_notification(webhook_url, data):
     except Exception as e:
         logger.error(f"Failed to send Slack notification: {str(e)}")
 
+@clos_telemetry.timer('eventbridge_put_ms')
 def emit_wip_result(eventbridge, event_bus_name, result):
     """
     Emit WIP processing result to EventBridge
@@ -347,7 +450,7 @@ def emit_wip_result(eventbridge, event_bus_name, result):
                 {
                     'Source': 'clos.wip-limits',
                     'DetailType': result['event_type'].replace('_', ' ').title(),
-                    'Detail': json.dumps(result),
+                    'Detail': clos_runtime.dumps(result),
                     'EventBusName': event_bus_name
                 }
             ]
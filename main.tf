@@ -230,6 +230,10 @@ resource "aws_iam_role_policy" "lambda_policy" {
           "dynamodb:DeleteItem",
           "dynamodb:Query",
           "dynamodb:Scan",
+          "dynamodb:DescribeStream",
+          "dynamodb:GetRecords",
+          "dynamodb:GetShardIterator",
+          "dynamodb:ListStreams",
           "sqs:SendMessage",
           "sqs:ReceiveMessage",
           "sqs:DeleteMessage",
@@ -255,6 +259,28 @@ resource "aws_iam_role_policy" "lambda_policy" {
   })
 }
 
+# Sampled Lambda profiles (lambda_profile_sample_rate) go to the KMS-encrypted artifacts bucket
+resource "aws_iam_role_policy" "lambda_profiles" {
+  name = "${var.project_name}-lambda-profiles"
+  role = aws_iam_role.lambda_execution_role.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect   = "Allow"
+        Action   = ["s3:PutObject"]
+        Resource = ["${aws_s3_bucket.artifacts.arn}/lambda-profiles/*"]
+      },
+      {
+        Effect   = "Allow"
+        Action   = ["kms:GenerateDataKey"]
+        Resource = [aws_kms_key.clos.arn]
+      }
+    ]
+  })
+}
+
 # S3 Bucket for artifacts and logs
 resource "aws_s3_bucket" "artifacts" {
   bucket = "${var.project_name}-artifacts-${random_id.bucket_suffix.hex}"
@@ -323,6 +323,36 @@ resource "aws_security_group" "lambda" {
   }
 }
 
+# Report Cache Security Group
+resource "aws_security_group" "report_cache" {
+  name_prefix = "${var.project_name}-report-cache-"
+  vpc_id      = aws_vpc.main.id
+
+  ingress {
+    description     = "Redis from Lambda and ECS"
+    from_port       = 6379
+    to_port         = 6379
+    protocol        = "tcp"
+    security_groups = [aws_security_group.ecs_tasks.id, aws_security_group.lambda.id]
+  }
+
+  egress {
+    description = "All outbound traffic"
+    from_port   = 0
+    to_port     = 0
+    protocol    = "-1"
+    cidr_blocks = ["0.0.0.0/0"]
+  }
+
+  tags = {
+    Name = "${var.project_name}-report-cache-sg"
+  }
+
+  lifecycle {
+    create_before_destroy = true
+  }
+}
+
 # VPC Endpoints Security Group
 resource "aws_security_group" "vpc_endpoints" {
   name_prefix = "${var.project_name}-vpc-endpoints-"
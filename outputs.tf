@@ -105,6 +105,13 @@ output "rds_port" {
   value       = aws_rds_cluster.main.port
 }
 
+# Report Cache Outputs
+output "report_cache_url" {
+  description = "Redis URL of the report cache (the Slack bot's REDIS_URL)"
+  value       = local.report_cache_url
+  sensitive   = true
+}
+
 # DynamoDB Outputs
 output "dynamodb_metrics_table_name" {
   description = "Name of the DynamoDB metrics table"
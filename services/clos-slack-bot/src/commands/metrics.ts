@@ -1,5 +1,10 @@
 import { App } from '@slack/bolt';
 import closApi from '../services/closApi';
+import reportCache, {
+  CachedDemoPodReport,
+  CachedReportSummary,
+  CachedUnblockPodReport
+} from '../services/reportCache';
 import logger from '../utils/logger';
 import { formatMetrics, createProgressBar } from '../utils/helpers';
 
@@ -24,7 +29,12 @@ export function registerMetricsCommand(app: App): void {
       if (!text || target === 'pod') {
         // Show pod metrics
         const podName = parts[1] || user.pod;
-        const metrics = await closApi.getPodMetrics(podName);
+        // Report counts come from the pod's slices of the latest cached reports
+        const [metrics, unblockReport, demoReport] = await Promise.all([
+          closApi.getPodMetrics(podName),
+          reportCache.getPodReport<CachedUnblockPodReport>('daily_unblock', podName),
+          reportCache.getPodReport<CachedDemoPodReport>('weekly_demo', podName)
+        ]);
 
         const wipBar = createProgressBar(metrics.wipUtilization, 1, 15);
         
@@ -48,6 +58,17 @@ export function registerMetricsCommand(app: App): void {
           }
         ];
 
+        const podReportText = formatPodReportCounts(unblockReport, demoReport);
+        if (podReportText) {
+          blocks.push({
+            type: 'section',
+            text: {
+              type: 'mrkdwn',
+              text: podReportText
+            }
+          });
+        }
+
         // Add performance indicators
         const throughputStatus = metrics.throughput >= 5 ? '🟢 Excellent' : 
                                metrics.throughput >= 3 ? '🟡 Good' : '🔴 Needs Improvement';
@@ -151,7 +172,11 @@ export function registerMetricsCommand(app: App): void {
 
       } else if (target === 'overall' || target === 'company' || target === 'all') {
         // Show overall company metrics
-        const overallMetrics = await closApi.getOverallMetrics();
+        const [overallMetrics, unblockSummary, demoSummary] = await Promise.all([
+          closApi.getOverallMetrics(),
+          reportCache.getReportSummary('daily_unblock'),
+          reportCache.getReportSummary('weekly_demo')
+        ]);
         
         const blocks = [
           {
@@ -173,6 +198,17 @@ export function registerMetricsCommand(app: App): void {
           }
         ];
 
+        const reportSummaryText = formatReportSummaries(unblockSummary, demoSummary);
+        if (reportSummaryText) {
+          blocks.push({
+            type: 'section',
+            text: {
+              type: 'mrkdwn',
+              text: reportSummaryText
+            }
+          });
+        }
+
         // Add health scorecard
         const healthScore = calculateHealthScore(overallMetrics);
         const healthEmoji = healthScore >= 80 ? '🟢' : healthScore >= 60 ? '🟡' : '🔴';
@@ -182,10 +218,10 @@ export function registerMetricsCommand(app: App): void {
           text: {
             type: 'mrkdwn',
             text: `${healthEmoji} *System Health Score: ${healthScore}/100*\n\n*Key Indicators:*
-• WIP Management: ${metrics.wipUtilization <= 0.8 ? '✅' : '⚠️'}
-• Delivery Speed: ${metrics.throughput >= 4 ? '✅' : '⚠️'}  
-• Cycle Efficiency: ${metrics.cycleTime <= 10 ? '✅' : '⚠️'}
-• Innovation Rate: ${metrics.ideasSubmitted >= 10 ? '✅' : '⚠️'}`
+• WIP Management: ${overallMetrics.wipUtilization <= 0.8 ? '✅' : '⚠️'}
+• Delivery Speed: ${overallMetrics.throughput >= 4 ? '✅' : '⚠️'}  
+• Cycle Efficiency: ${overallMetrics.cycleTime <= 10 ? '✅' : '⚠️'}
+• Innovation Rate: ${overallMetrics.ideasSubmitted >= 10 ? '✅' : '⚠️'}`
           }
         });
 
@@ -432,6 +468,58 @@ function calculateHealthScore(metrics: any): number {
   return Math.max(score, 0);
 }
 
+// Counts from the summary keys the daily-unblock lambda publishes; null when neither report is cached
+function formatReportSummaries(
+  unblockSummary: CachedReportSummary | null,
+  demoSummary: CachedReportSummary | null
+): string | null {
+  const sections = [];
+
+  if (unblockSummary) {
+    const summary = unblockSummary.summary;
+    sections.push(`*Daily Unblock* _(${unblockSummary.date})_
+• Blocked Items: ${summary.blocked_items_count ?? 0} (${summary.newly_blocked_count ?? 0} new, ${summary.resolved_count ?? 0} resolved)
+• Escalated: ${summary.escalated_count ?? 0}
+• Impediments: ${summary.impediments_count ?? 0}
+• WIP Violations: ${summary.wip_violations_count ?? 0}`);
+  }
+
+  if (demoSummary) {
+    const summary = demoSummary.summary;
+    sections.push(`*Weekly Demo* _(${demoSummary.date})_
+• Completed Work: ${summary.completed_work_count ?? 0}
+• Demo Candidates: ${summary.demo_candidates_count ?? 0}
+• Active Pods: ${summary.active_pods ?? 0}`);
+  }
+
+  return sections.length > 0 ? `📋 *Latest Reports*\n\n${sections.join('\n\n')}` : null;
+}
+
+// Counts from a pod's slices of the latest cached reports; null when neither is cached
+function formatPodReportCounts(
+  unblockReport: CachedUnblockPodReport | null,
+  demoReport: CachedDemoPodReport | null
+): string | null {
+  const lines = [];
+
+  if (unblockReport) {
+    lines.push(`• WIP Violations: ${unblockReport.wip_violations.length} _(daily unblock, ${unblockReport.date})_`);
+    const longestBlocked = unblockReport.blocked_items[0];
+    if (longestBlocked) {
+      lines.push(`• Longest Blocked: ${longestBlocked.name} (${longestBlocked.days_blocked ?? '?'} days)`);
+    }
+  }
+
+  if (demoReport) {
+    if (demoReport.summary) {
+      lines.push(`• Stage Transitions This Week: ${demoReport.summary.transitions_this_week} _(weekly demo, week ending ${demoReport.week_ending})_`);
+    }
+    lines.push(`• Demo Candidates: ${demoReport.demo_candidates.length}`);
+  }
+
+  return lines.length > 0 ? `📋 *Latest Reports*\n${lines.join('\n')}` : null;
+}
+
 function calculateCompletionRate(projects: any[]): number {
   if (projects.length === 0) return 0;
   const completed = projects.filter(p => p.stage === 'sunset').length;
@@ -1,5 +1,6 @@
 import { App } from '@slack/bolt';
 import closApi from '../services/closApi';
+import reportCache, { CachedUnblockPodReport } from '../services/reportCache';
 import logger from '../utils/logger';
 import { formatProjectStatus, createProgressBar } from '../utils/helpers';
 
@@ -21,8 +22,11 @@ export function registerWipCommand(app: App): void {
       const text = command.text.trim();
       const pod = text || user.pod;
 
-      // Get WIP status
-      const wipStatus = await closApi.getWipStatus(pod);
+      // Get WIP status and the pod's slice of the latest daily unblock report
+      const [wipStatus, unblockReport] = await Promise.all([
+        closApi.getWipStatus(pod),
+        reportCache.getPodReport<CachedUnblockPodReport>('daily_unblock', pod)
+      ]);
       const utilizationPercentage = (wipStatus.totalWip / wipStatus.wipLimit) * 100;
       
       // Determine status color and emoji
@@ -76,6 +80,26 @@ export function registerWipCommand(app: App): void {
         }
       }
 
+      if (unblockReport && unblockReport.blocked_items.length > 0) {
+        const blockedLines = unblockReport.blocked_items
+          .slice(0, 5)
+          .map(item => `• *${item.name}* (${item.current_stage}) - ${item.days_blocked ?? '?'} days`)
+          .join('\n');
+
+        blocks.push(
+          {
+            type: 'divider'
+          },
+          {
+            type: 'section',
+            text: {
+              type: 'mrkdwn',
+              text: `🚧 *Blocked Items* _(daily unblock report, ${unblockReport.date})_\n${blockedLines}`
+            }
+          }
+        );
+      }
+
       // Add recommendations based on WIP status
       if (utilizationPercentage >= 100) {
         blocks.push(
@@ -0,0 +1,96 @@
+import redis from '../utils/redis';
+import logger from '../utils/logger';
+
+// Report snapshots published by the daily-unblock lambda (lambda/clos_cache.py).
+// Keys: clos:reports:<type>:{latest,summary,v<version>,pod:<pod>}
+const KEY_PREFIX = 'clos:reports';
+
+export type ReportType = 'daily_unblock' | 'weekly_demo';
+
+export interface CachedBlockedItem {
+  id: string;
+  name: string;
+  current_stage: string;
+  last_updated: string | null;
+  pod_name: string;
+  lead_name: string | null;
+  days_blocked: number | null;
+}
+
+export interface CachedWipViolation {
+  pod_id: string;
+  item_type: string;
+  current_count: number;
+  limit: number;
+}
+
+export interface CachedUnblockPodReport {
+  version: number;
+  published_at: number;
+  date: string;
+  blocked_items: CachedBlockedItem[];
+  wip_violations: CachedWipViolation[];
+}
+
+export interface CachedPodWeeklySummary {
+  pod_name: string;
+  transitions_this_week: number;
+  completed_projects: number;
+  total_active_projects: number;
+  health_score: number;
+}
+
+export interface CachedDemoPodReport {
+  version: number;
+  published_at: number;
+  date: string;
+  week_ending: string;
+  summary: CachedPodWeeklySummary | null;
+  demo_candidates: Array<{ id: string; name: string; current_stage: string; deployed_url: string | null }>;
+  completed_work: Array<{ project_id: string; project_name: string; to_stage: string; completed_at: string | null }>;
+}
+
+export interface CachedReportSummary {
+  version: number;
+  published_at: number;
+  date: string;
+  summary: Record<string, number>;
+}
+
+function reportKey(reportType: ReportType, ...parts: Array<string | number>): string {
+  return [KEY_PREFIX, reportType, ...parts.map(String)].join(':');
+}
+
+async function readJSON<T>(key: string): Promise<T | null> {
+  try {
+    await redis.connect();
+    return await redis.getJSON<T>(key);
+  } catch (error) {
+    // A cache miss or outage falls back to the live API
+    logger.error(`Failed to read report cache key ${key}:`, error);
+    return null;
+  }
+}
+
+export async function getLatestReport<T = any>(reportType: ReportType): Promise<T | null> {
+  return readJSON<T>(reportKey(reportType, 'latest'));
+}
+
+export async function getReportSummary(reportType: ReportType): Promise<CachedReportSummary | null> {
+  return readJSON<CachedReportSummary>(reportKey(reportType, 'summary'));
+}
+
+export async function getReportVersion<T = any>(reportType: ReportType, version: number): Promise<T | null> {
+  return readJSON<T>(reportKey(reportType, `v${version}`));
+}
+
+export async function getPodReport<T = any>(reportType: ReportType, pod: string): Promise<T | null> {
+  return readJSON<T>(reportKey(reportType, 'pod', pod));
+}
+
+export default {
+  getLatestReport,
+  getReportSummary,
+  getReportVersion,
+  getPodReport,
+};
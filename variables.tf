@@ -184,6 +184,36 @@ variable "slack_token" {
   sensitive   = true
 }
 
+variable "slack_report_channel" {
+  description = "Slack channel for the daily unblock and weekly demo reports"
+  type        = string
+  default     = "#clos-daily"
+}
+
+variable "slack_pod_channels" {
+  description = "Slack channel per pod for pod-specific report messages"
+  type        = map(string)
+  default     = {}
+}
+
+variable "report_cache_url" {
+  description = "Redis URL of an existing report cache read by the Slack bot and dashboard (empty provisions an ElastiCache Redis cluster)"
+  type        = string
+  default     = ""
+  sensitive   = true
+
+  validation {
+    condition     = var.report_cache_url == "" || can(regex("^rediss?://", var.report_cache_url))
+    error_message = "Report cache URL must be a redis:// or rediss:// URL."
+  }
+}
+
+variable "report_cache_node_type" {
+  description = "ElastiCache node type of the provisioned report cache"
+  type        = string
+  default     = "cache.t4g.micro"
+}
+
 variable "auth0_client_secret" {
   description = "Auth0 client secret for authentication"
   type        = string
@@ -204,6 +234,23 @@ variable "enable_monitoring" {
   default     = true
 }
 
+variable "enable_lambda_metrics" {
+  description = "Emit per-stage timings from the Lambda functions as CloudWatch Embedded Metric Format log lines"
+  type        = bool
+  default     = true
+}
+
+variable "lambda_profile_sample_rate" {
+  description = "Profile one Lambda invocation in N with cProfile, storing the profiles under lambda-profiles/ in the artifacts bucket (0 disables profiling)"
+  type        = number
+  default     = 0
+
+  validation {
+    condition     = var.lambda_profile_sample_rate >= 0 && floor(var.lambda_profile_sample_rate) == var.lambda_profile_sample_rate
+    error_message = "Lambda profile sample rate must be a whole number, 0 to disable."
+  }
+}
+
 variable "enable_encryption" {
   description = "Enable encryption at rest for all resources"
   type        = bool